@@ -42,16 +42,30 @@ def test_config_111_10_events_one_close() -> None:
     assert sim_stats == {'num_customers': 4, 'total_time': 21, 'max_wait': 18}
 
 def test_config_001_10_events_base() -> None:
-    # Усі лінії закриваються до того, як прибудуть усі клієнти, що спричиняє нескінченну петлю.
-    pass
+    # Усі лінії закриваються до того, як прибудуть усі клієнти: Alan
+    # залишається в залі очікування, і симуляція завершується.
+    config_file = open('input_files/config_001_10.json')
+    sim = GroceryStoreSimulation(config_file)
+    config_file.close()
+    event_file = open('input_files/events_base.txt')
+    sim_stats = sim.run(event_file)
+    event_file.close()
+    assert sim_stats == {'num_customers': 6, 'total_time': 65, 'max_wait': 14}
 
 def test_config_001_10_events_mixtures() -> None:
-    # Усі лінії закриваються до того, як прибудуть усі клієнти, що спричиняє нескінченну петлю.
+    # Файл подій закриває рядок 1, якого немає в цій конфігурації.
     pass
 
 def test_config_001_10_events_one_close() -> None:
-    # Усі лінії закриваються до того, як прибудуть усі клієнти, що спричиняє нескінченну петлю.
-    pass
+    # Усі лінії закриваються до того, як прибудуть усі клієнти: Ingram і
+    # Yvonne залишаються в залі очікування, і симуляція завершується.
+    config_file = open('input_files/config_001_10.json')
+    sim = GroceryStoreSimulation(config_file)
+    config_file.close()
+    event_file = open('input_files/events_one_close.txt')
+    sim_stats = sim.run(event_file)
+    event_file.close()
+    assert sim_stats == {'num_customers': 4, 'total_time': 6, 'max_wait': 3}
 
 def test_config_001_10_events_one() -> None:
     config_file = open('input_files/config_001_10.json')
@@ -0,0 +1,456 @@
+"""
+Цей модуль містить вимірювання швидкодії структур даних і гарячих шляхів
+симуляції.
+
+Набір вимірювань (run_suite) вимірює пропускну здатність PriorityQueue,
+GroceryStore.enter_line, розбору файлу подій і повної симуляції для
+зростаючих розмірів файлів подій і кількості кас.  Результати
+записуються в JSON, і їх можна порівняти з попередньо збереженими
+еталонними результатами: перевірка не проходить, якщо пропускна здатність
+якогось вимірювання впала більше ніж на заданий відсоток.
+
+Еталонні результати набору small зберігаються в BASELINE_PATH
+(benchmark_baseline.json поруч із цим модулем); --baseline без шляху
+порівнює з ними.  Після змін, що навмисно змінюють швидкодію, або на
+іншій машині їх треба записати заново:
+    python benchmark.py --scale small --repeat 5 \
+        --save-baseline benchmark_baseline.json
+
+Запуск:
+    python benchmark.py --out results.json
+    python benchmark.py --save-baseline baseline.json
+    python benchmark.py --baseline baseline.json --tolerance 20
+    python benchmark.py --scale small --baseline
+    python benchmark.py --compare
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from io import StringIO
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from container import CalendarQueue, Container, PriorityQueue
+from event import Event, EVENT_ORDER, create_event_list
+from generator import iter_workload, write_workload
+from simulation import GroceryStoreSimulation
+from store import Customer, GroceryStore, RegularLine
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             'benchmark_baseline.json')
+# Розміри вимірювань: кількість подій і кількість кас.
+SIZES = {'small': {'events': [1000, 5000], 'lanes': [3, 12]},
+         'full': {'events': [10000, 50000, 200000], 'lanes': [3, 12, 48]}}
+
+
+class ListPriorityQueue(Container):
+    """Попередня реалізація черги з пріоритетом на відсортованому списку.
+
+    Зберігається лише як еталон для порівняння швидкодії та поведінки з
+    PriorityQueue. Додавання і видалення виконуються за O(n).
+
+    === Приватні атрибути ===
+    _items: відсортований список, де першим є елемент із найвищим пріоритетом.
+    """
+    _items: List
+
+    def __init__(self) -> None:
+        """Ініціалізування порожної черги ListPriorityQueue.
+        """
+        self._items = []
+
+    def __len__(self) -> int:
+        """Повертає кількість елементів у цій черзі.
+        """
+        return len(self._items)
+
+    def remove(self) -> Any:
+        """Видалення та повернення наступного елемента із цієї черги.
+
+         Передумова: <self> не має бути порожнім.
+        """
+        return self._items.pop(0)
+
+    def is_empty(self) -> bool:
+        """Повертає True, якщо ця черга порожня.
+        """
+        return len(self._items) == 0
+
+    def add(self, item: Any) -> None:
+        """Додавання <item> до цієї черги з дотриманням порядку FIFO для нічиїх.
+        """
+        for i, element in enumerate(self._items):
+            if item < element:
+                self._items.insert(i, item)
+                return None
+        self._items.append(item)
+        return None
+
+
+def random_timestamps(n: int, seed: int = 0) -> List[int]:
+    """Повертає <n> випадкових міток часу з діапазону [0, n), що повторюються.
+    """
+    rng = random.Random(seed)
+    return [rng.randrange(n) for _ in range(n)]
+
+
+def time_queue(make_queue: Callable[[], Container],
+               timestamps: List[int]) -> float:
+    """Повертає час у секундах на додавання і видалення подій з <timestamps>.
+    """
+    events = [Event(t) for t in timestamps]
+    queue = make_queue()
+    start = time.perf_counter()
+    for event in events:
+        queue.add(event)
+    while not queue.is_empty():
+        queue.remove()
+    return time.perf_counter() - start
+
+
+def bench_priority_queue(sizes: List[int]) -> List[Dict[str, Any]]:
+    """Порівнює PriorityQueue (з методами порівняння Event і з ключем
+    EVENT_ORDER) і CalendarQueue з ListPriorityQueue для кожного розміру з
+    <sizes>.
+    """
+    results = []
+    for n in sizes:
+        timestamps = random_timestamps(n)
+        heap_time = time_queue(PriorityQueue, timestamps)
+        keyed_time = time_queue(lambda: PriorityQueue(EVENT_ORDER),
+                                timestamps)
+        calendar_time = time_queue(CalendarQueue, timestamps)
+        list_time = time_queue(ListPriorityQueue, timestamps)
+        results.append({'n': n, 'heap': heap_time, 'keyed': keyed_time,
+                        'calendar': calendar_time, 'list': list_time,
+                        'speedup': list_time / heap_time})
+    return results
+
+
+def bench_checkout_line(capacities: List[int]) -> List[Dict[str, Any]]:
+    """Вимірює обслуговування і закриття довгих черг RegularLine порівняно з
+    попередніми операціями на списку (pop(0) і зрізи).
+    """
+    results = []
+    for capacity in capacities:
+        customers = [Customer(str(i), []) for i in range(capacity)]
+
+        line = RegularLine(capacity)
+        start = time.perf_counter()
+        for customer in customers:
+            line.accept(customer)
+        while line.complete_checkout():
+            pass
+        for customer in customers:
+            line.accept(customer)
+        line.close()
+        line_time = time.perf_counter() - start
+
+        queue = []
+        start = time.perf_counter()
+        for customer in customers:
+            queue.append(customer)
+        while queue:
+            queue.pop(0)
+        for customer in customers:
+            queue.append(customer)
+        _ = queue[1:]
+        queue = queue[:1]
+        list_time = time.perf_counter() - start
+
+        results.append({'capacity': capacity, 'deque': line_time,
+                        'list': list_time})
+    return results
+
+
+class RecordingQueue(PriorityQueue):
+    """Черга подій симуляції, що запам’ятовує свої операції.
+
+    === Атрибути ===
+    ops: пари (назва методу, подія для add або None) у порядку викликів.
+    """
+    ops: List[Any]
+
+    def __init__(self) -> None:
+        """Ініціалізування порожньої черги з ключем EVENT_ORDER.
+        """
+        PriorityQueue.__init__(self, EVENT_ORDER)
+        self.ops = []
+
+    def add(self, item: Any) -> None:
+        """Додає <item> і запам’ятовує операцію.
+        """
+        self.ops.append(('add', item))
+        PriorityQueue.add(self, item)
+
+    def remove(self) -> Any:
+        """Видаляє наступний елемент і запам’ятовує операцію.
+        """
+        self.ops.append(('remove', None))
+        return PriorityQueue.remove(self)
+
+    def peek(self) -> Any:
+        """Повертає наступний елемент і запам’ятовує операцію.
+        """
+        self.ops.append(('peek', None))
+        return PriorityQueue.peek(self)
+
+    def is_empty(self) -> bool:
+        """Повертає True, якщо черга порожня, і запам’ятовує операцію.
+        """
+        self.ops.append(('is_empty', None))
+        return PriorityQueue.is_empty(self)
+
+
+def replay_queue(queue: Container, ops: List[Any]) -> List[Any]:
+    """Виконує операції <ops>, записані RecordingQueue, над <queue> і
+    повертає видалені елементи.
+    """
+    removed = []
+    for name, item in ops:
+        if name == 'add':
+            queue.add(item)
+        elif name == 'remove':
+            removed.append(queue.remove())
+        elif name == 'peek':
+            queue.peek()
+        else:
+            queue.is_empty()
+    return removed
+
+
+def bench_simulation_queues(n: int, lanes_list: List[int],
+                            repeat: int = 3) -> List[Dict[str, Any]]:
+    """Записує операції черги подій повної симуляції <n> клієнтів для
+    кожної кількості кас з <lanes_list> і порівнює час їх виконання над
+    PriorityQueue з ключем EVENT_ORDER і CalendarQueue.
+    """
+    results = []
+    for lanes in lanes_list:
+        queues = []
+
+        def recording_queue() -> RecordingQueue:
+            """Повертає нову чергу, що запам’ятовує операції."""
+            queues.append(RecordingQueue())
+            return queues[-1]
+        sim = GroceryStoreSimulation(store_config(lanes, 20),
+                                     recording_queue)
+        sim.run(StringIO(workload_text(n, lanes / 60)))
+        ops = queues[-1].ops
+        heap_time = best_time(
+            lambda: replay_queue(PriorityQueue(EVENT_ORDER), ops), repeat)
+        calendar_time = best_time(
+            lambda: replay_queue(CalendarQueue(), ops), repeat)
+        results.append({'lanes': lanes, 'ops': len(ops), 'heap': heap_time,
+                        'calendar': calendar_time})
+    return results
+
+
+def store_config(lanes: int, capacity: int) -> Dict[str, int]:
+    """Повертає конфігурацію магазину з <lanes> касами, розподіленими між
+    звичайними, експрес-касами і касами самообслуговування, з місткістю
+    черги <capacity>.
+    """
+    express = lanes // 3
+    self_serve = lanes // 3
+    return {'regular_count': lanes - express - self_serve,
+            'express_count': express, 'self_serve_count': self_serve,
+            'line_capacity': capacity}
+
+
+def best_time(action: Callable[[], Any], repeat: int) -> float:
+    """Повертає найменший із <repeat> часів виконання <action> у секундах.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        action()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(name: str, ops: int, action: Callable[[], Any],
+            repeat: int) -> Dict[str, Any]:
+    """Повертає результат вимірювання <name>: <action> виконує <ops>
+    операцій.
+    """
+    seconds = best_time(action, repeat)
+    return {'name': name, 'ops': ops, 'seconds': seconds,
+            'throughput': ops / seconds if seconds > 0 else float('inf')}
+
+
+def bench_queue_throughput(n: int, repeat: int) -> Dict[str, Any]:
+    """Вимірює <n> додавань і <n> видалень у PriorityQueue з ключем
+    EVENT_ORDER, як у черзі подій симуляції.
+    """
+    timestamps = random_timestamps(n)
+    return measure('priority_queue/n=' + str(n), 2 * n,
+                   lambda: time_queue(lambda: PriorityQueue(EVENT_ORDER),
+                                      timestamps), repeat)
+
+
+def bench_enter_line(n: int, lanes: int, repeat: int) -> Dict[str, Any]:
+    """Вимірює <n> викликів GroceryStore.enter_line у магазині з <lanes>
+    касами.
+    """
+    config = json.dumps(store_config(lanes, n))
+    customers = [event.customer for event in iter_workload(n, seed=1)]
+
+    def action() -> None:
+        """Ставить усіх клієнтів у черги нового магазину."""
+        store = GroceryStore(StringIO(config))
+        for customer in customers:
+            store.enter_line(customer)
+    return measure('enter_line/n={}/lanes={}'.format(n, lanes), n, action,
+                   repeat)
+
+
+def bench_parse(n: int, repeat: int) -> Dict[str, Any]:
+    """Вимірює розбір файлу подій з <n> клієнтами функцією create_event_list.
+    """
+    text = workload_text(n, 1.0)
+    return measure('parse/n=' + str(n), n,
+                   lambda: create_event_list(StringIO(text)), repeat)
+
+
+def bench_simulation(n: int, lanes: int, repeat: int) -> Dict[str, Any]:
+    """Вимірює повну симуляцію GroceryStoreSimulation.run для <n> клієнтів
+    у магазині з <lanes> касами, навантаженому приблизно до його місткості.
+    """
+    config = json.dumps(store_config(lanes, 20))
+    text = workload_text(n, lanes / 60)
+
+    def action() -> None:
+        """Запускає симуляцію з нового магазину."""
+        sim = GroceryStoreSimulation(StringIO(config))
+        sim.run(StringIO(text))
+    return measure('simulation/n={}/lanes={}'.format(n, lanes), n, action,
+                   repeat)
+
+
+def workload_text(n: int, rate: float) -> str:
+    """Повертає текст файлу подій з <n> клієнтами, що прибувають з
+    інтенсивністю <rate> клієнтів за секунду.
+    """
+    out = StringIO()
+    write_workload(out, n, seed=1, rate=rate)
+    return out.getvalue()
+
+
+def run_suite(sizes: Dict[str, List[int]],
+              repeat: int = 3) -> List[Dict[str, Any]]:
+    """Запускає всі вимірювання для кількостей подій sizes['events'] і
+    кількостей кас sizes['lanes'].  Кожне вимірювання повторюється <repeat>
+    разів, і береться найкращий час.
+    """
+    results = []
+    for n in sizes['events']:
+        results.append(bench_queue_throughput(n, repeat))
+        results.append(bench_parse(n, repeat))
+        for lanes in sizes['lanes']:
+            results.append(bench_enter_line(n, lanes, repeat))
+            results.append(bench_simulation(n, lanes, repeat))
+    return results
+
+
+def check_regression(results: List[Dict[str, Any]],
+                     baseline: List[Dict[str, Any]],
+                     tolerance: float) -> List[str]:
+    """Повертає описи вимірювань з <results>, пропускна здатність яких
+    менша за еталонну з <baseline> більше ніж на <tolerance> відсотків.
+
+    Вимірювання, яких немає в <baseline>, не перевіряються.
+
+    >>> base = [{'name': 'a', 'throughput': 100.0}]
+    >>> check_regression([{'name': 'a', 'throughput': 85.0}], base, 20)
+    []
+    >>> check_regression([{'name': 'a', 'throughput': 75.0}], base, 20)
+    ['a: 75 ops/s vs baseline 100 ops/s (-25.0%)']
+    """
+    expected = {row['name']: row['throughput'] for row in baseline}
+    failures = []
+    for row in results:
+        if row['name'] not in expected:
+            continue
+        base = expected[row['name']]
+        if row['throughput'] < base * (1 - tolerance / 100):
+            change = 100 * (row['throughput'] / base - 1)
+            failures.append('{}: {:.0f} ops/s vs baseline {:.0f} ops/s '
+                            '({:+.1f}%)'.format(row['name'], row['throughput'],
+                                                base, change))
+    return failures
+
+
+def save_results(results: List[Dict[str, Any]], path: str) -> None:
+    """Записує результати вимірювань <results> у JSON-файл <path>.
+    """
+    with open(path, 'w') as out:
+        json.dump({'python': sys.version.split()[0], 'results': results},
+                  out, indent=2)
+
+
+def load_results(path: str) -> List[Dict[str, Any]]:
+    """Повертає результати вимірювань із JSON-файлу <path>.
+    """
+    with open(path) as results_file:
+        return json.load(results_file)['results']
+
+
+def print_comparisons() -> None:
+    """Друкує порівняння черг і кас з попередніми реалізаціями на списках.
+    """
+    for row in bench_priority_queue([1000, 5000, 10000]):
+        print('PriorityQueue n={n}: heap {heap:.4f}s, keyed {keyed:.4f}s, '
+              'calendar {calendar:.4f}s, list {list:.4f}s, '
+              'x{speedup:.1f}'.format(**row))
+    for row in bench_simulation_queues(50000, [3, 48, 768]):
+        print('Simulation event queue lanes={lanes} ({ops} ops): heap '
+              '{heap:.4f}s, calendar {calendar:.4f}s'.format(**row))
+    for row in bench_checkout_line([10000, 100000]):
+        print('CheckoutLine capacity={capacity}: deque {deque:.4f}s, '
+              'list {list:.4f}s'.format(**row))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Розбирає аргументи командного рядка <argv> і запускає вимірювання.
+
+    Повертає 1, якщо знайдено регресію, інакше 0.
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the grocery store simulation hot paths.')
+    parser.add_argument('--scale', choices=sorted(SIZES), default='full')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--out', help='JSON file for results')
+    parser.add_argument('--save-baseline', metavar='PATH',
+                        help='save results as the new baseline')
+    parser.add_argument('--baseline', metavar='PATH', nargs='?',
+                        const=BASELINE_PATH,
+                        help='fail if throughput regressed against PATH '
+                             '(default: the committed baseline)')
+    parser.add_argument('--tolerance', type=float, default=20.0,
+                        help='allowed throughput drop in percent')
+    parser.add_argument('--compare', action='store_true',
+                        help='compare with the old list-based structures')
+    args = parser.parse_args(argv)
+    if args.compare:
+        print_comparisons()
+        return 0
+    results = run_suite(SIZES[args.scale], args.repeat)
+    for row in results:
+        print('{name}: {throughput:.0f} ops/s'.format(**row))
+    for path in (args.out, args.save_baseline):
+        if path:
+            save_results(results, path)
+    if args.baseline:
+        failures = check_regression(results, load_results(args.baseline),
+                                    args.tolerance)
+        for failure in failures:
+            print('REGRESSION', failure)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
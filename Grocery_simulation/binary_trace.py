@@ -0,0 +1,219 @@
+"""
+Цей модуль містить двійковий стовпцевий формат файлів подій і перетворювач
+текстових файлів подій у цей формат.
+
+Двійковий файл починається із заголовка (MAGIC, кількість подій, кількість
+товарів, довжина таблиці імен) і містить стовпці фіксованої ширини у
+рідному порядку байтів:
+
+    timestamps   — q[n]     мітки часу подій у порядку зростання
+    ids          — q[n]     номер клієнта для Arrive або номер рядка для Close
+    item_offsets — q[n + 1] товари події i — це item_times[item_offsets[i]:
+                            item_offsets[i + 1]]
+    name_offsets — q[n + 1] ім’я події i — це names[name_offsets[i]:
+                            name_offsets[i + 1]]
+    item_times   — q[m]     час оформлення кожного товару
+    kinds        — B[n]     ARRIVE або CLOSE
+    names        — байти    імена клієнтів у UTF-8
+
+Файл відкривається через mmap, і стовпці читаються без розбору тексту.
+
+Запуск: python binary_trace.py [<каталог>] — перетворює кожен файл подій
+.txt у каталозі (за замовчуванням input_files) на файл .gst поруч із ним;
+python binary_trace.py <файл подій .txt> <двійковий файл> — перетворює один
+файл.
+"""
+from __future__ import annotations
+from array import array
+from typing import Iterator, List, Optional, TextIO
+import mmap
+import os
+import struct
+from event import Event, CustomerArrival, CloseLine, iter_sorted_events
+from store import Customer
+
+MAGIC = b'GSTRACE1'
+HEADER = struct.Struct('=8sqqq')
+ARRIVE = 0
+CLOSE = 1
+
+
+def convert_text_trace(event_file: TextIO, path: str) -> int:
+    """Записує події з текстового файлу <event_file> у двійковий файл <path>.
+
+    Події записуються в порядку зростання міток часу. Повертає кількість
+    записаних подій.
+    """
+    timestamps = array('q')
+    ids = array('q')
+    item_offsets = array('q', [0])
+    name_offsets = array('q', [0])
+    item_times = array('q')
+    kinds = array('B')
+    names = bytearray()
+    for event in _iter_raw_events(event_file):
+        time, kind, number, name, times = event
+        timestamps.append(time)
+        kinds.append(kind)
+        ids.append(number)
+        item_times.extend(times)
+        item_offsets.append(len(item_times))
+        names += name.encode('utf-8')
+        name_offsets.append(len(names))
+    with open(path, 'wb') as out:
+        out.write(HEADER.pack(MAGIC, len(timestamps), len(item_times),
+                              len(names)))
+        for column in (timestamps, ids, item_offsets, name_offsets,
+                       item_times, kinds):
+            out.write(column.tobytes())
+        out.write(names)
+    return len(timestamps)
+
+
+def convert_directory(directory: str,
+                      out_directory: Optional[str] = None) -> List[str]:
+    """Перетворює кожен файл подій .txt у каталозі <directory> на двійковий
+    файл з тим самим ім’ям і розширенням .gst у каталозі <out_directory>
+    (за замовчуванням — у <directory>).
+
+    Повертає шляхи до записаних двійкових файлів.
+    """
+    if out_directory is None:
+        out_directory = directory
+    paths = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.txt'):
+            path = os.path.join(out_directory, name[:-len('.txt')] + '.gst')
+            with open(os.path.join(directory, name)) as event_file:
+                convert_text_trace(event_file, path)
+            paths.append(path)
+    return paths
+
+
+def _iter_raw_events(event_file: TextIO) -> Iterator[tuple]:
+    """Повертає події з <event_file> у порядку зростання міток часу як
+    кортежі (мітка часу, тип, номер, ім’я, час кожного товару).
+    """
+    customer_id = 0
+    for event in iter_sorted_events(event_file):
+        if isinstance(event, CustomerArrival):
+            items = event.customer.get_items()
+            yield (event.timestamp, ARRIVE, customer_id, event.customer.name,
+                   [item.get_time() for item in items])
+            customer_id += 1
+        else:
+            yield (event.timestamp, CLOSE, event.line_number, '', [])
+
+
+class BinaryTrace:
+    """Двійковий файл подій, відображений у пам’ять.
+
+    === Атрибути ===
+    timestamps, ids, item_offsets, name_offsets, item_times, kinds:
+        стовпці файлу як memoryview над mmap.
+
+    === Приватні атрибути ===
+    _file: відкритий двійковий файл.
+    _map: відображення _file у пам’ять.
+    _view: memoryview над усім _map.
+    _names: таблиця імен клієнтів.
+    """
+    timestamps: memoryview
+    ids: memoryview
+    item_offsets: memoryview
+    name_offsets: memoryview
+    item_times: memoryview
+    kinds: memoryview
+    _view: memoryview
+    _names: memoryview
+
+    def __init__(self, path: str) -> None:
+        """Відкриває двійковий файл подій <path>.
+        """
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size or \
+                self._map[:len(MAGIC)] != MAGIC:
+            self._map.close()
+            self._file.close()
+            raise ValueError(path + ' is not a binary trace')
+        _, n, m, names_size = HEADER.unpack_from(self._map)
+        if min(n, m, names_size) < 0 or len(self._map) != \
+                HEADER.size + 8 * (4 * n + 2 + m) + n + names_size:
+            self._map.close()
+            self._file.close()
+            raise ValueError(path + ' is truncated or corrupt')
+        view = memoryview(self._map)
+        self._view = view
+        pos = HEADER.size
+        columns = []
+        for size in (n, n, n + 1, n + 1, m):
+            columns.append(view[pos:pos + 8 * size].cast('q'))
+            pos += 8 * size
+        (self.timestamps, self.ids, self.item_offsets, self.name_offsets,
+         self.item_times) = columns
+        self.kinds = view[pos:pos + n]
+        self._names = view[pos + n:pos + n + names_size]
+
+    def __len__(self) -> int:
+        """Повертає кількість подій у файлі.
+        """
+        return len(self.timestamps)
+
+    def name(self, i: int) -> str:
+        """Повертає ім’я клієнта події <i>.
+        """
+        return str(self._names[self.name_offsets[i]:
+                               self.name_offsets[i + 1]], 'utf-8')
+
+    def iter_events(self) -> Iterator[Event]:
+        """Повертає події файлу по одній у порядку зростання міток часу.
+
+        Клієнти створюються через Customer.from_totals, без об’єктів Item.
+        """
+        timestamps = self.timestamps
+        kinds = self.kinds
+        ids = self.ids
+        offsets = self.item_offsets
+        item_times = self.item_times
+        for i in range(len(timestamps)):
+            if kinds[i] == ARRIVE:
+                start = offsets[i]
+                end = offsets[i + 1]
+                customer = Customer.from_totals(
+                    self.name(i), end - start, sum(item_times[start:end]))
+                yield CustomerArrival(timestamps[i], customer)
+            else:
+                yield CloseLine(timestamps[i], ids[i])
+
+    def close(self) -> None:
+        """Закриває файл.
+        """
+        for column in (self.timestamps, self.ids, self.item_offsets,
+                       self.name_offsets, self.item_times, self.kinds,
+                       self._names, self._view):
+            column.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> BinaryTrace:
+        """Повертає цей файл для використання в with.
+        """
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Закриває файл після with.
+        """
+        self.close()
+
+
+if __name__ == '__main__':
+    import sys
+    if len(sys.argv) == 3:
+        with open(sys.argv[1]) as text_file:
+            count = convert_text_trace(text_file, sys.argv[2])
+        print('Wrote', count, 'events to', sys.argv[2])
+    else:
+        for written in convert_directory(sys.argv[1] if len(sys.argv) > 1
+                                         else 'input_files'):
+            print('Wrote', written)
@@ -0,0 +1,256 @@
+"""
+Цей модуль містить кеш розібраних файлів подій і статистики симуляцій,
+адресований вмістом.
+
+Файл подій зберігається як двійковий файл подій (binary_trace) під
+ім’ям — SHA-256 його вмісту, тож той самий вміст за іншим шляхом
+розбирається лише раз.  Статистика симуляції зберігається у JSON під
+ключем з версії кешу, хешу конфігурації (JSON без пробілів і з
+упорядкованими ключами) і хешу файлу подій.
+
+Кеш має два рівні: статистика останніх симуляцій тримається в пам’яті
+процесу, а файли кешу — у каталозі на диску.  Обидва рівні обмежені й
+витісняють записи, що найдовше не використовувалися (LRU); на диску час
+використання — це час зміни файлу.
+
+Приклад:
+    cache = SimulationCache('.sim_cache')
+    stats = cache.stats('input_files/config_111_10.json',
+                        'input_files/events_mixtures.txt')
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+import hashlib
+import json
+import os
+import time
+from binary_trace import BinaryTrace, convert_text_trace
+from simulation import GroceryStoreSimulation
+
+# Версія кешу входить у ключ статистики; її треба збільшити, якщо зміна
+# симуляції змінює статистику тих самих файлів.
+CACHE_VERSION = 1
+TRACE_SUFFIX = '.gst'
+STATS_SUFFIX = '.json'
+
+
+def content_hash(data: bytes) -> str:
+    """Повертає SHA-256 вмісту <data> у шістнадцятковому вигляді.
+
+    >>> content_hash(b'')[:16]
+    'e3b0c44298fc1c14'
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def config_hash(config_text: str) -> str:
+    """Повертає хеш конфігурації магазину <config_text> (текст JSON), що не
+    залежить від пробілів і порядку ключів.
+
+    >>> config_hash('{"a": 1, "b": 2}') == config_hash('{"b":2,"a":1}')
+    True
+    """
+    config = json.loads(config_text)
+    return content_hash(json.dumps(config, sort_keys=True,
+                                   separators=(',', ':')).encode('utf-8'))
+
+
+class SimulationCache:
+    """Кеш розібраних файлів подій і статистики симуляцій.
+
+    === Атрибути ===
+    directory: каталог кешу на диску.
+    max_bytes: найбільший сумарний розмір файлів кешу на диску.
+    max_items: найбільша кількість записів статистики в пам’яті.
+    memory_hits: кількість статистик, знайдених у пам’яті.
+    disk_hits: кількість статистик, знайдених на диску.
+    misses: кількість статистик, яких не було в кеші.
+
+    === Приватні атрибути ===
+    _stats: статистика за ключем у порядку використання, від найдавнішої.
+    _hashes: хеш файлу за (шлях, розмір, час зміни), щоб не читати
+             незмінений файл повторно.
+    _clock: останній час використання, записаний у файл кешу, у
+            наносекундах.
+    _pinned: файли кешу, які не можна витісняти, доки вони не будуть
+             відкріплені через unpin().
+    """
+    directory: str
+    max_bytes: int
+    max_items: int
+    memory_hits: int
+    disk_hits: int
+    misses: int
+    _stats: OrderedDict
+    _hashes: Dict[Tuple[str, int, int], str]
+    _clock: int
+    _pinned: Set[str]
+
+    def __init__(self, directory: str, max_bytes: int = 256 << 20,
+                 max_items: int = 1024) -> None:
+        """Ініціалізація кешу в каталозі <directory> з обмеженнями
+        <max_bytes> на диску і <max_items> записів статистики в пам’яті.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._stats = OrderedDict()
+        self._hashes = {}
+        self._clock = 0
+        self._pinned = set()
+        os.makedirs(directory, exist_ok=True)
+
+    def file_hash(self, path: str) -> str:
+        """Повертає хеш вмісту файлу <path>.
+        """
+        info = os.stat(path)
+        memo = (os.path.abspath(path), info.st_size, info.st_mtime_ns)
+        if memo not in self._hashes:
+            with open(path, 'rb') as data_file:
+                self._hashes[memo] = content_hash(data_file.read())
+        return self._hashes[memo]
+
+    def trace_path(self, events: str) -> str:
+        """Повертає шлях до двійкового файлу подій для файлу подій <events>,
+        розбираючи його, лише якщо такого вмісту ще немає в кеші.
+        """
+        path = self._path(self.file_hash(events), TRACE_SUFFIX)
+        if os.path.exists(path):
+            self._touch(path)
+            return path
+        temp_path = path + '.' + str(os.getpid()) + '.tmp'
+        with open(events) as event_file:
+            convert_text_trace(event_file, temp_path)
+        os.replace(temp_path, path)
+        self._touch(path)
+        self._evict(path)
+        return path
+
+    def pin_traces(self, event_files: Iterable[str]) -> Dict[str, str]:
+        """Повертає шляхи до двійкових файлів подій для кожного файлу подій
+        з <event_files> і закріплює їх: закріплені файли не витісняються,
+        доки не буде викликано unpin().
+        """
+        traces = {}
+        for events in event_files:
+            traces[events] = self.trace_path(events)
+            self._pinned.add(traces[events])
+        return traces
+
+    def unpin(self) -> None:
+        """Відкріплює всі закріплені файли кешу і витісняє зайві.
+        """
+        self._pinned.clear()
+        self._evict(None)
+
+    def stats_key(self, config: str, events: str) -> str:
+        """Повертає ключ статистики симуляції магазину з конфігурацією
+        <config> для файлу подій <events>.
+        """
+        with open(config) as config_file:
+            config_text = config_file.read()
+        return content_hash(' '.join([str(CACHE_VERSION),
+                                      config_hash(config_text),
+                                      self.file_hash(events)])
+                            .encode('utf-8'))
+
+    def get_stats(self, config: str, events: str) \
+            -> Optional[Dict[str, Any]]:
+        """Повертає збережену статистику симуляції магазину з конфігурацією
+        <config> для файлу подій <events> або None, якщо її немає в кеші.
+        """
+        key = self.stats_key(config, events)
+        if key in self._stats:
+            self._stats.move_to_end(key)
+            self.memory_hits += 1
+            return dict(self._stats[key])
+        path = self._path(key, STATS_SUFFIX)
+        try:
+            with open(path) as stats_file:
+                stats = json.load(stats_file)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self._touch(path)
+        self._remember(key, stats)
+        self.disk_hits += 1
+        return dict(stats)
+
+    def put_stats(self, config: str, events: str,
+                  stats: Dict[str, Any]) -> None:
+        """Зберігає статистику <stats> симуляції магазину з конфігурацією
+        <config> для файлу подій <events>.
+        """
+        key = self.stats_key(config, events)
+        self._remember(key, dict(stats))
+        path = self._path(key, STATS_SUFFIX)
+        temp_path = path + '.' + str(os.getpid()) + '.tmp'
+        with open(temp_path, 'w') as stats_file:
+            json.dump(stats, stats_file)
+        os.replace(temp_path, path)
+        self._touch(path)
+        self._evict(path)
+
+    def stats(self, config: str, events: str) -> Dict[str, Any]:
+        """Повертає статистику симуляції магазину з конфігурацією <config>
+        для файлу подій <events>, симулюючи магазин, лише якщо її немає в
+        кеші.
+
+        Помилки симуляції не кешуються.
+        """
+        stats = self.get_stats(config, events)
+        if stats is None:
+            with open(config) as config_file:
+                sim = GroceryStoreSimulation(config_file)
+            with BinaryTrace(self.trace_path(events)) as trace:
+                stats = sim.run_events(trace.iter_events())
+            self.put_stats(config, events, stats)
+        return stats
+
+    def _remember(self, key: str, stats: Dict[str, Any]) -> None:
+        """Зберігає статистику <stats> з ключем <key> у пам’яті.
+        """
+        self._stats[key] = stats
+        self._stats.move_to_end(key)
+        while len(self._stats) > self.max_items:
+            self._stats.popitem(last=False)
+
+    def _path(self, key: str, suffix: str) -> str:
+        """Повертає шлях до файлу кешу з ключем <key> і розширенням
+        <suffix>.
+        """
+        return os.path.join(self.directory, key + suffix)
+
+    def _touch(self, path: str) -> None:
+        """Позначає файл кешу <path> як щойно використаний.
+        """
+        self._clock = max(time.time_ns(), self._clock + 1)
+        os.utime(path, ns=(self._clock, self._clock))
+
+    def _evict(self, keep: Optional[str]) -> None:
+        """Видаляє файли кешу, що найдовше не використовувалися, доки їхній
+        сумарний розмір не стане не більшим за max_bytes.  Файл <keep> і
+        закріплені файли не видаляються.
+        """
+        files = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith((TRACE_SUFFIX, STATS_SUFFIX)):
+                info = entry.stat()
+                files.append((info.st_mtime_ns, info.st_size, entry.path))
+                total += info.st_size
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            if path == keep or path in self._pinned:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
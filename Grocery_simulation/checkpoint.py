@@ -0,0 +1,226 @@
+"""
+Цей модуль містить двійковий формат знімків стану симуляції для
+відновлення довгих симуляцій після збою.
+
+Знімок містить чергу подій, черги і стан кожної каси, залу очікування,
+статистику і кількість уже виконаних подій з файлу подій.  Клієнти
+записуються один раз у таблицю клієнтів, а черги, події й зала очікування
+посилаються на них за номером, тому спільні клієнти залишаються спільними
+й після відновлення.  Усі числа записуються стовпцями q (8 байтів у
+рідному порядку байтів) після заголовка:
+
+    customer_items, customer_times, customer_arrivals,
+    customer_store_arrivals — q[nc]    дані клієнтів
+    name_offsets            — q[nc + 1] межі імен у names
+    line_open, line_peaks   — q[nl]    стан кожної каси
+    line_offsets            — q[nl + 1] межі черги каси в line_refs
+    line_refs               — q[...]   клієнти в чергах кас
+    waiting_refs            — q[nw]    клієнти в залі очікування
+    event_kinds, event_times, event_args — q[ne] події черги подій у
+                                           порядку виконання
+    event_offsets           — q[ne + 1] межі клієнтів події в event_refs
+    event_refs              — q[...]   клієнти подій
+    names                   — байти    імена клієнтів у UTF-8
+
+Клієнти відновлюються через Customer.from_totals, без об’єктів Item.
+"""
+from __future__ import annotations
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+import os
+import struct
+from container import Container
+from event import Event, CustomerArrival, CustomersWaiting, CheckoutStarted, \
+    CheckoutCompleted, ARRIVAL, WAITING, STARTED, COMPLETED
+from store import Customer
+
+MAGIC = b'GSSNAP01'
+HEADER = struct.Struct('=8s12q')
+
+# Стан каси: (чи відкрита, найбільша довжина черги, клієнти в черзі).
+LineState = Tuple[bool, int, List[Customer]]
+
+
+class Snapshot:
+    """Стан симуляції між двома подіями.
+
+    === Атрибути ===
+    stats: статистика симуляції на момент знімка.
+    consumed: кількість виконаних подій з файлу подій.
+    capacity_version: лічильник звільнень місць магазину.
+    lines: стан кожної каси.
+    waiting: клієнти в залі очікування.
+    events: події черги подій у порядку виконання.
+    deferred: відкладена група очікування живої симуляції або None.
+              Знімки з відкладеною групою не записуються у файл.
+    """
+    stats: Dict[str, Any]
+    consumed: int
+    capacity_version: int
+    lines: List[LineState]
+    waiting: List[Customer]
+    events: List[Event]
+    deferred: Optional[CustomersWaiting]
+
+    def __init__(self, stats: Dict[str, Any], consumed: int,
+                 capacity_version: int, lines: List[LineState],
+                 waiting: List[Customer], events: List[Event],
+                 deferred: Optional[CustomersWaiting] = None) -> None:
+        """Ініціалізація знімка з переданого стану.
+        """
+        self.stats = stats
+        self.consumed = consumed
+        self.capacity_version = capacity_version
+        self.lines = lines
+        self.waiting = waiting
+        self.events = events
+        self.deferred = deferred
+
+
+def drain_events(queue: Container) -> List[Event]:
+    """Повертає події черги <queue> у порядку виконання, залишаючи чергу в
+    тому самому стані.
+
+    Події видаляються й додаються назад у порядку виконання, тому порядок
+    подій з однаковою міткою часу зберігається для будь-якої черги.
+    """
+    events = []
+    while not queue.is_empty():
+        events.append(queue.remove())
+    for event in events:
+        queue.add(event)
+    return events
+
+
+def write_snapshot(snapshot: Snapshot, path: str) -> None:
+    """Записує знімок <snapshot> у файл <path>.
+
+    Знімок спершу записується в тимчасовий файл, який потім атомарно
+    замінює <path>, тому збій під час запису не псує попередній знімок.
+    """
+    if snapshot.deferred is not None:
+        raise ValueError('cannot write a snapshot of a live simulation')
+    index = {}
+    customers = []
+
+    def ref(customer: Customer) -> int:
+        """Повертає номер клієнта <customer> у таблиці клієнтів."""
+        key = id(customer)
+        if key not in index:
+            index[key] = len(customers)
+            customers.append(customer)
+        return index[key]
+
+    line_open = array('q')
+    line_peaks = array('q')
+    line_offsets = array('q', [0])
+    line_refs = array('q')
+    for is_open, peak, queue in snapshot.lines:
+        line_open.append(int(is_open))
+        line_peaks.append(peak)
+        line_refs.extend(ref(c) for c in queue)
+        line_offsets.append(len(line_refs))
+    waiting_refs = array('q', [ref(c) for c in snapshot.waiting])
+    kinds = array('q')
+    times = array('q')
+    args = array('q')
+    event_offsets = array('q', [0])
+    event_refs = array('q')
+    for event in snapshot.events:
+        kind = event.kind
+        times.append(event.timestamp)
+        kinds.append(kind)
+        if kind == ARRIVAL:
+            args.append(0)
+            event_refs.append(ref(event.customer))
+        elif kind == WAITING:
+            args.append(event.version)
+            event_refs.extend(ref(c) for c in event.customers)
+        elif kind == STARTED:
+            args.append(event.line_number)
+        elif kind == COMPLETED:
+            args.append(event.line_number)
+            event_refs.append(ref(event.customer))
+        else:
+            raise ValueError('cannot snapshot ' + type(event).__name__)
+        event_offsets.append(len(event_refs))
+
+    names = bytearray()
+    name_offsets = array('q', [0])
+    for customer in customers:
+        names += customer.name.encode('utf-8')
+        name_offsets.append(len(names))
+    stats = snapshot.stats
+    header = HEADER.pack(
+        MAGIC, stats['num_customers'], stats['total_time'],
+        stats['max_wait'], snapshot.consumed, snapshot.capacity_version,
+        len(customers), len(names), len(snapshot.lines), len(line_refs),
+        len(waiting_refs), len(snapshot.events), len(event_refs))
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as out:
+        out.write(header)
+        for column in (
+                [c.num_items() for c in customers],
+                [c.get_item_time() for c in customers],
+                [c.arrival_time for c in customers],
+                [c.store_arrival_time for c in customers]):
+            out.write(array('q', column).tobytes())
+        for column in (name_offsets, line_open, line_peaks, line_offsets,
+                       line_refs, waiting_refs, kinds, times, args,
+                       event_offsets, event_refs):
+            out.write(column.tobytes())
+        out.write(names)
+    os.replace(temp_path, path)
+
+
+def read_snapshot(path: str) -> Snapshot:
+    """Повертає знімок, записаний у файл <path> функцією write_snapshot.
+    """
+    with open(path, 'rb') as snapshot_file:
+        data = snapshot_file.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(path + ' is not a simulation snapshot')
+    (_, num_customers, total_time, max_wait, consumed, capacity_version,
+     nc, names_size, nl, nlr, nw, ne, ner) = HEADER.unpack_from(data)
+    pos = HEADER.size
+    columns = []
+    for size in (nc, nc, nc, nc, nc + 1, nl, nl, nl + 1, nlr, nw, ne, ne, ne,
+                 ne + 1, ner):
+        column = array('q')
+        column.frombytes(data[pos:pos + 8 * size])
+        columns.append(column)
+        pos += 8 * size
+    (items, item_times, arrivals, store_arrivals, name_offsets, line_open,
+     line_peaks, line_offsets, line_refs, waiting_refs, kinds, times, args,
+     event_offsets, event_refs) = columns
+    names = data[pos:pos + names_size]
+
+    customers = []
+    for i in range(nc):
+        customer = Customer.from_totals(
+            str(names[name_offsets[i]:name_offsets[i + 1]], 'utf-8'),
+            items[i], item_times[i])
+        customer.arrival_time = arrivals[i]
+        customer.store_arrival_time = store_arrivals[i]
+        customers.append(customer)
+    lines = []
+    for i in range(nl):
+        queue = [customers[r]
+                 for r in line_refs[line_offsets[i]:line_offsets[i + 1]]]
+        lines.append((bool(line_open[i]), line_peaks[i], queue))
+    events = []
+    for i in range(ne):
+        refs = [customers[r]
+                for r in event_refs[event_offsets[i]:event_offsets[i + 1]]]
+        if kinds[i] == ARRIVAL:
+            events.append(CustomerArrival(times[i], refs[0]))
+        elif kinds[i] == WAITING:
+            events.append(CustomersWaiting(times[i], refs, args[i]))
+        elif kinds[i] == STARTED:
+            events.append(CheckoutStarted(times[i], args[i]))
+        else:
+            events.append(CheckoutCompleted(times[i], args[i], refs[0]))
+    stats = {'num_customers': num_customers, 'total_time': total_time,
+             'max_wait': max_wait}
+    return Snapshot(stats, consumed, capacity_version, lines,
+                    [customers[r] for r in waiting_refs], events)
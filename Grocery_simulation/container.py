@@ -5,7 +5,9 @@
 """
 
 from __future__ import annotations
-from typing import Any, List
+from typing import Any, Callable, Deque, List, Optional, Tuple
+from collections import deque
+import heapq
 
 
 class Container:
@@ -30,6 +32,11 @@ class Container:
         """
         raise NotImplementedError('Implemented in a subclass')
 
+    def peek(self) -> Any:
+        """Повертання предмета, який наступним видалить remove().
+        """
+        raise NotImplementedError('Implemented in a subclass')
+
 
 class PriorityQueue(Container):
     """Черга елементів, яка працює в пріоритетному порядку.
@@ -44,28 +51,84 @@ class PriorityQueue(Container):
 
     Якщо x < y, то x має *ВИЩИЙ* пріоритет, ніж y.
 
+    Якщо задано ключ key, пріоритет елемента — це key(елемент), обчислений
+    під час додавання, і елементи порівнюються лише через ключі.  Для
+    подій симуляції ключем є мітка часу (event.EVENT_ORDER): цілі числа
+    порівнюються значно швидше, ніж методи порівняння Event.
+
     Усі об’єкти в контейнері мають бути одного типу.
 
+    Додавання і видалення виконуються за O(log n).
+
     === Приватні атрибути ===
-    _items: елементи, що зберігаються в черзі пріоритету.
+    _key: функція, що повертає пріоритет елемента, або None, якщо
+     пріоритетом є сам елемент.
+    _items: двійкова купа трійок (пріоритет, порядковий номер вставки,
+     елемент).
+    _counter: порядковий номер для наступного доданого елемента.
 
     === Інваріанти подання ===
-    _items — це відсортований список, де першим є елемент із
-     найвищий пріоритет.
+    _items — це мін-купа (heapq), де _items[0] містить елемент із
+     найвищим пріоритетом.
+    Порядкові номери в _items унікальні, тому з двох рівних елементів
+     першим видаляється той, що був доданий раніше, і самі елементи
+     ніколи не порівнюються, якщо задано key.
     """
-    _items: List
+    _key: Optional[Callable[[Any], Any]]
+    _items: List[Tuple[Any, int, Any]]
+    _counter: int
+
+    def __init__(self, key: Optional[Callable[[Any], Any]] = None) -> None:
+        """Ініціалізування порожної черги PriorityQueue з ключем
+        пріоритету <key>.
 
-    def __init__(self) -> None:
-        """Ініціалізування порожної черги PriorityQueue.
+        >>> pq = PriorityQueue(key=len)
+        >>> pq.add('ccc')
+        >>> pq.add('a')
+        >>> pq.remove()
+        'a'
         """
+        self._key = key
         self._items = []
+        self._counter = 0
+
+    def __len__(self) -> int:
+        """Повертає кількість елементів у цій черзі.
+
+        >>> pq = PriorityQueue()
+        >>> pq.add(3)
+        >>> len(pq)
+        1
+        """
+        return len(self._items)
 
     def remove(self) -> Any:
         """Видалення та повернення наступного елемента із цієї черги пріоритетів.
 
          Передумова: <self> не має бути порожнім.
+
+        >>> pq = PriorityQueue()
+        >>> pq.add(2)
+        >>> pq.add(1)
+        >>> pq.remove()
+        1
         """
-        return self._items.pop(0)
+        return heapq.heappop(self._items)[2]
+
+    def peek(self) -> Any:
+        """Повертає наступний елемент цієї черги, не видаляючи його.
+
+         Передумова: <self> не має бути порожнім.
+
+        >>> pq = PriorityQueue()
+        >>> pq.add(2)
+        >>> pq.add(1)
+        >>> pq.peek()
+        1
+        >>> len(pq)
+        2
+        """
+        return self._items[0][2]
 
     def is_empty(self) -> bool:
         """
@@ -78,17 +141,167 @@ class PriorityQueue(Container):
         """Додавання <item> до цієї черги PriorityQueue
 
         """
-        temp_items = self._items.copy()
-        if not self._items:
-            self._items.append(item)
-            return None
+        if self._key is None:
+            heapq.heappush(self._items, (item, self._counter, item))
         else:
-            for element in temp_items:
-                if item < element:
-                    self._items.insert(self._items.index(element), item)
-                    return None
-            self._items.append(item)
-            return None
+            heapq.heappush(self._items,
+                           (self._key(item), self._counter, item))
+        self._counter += 1
+
+
+class CalendarQueue(Container):
+    """Черга подій із цілими мітками часу на основі колеса часу.
+
+    Елементи видаляються у порядку зростання атрибута timestamp, нічия
+    вирішується в порядку FIFO, так само як у PriorityQueue.
+
+    Колесо має <width> кошиків; кошик t % width містить елементи з міткою
+    часу t для всіх t з вікна [_cursor, _cursor + width). Елементи з
+    пізнішими мітками чекають у купі _overflow і переносяться в колесо,
+    коли вікно доходить до них. Тому додавання елемента в межах вікна і
+    видалення виконуються за амортизований O(1).
+
+    Вікно зсувається лише під час remove; peek запам’ятовує знайдений
+    кошик у _scan, не зсуваючи вікна, тож елементи, додані після peek з
+    меншою міткою часу, ніж у знайденого, потрапляють просто у свій кошик.
+    Додавання з міткою часу, меншою за _cursor, зсуває вікно назад за
+    O(width).
+
+    Черга швидша за PriorityQueue, коли в ній багато подій із близькими
+    мітками часу; якщо подій мало і вони рідкі, перегляд порожніх кошиків
+    коштує більше, ніж операції купи.
+
+    Усі елементи повинні мати цілий невід’ємний атрибут timestamp.
+
+    === Приватні атрибути ===
+    _width: кількість кошиків у колесі.
+    _wheel: кошики колеса, кожен — черга FIFO.
+    _cursor: найменша мітка часу, яку може містити колесо.
+    _wheel_count: кількість елементів у колесі.
+    _overflow: купа трійок (мітка часу, порядковий номер, елемент) для
+     елементів поза вікном колеса.
+    _counter: порядковий номер для наступного елемента в _overflow.
+    _scan: мітка часу, з якої peek шукає перший непорожній кошик.
+
+    === Інваріанти подання ===
+    Кожен елемент у _wheel має мітку часу з [_cursor, _cursor + _width).
+    Кожен елемент у _overflow має мітку часу >= _cursor + _width.
+    _cursor <= _scan, і кошики міток часу з [_cursor, _scan) порожні.
+    """
+    _width: int
+    _wheel: List[Deque[Any]]
+    _cursor: int
+    _wheel_count: int
+    _overflow: List[Tuple[int, int, Any]]
+    _counter: int
+    _scan: int
+
+    def __init__(self, width: int = 256) -> None:
+        """Ініціалізування порожньої черги CalendarQueue з <width> кошиками.
+
+        Передумова: width > 0.
+        """
+        self._width = width
+        self._wheel = [deque() for _ in range(width)]
+        self._cursor = 0
+        self._wheel_count = 0
+        self._overflow = []
+        self._counter = 0
+        self._scan = 0
+
+    def __len__(self) -> int:
+        """Повертає кількість елементів у цій черзі.
+        """
+        return self._wheel_count + len(self._overflow)
+
+    def is_empty(self) -> bool:
+        """Повертає True, якщо ця CalendarQueue порожня.
+        """
+        return self._wheel_count == 0 and not self._overflow
+
+    def add(self, item: Any) -> None:
+        """Додавання <item> до цієї черги CalendarQueue.
+        """
+        t = item.timestamp
+        if t < self._scan:
+            if t < self._cursor:
+                if self.is_empty():
+                    self._cursor = t
+                else:
+                    self._rewind(t)
+            self._scan = t
+        if t < self._cursor + self._width:
+            self._wheel[t % self._width].append(item)
+            self._wheel_count += 1
+        else:
+            heapq.heappush(self._overflow, (t, self._counter, item))
+            self._counter += 1
+
+    def remove(self) -> Any:
+        """Видалення та повернення елемента з найменшою міткою часу.
+
+         Передумова: <self> не має бути порожнім.
+        """
+        if self._wheel_count == 0:
+            self._cursor = self._scan = self._overflow[0][0]
+            self._migrate()
+        wheel = self._wheel
+        width = self._width
+        t = self._scan
+        bucket = wheel[t % width]
+        while not bucket:
+            t += 1
+            bucket = wheel[t % width]
+        if t != self._cursor:
+            self._cursor = self._scan = t
+            if self._overflow and self._overflow[0][0] < t + width:
+                self._migrate()
+        self._wheel_count -= 1
+        return bucket.popleft()
+
+    def peek(self) -> Any:
+        """Повертає наступний елемент цієї черги, не видаляючи його.
+
+         Передумова: <self> не має бути порожнім.
+        """
+        if self._wheel_count == 0:
+            return self._overflow[0][2]
+        wheel = self._wheel
+        width = self._width
+        t = self._scan
+        bucket = wheel[t % width]
+        while not bucket:
+            t += 1
+            bucket = wheel[t % width]
+        self._scan = t
+        return bucket[0]
+
+    def _migrate(self) -> None:
+        """Переносить у колесо всі елементи з _overflow, що потрапили у вікно.
+        """
+        limit = self._cursor + self._width
+        while self._overflow and self._overflow[0][0] < limit:
+            t, _, item = heapq.heappop(self._overflow)
+            self._wheel[t % self._width].append(item)
+            self._wheel_count += 1
+
+    def _rewind(self, t: int) -> None:
+        """Зсуває вікно колеса назад так, щоб воно починалося з <t>.
+
+         Елементи колеса повертаються в _overflow у поточному порядку,
+         тому порядок FIFO для нічиїх зберігається.
+        """
+        for i in range(self._width):
+            slot = self._wheel[(self._cursor + i) % self._width]
+            while slot:
+                item = slot.popleft()
+                heapq.heappush(self._overflow,
+                               (item.timestamp, self._counter, item))
+                self._counter += 1
+        self._wheel_count = 0
+        self._cursor = t
+        self._scan = t
+        self._migrate()
 
 
 if __name__ == '__main__':
@@ -96,5 +309,6 @@ if __name__ == '__main__':
     doctest.testmod()
     import python_ta
     python_ta.check_all(config={
-        'allowed-import-modules': ['__future__', 'typing',
+        'allowed-import-modules': ['__future__', 'typing', 'heapq',
+                                   'collections',
                                    'python_ta', 'doctest']})
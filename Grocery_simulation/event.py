@@ -3,8 +3,25 @@
 
 """
 from __future__ import annotations
-from typing import List, TextIO
-from store import Customer, Item
+from typing import Deque, Iterator, List, TextIO, Tuple
+from collections import deque
+import heapq
+import itertools
+import operator
+import tempfile
+from store import Customer, Item, EXPRESS_LIMIT
+
+# Коди типів подій (атрибут kind); за ними цикл симуляції вибирає обробник
+# з таблиці, а знімки стану записують тип події.
+ARRIVAL = 0
+WAITING = 1
+STARTED = 2
+COMPLETED = 3
+CLOSE = 4
+
+# Ключ упорядкування подій у PriorityQueue: події порівнюються як цілі
+# мітки часу, без виклику методів порівняння Event.
+EVENT_ORDER = operator.attrgetter('timestamp')
 
 
 class Event:
@@ -16,9 +33,15 @@ class Event:
 
     Цей клас є абстрактним; підкласи повинні реалізовувати do().
 
+    Події мають __slots__, тож не мають словника атрибутів.
+
     Атрибути-timestamp: мітка часу для цієї події.
+    kind: код типу події, наприклад ARRIVAL; однаковий для всіх подій
+    класу.
     """
+    __slots__ = ('timestamp',)
     timestamp: int
+    kind: int = -1
 
     def __init__(self, timestamp: int) -> None:
         """Ініціалізація події з заданою міткою часу.
@@ -83,7 +106,9 @@ class CustomerArrival(Event):
     """Клієнт приходить до каси, готовий починати оплату.
      клієнт: клієнт, що прибуває
     """
+    __slots__ = ('customer',)
     customer: Customer
+    kind = ARRIVAL
 
     def __init__(self, timestamp: int, c: Customer) -> None:
         """ Ініціалізуйте подію CustomerArrival за допомогою <timestamp> і клієнта <c>.
@@ -93,11 +118,16 @@ class CustomerArrival(Event):
 
     def do(self, store: "GroceryStore") -> List[Event]:
         """ Призначає прибулого клієнта до черги в <store>.
+
+        Якщо жодна черга не може прийняти клієнта, він переходить до зали
+        очікування і повторить спробу наступної секунди.
         """
         line_number = store.enter_line(self.customer)
         self.customer.arrival_time = self.timestamp
         if line_number == -1:
-            return [CustomerArrival(self.timestamp + 1, self.customer)]
+            store.wait(self.customer)
+            return [CustomersWaiting(self.timestamp + 1, [self.customer],
+                                     store.get_capacity_version())]
         if store.line_is_ready(line_number):
             return [CheckoutStarted(self.timestamp, line_number)]
         else:
@@ -109,6 +139,167 @@ class CustomerArrival(Event):
         return self.customer.name + ' arrives at ' + str(self.timestamp)
 
 
+class CustomersWaiting(Event):
+    """Клієнти із зали очікування повторюють спробу стати в чергу.
+
+     Одна така подія замінює ланцюжок повторних CustomerArrival для групи
+     клієнтів, чиї спроби йдуть підряд, і має те саме місце в черзі подій,
+     що й перша з цих спроб.  Клієнти групи пробують стати в чергу в
+     порядку групи, але лише якщо після їхньої останньої спроби в
+     магазині звільнилося місце; інакше спроба напевно невдала.
+
+     Клієнти групи зберігаються у двох чергах FIFO: ті, кого може прийняти
+     експрес-каса, і решта.  Під час спроби черги не звільняються, тож
+     після першої невдачі клієнта решта клієнтів того самого класу теж
+     не стане в чергу, а після невдачі клієнта, якого приймає
+     експрес-каса, — ніхто.  Тому спроба коштує O(кількість клієнтів, що
+     стали в чергу), а не O(розмір групи).
+
+     Атрибути-customers: клієнти групи в порядку спроб (копія).
+     version: лічильник звільнень місць магазину на момент останньої
+     спроби групи.
+     attempts: кількість викликів GroceryStore.enter_line під час
+     останнього виконання do.
+
+     Приватні атрибути-_small, _large: пари (порядковий номер, клієнт) для
+     клієнтів, яких може і не може прийняти експрес-каса, у порядку
+     спроб.
+     _low, _high: номер, не більший за найменший порядковий номер у
+     групі, і номер, що отримає наступний клієнт у кінці групи.
+    """
+    __slots__ = ('version', 'attempts', '_small', '_large', '_low', '_high')
+    version: int
+    attempts: int
+    _small: Deque[Tuple[int, Customer]]
+    _large: Deque[Tuple[int, Customer]]
+    _low: int
+    _high: int
+    kind = WAITING
+
+    def __init__(self, timestamp: int, customers: List[Customer],
+                 version: int) -> None:
+        """Ініціалізуйте подію CustomersWaiting за допомогою <timestamp>,
+         клієнтів <customers> і лічильника <version>.
+        """
+        Event.__init__(self, timestamp)
+        self.version = version
+        self.attempts = 0
+        self._small = deque()
+        self._large = deque()
+        self._low = 0
+        self._high = 0
+        for customer in customers:
+            self._append(customer)
+
+    @property
+    def customers(self) -> List[Customer]:
+        """Повертає клієнтів групи в порядку спроб.
+
+        Обидві черги вже впорядковані, тож sorted лише зливає дві серії за
+        лінійний час, і робить це швидше за heapq.merge.
+        """
+        return [customer for _, customer in sorted(
+            [*self._small, *self._large], key=operator.itemgetter(0))]
+
+    def __len__(self) -> int:
+        """Повертає кількість клієнтів у групі.
+        """
+        return len(self._small) + len(self._large)
+
+    def _append(self, customer: Customer) -> None:
+        """Додає <customer> у кінець групи.
+        """
+        if customer.num_items() <= EXPRESS_LIMIT:
+            self._small.append((self._high, customer))
+        else:
+            self._large.append((self._high, customer))
+        self._high += 1
+
+    def _prepend(self, customer: Customer) -> None:
+        """Додає <customer> на початок групи.
+        """
+        self._low -= 1
+        if customer.num_items() <= EXPRESS_LIMIT:
+            self._small.appendleft((self._low, customer))
+        else:
+            self._large.appendleft((self._low, customer))
+
+    def merge(self, other: CustomersWaiting) -> None:
+        """Приєднує до цієї групи групу <other>, чиї спроби йдуть одразу
+         після спроб цієї групи.
+
+         Клієнти меншої групи переносяться в більшу, тож злиття коштує
+         O(розмір меншої групи).
+        """
+        if len(self) < len(other):
+            for customer in reversed(self.customers):
+                other._prepend(customer)
+            self._small, self._large = other._small, other._large
+            self._low, self._high = other._low, other._high
+        else:
+            for customer in other.customers:
+                self._append(customer)
+        self.version = min(self.version, other.version)
+
+    def _later(self, version: int) -> CustomersWaiting:
+        """Повертає наступну спробу цієї групи через секунду з лічильником
+         <version>; клієнти спільні з цією подією.
+        """
+        event = CustomersWaiting.__new__(CustomersWaiting)
+        event.timestamp = self.timestamp + 1
+        event.version = version
+        event.attempts = 0
+        event._small = self._small
+        event._large = self._large
+        event._low = self._low
+        event._high = self._high
+        return event
+
+    def do(self, store: "GroceryStore") -> List[Event]:
+        """Повторює спроби клієнтів групи стати в чергу в <store>.
+        """
+        version = store.get_capacity_version()
+        self.attempts = 0
+        if version == self.version:
+            return [self._later(version)]
+        new_events = []
+        small = self._small
+        large = self._large
+        small_left = True
+        large_left = True
+        while True:
+            if small_left and small and not (large_left and large and
+                                             large[0][0] < small[0][0]):
+                queue = small
+            elif large_left and large:
+                queue = large
+            else:
+                break
+            customer = queue[0][1]
+            self.attempts += 1
+            line_number = store.enter_line(customer)
+            if line_number == -1:
+                if queue is small:
+                    break
+                large_left = False
+                continue
+            queue.popleft()
+            customer.arrival_time = self.timestamp
+            store.leave_waiting_room(customer)
+            if store.line_is_ready(line_number):
+                new_events.append(CheckoutStarted(self.timestamp,
+                                                  line_number))
+        if small or large:
+            new_events.append(self._later(version))
+        return new_events
+
+    def __str__(self) -> str:
+        """ Повертає рядок Представлення об'єкта
+        """
+        return ', '.join(c.name for c in self.customers) + \
+            ' keep waiting at ' + str(self.timestamp)
+
+
 class CheckoutStarted(Event):
     """Клієнт починає процес оформлення замовлення.
 
@@ -117,7 +308,9 @@ class CheckoutStarted(Event):
 
      Атрибути-line_number: номер касового рядка.
     """
+    __slots__ = ('line_number',)
     line_number: int
+    kind = STARTED
 
     def __init__(self, timestamp: int, line_number: int) -> None:
         """Ініціалізування події CheckoutStarted за допомогою <timestamp> і
@@ -149,8 +342,10 @@ class CheckoutCompleted(Event):
      Атрибути-line_number: номер касового рядка.
      замовник-Замовник обробки.
     """
+    __slots__ = ('line_number', 'customer')
     line_number: int
     customer: Customer
+    kind = COMPLETED
 
     def __init__(self, timestamp: int, line_number: int, c: Customer) -> None:
         """Ініціалізація події CheckoutCompleted за допомогою <timestamp>, <line_number>, і клієнта <c>.
@@ -180,7 +375,9 @@ class CloseLine(Event):
 
      Атрибути-line_number: номер касового рядка.
     """
+    __slots__ = ('line_number',)
     line_number: int
+    kind = CLOSE
 
     def __init__(self, timestamp: int, line_number: int) -> None:
         """Ініціалізування подію CloseLine за допомогою <timestamp> і <line_number>.
@@ -191,7 +388,8 @@ class CloseLine(Event):
     def do(self, store: "GroceryStore") -> List[Event]:
         """Закриває рядок line_number і повертає події new customer.
         """
-        remaining_customers = store.close_line(self.line_number)[::-1]
+        remaining_customers = reversed(
+            store.close_line_queue(self.line_number))
         new_events = []
         for customer in remaining_customers:
             new_events.append(CustomerArrival(self.timestamp, customer))
@@ -205,26 +403,134 @@ class CloseLine(Event):
                ' closed at ' + str(self.timestamp)
 
 
+def do_arrivals(arrivals: List[CustomerArrival],
+                store: "GroceryStore") -> List[List[Event]]:
+    """Виконує події CustomerArrival <arrivals> з однаковою міткою часу, що
+    йдуть підряд, і повертає події, створені кожною з них.
+
+    Результат такий самий, як у послідовних викликів do, але клієнти
+    стають у черги одним викликом GroceryStore.enter_lines.
+    """
+    timestamp = arrivals[0].timestamp
+    version = store.get_capacity_version()
+    customers = [arrival.customer for arrival in arrivals]
+    result = []
+    for customer, (line_number, is_first) in zip(
+            customers, store.enter_lines(customers)):
+        customer.arrival_time = timestamp
+        if line_number == -1:
+            store.wait(customer)
+            result.append([CustomersWaiting(timestamp + 1, [customer],
+                                            version)])
+        elif is_first:
+            result.append([CheckoutStarted(timestamp, line_number)])
+        else:
+            result.append([])
+    return result
+
+
 def create_event_list(event_file: TextIO) -> List[Event]:
     """Повертає список подій на основі необробленого списку подій у <event_file>.
     """
-    file = [event.strip('\n').split() for event in event_file]
-    events = []
-    for line in file:
-        if line[1] == 'Arrive':
-            time = int(line[0])
-            customer_name = line[2]
-            items = []
-            i = 3
-            while i < len(line):
-                items.append(Item(line[i], int(line[i+1])))
-                i += 2
-            events.append(CustomerArrival(time, Customer(customer_name, items)))
-        else:
-            time = int(line[0])
-            line_index = int(line[2])
-            events.append(CloseLine(time, line_index))
-    return events
+    return list(iter_events(event_file))
+
+
+def parse_event(line: List[str]) -> Event:
+    """Повертає подію, описану рядком файлу подій, розбитим на слова <line>.
+
+    >>> print(parse_event('3 Arrive Ann Gum 1 Milk 4'.split()))
+    Ann arrives at 3
+    >>> print(parse_event('7 Close 2'.split()))
+    Line 2 closed at 7
+    """
+    if line[1] == 'Arrive':
+        time = int(line[0])
+        customer_name = line[2]
+        items = []
+        i = 3
+        while i < len(line):
+            items.append(Item(line[i], int(line[i+1])))
+            i += 2
+        return CustomerArrival(time, Customer(customer_name, items))
+    else:
+        time = int(line[0])
+        line_index = int(line[2])
+        return CloseLine(time, line_index)
+
+
+def iter_events(event_file: TextIO) -> Iterator[Event]:
+    """Повертає події з <event_file> по одній, у порядку рядків файлу.
+
+    Порожні рядки пропускаються.
+    """
+    for line in event_file:
+        words = line.split()
+        if words:
+            yield parse_event(words)
+
+
+def iter_sorted_events(event_file: TextIO,
+                       chunk_size: int = 100000) -> Iterator[Event]:
+    """Повертає події з <event_file> по одній у порядку зростання міток часу;
+    події з однаковою міткою часу йдуть у порядку рядків файлу.
+
+    Якщо файл уже впорядкований за часом, події читаються прямо з нього.
+    Інакше файл сортується зовнішнім сортуванням злиттям: частини по
+    <chunk_size> рядків сортуються в пам’яті, записуються в тимчасові
+    файли і зливаються.
+
+    >>> from io import StringIO
+    >>> events = iter_sorted_events(StringIO('5 Close 0\\n2 Close 1\\n'))
+    >>> [e.timestamp for e in events]
+    [2, 5]
+    """
+    if event_file.seekable():
+        start = event_file.tell()
+        is_sorted = _is_time_sorted(event_file)
+        event_file.seek(start)
+        if is_sorted:
+            yield from iter_events(event_file)
+            return
+    chunks = []
+    try:
+        while True:
+            lines = [line for line in itertools.islice(event_file, chunk_size)
+                     if line.split()]
+            if not lines:
+                break
+            lines.sort(key=_line_timestamp)
+            if not chunks and len(lines) < chunk_size:
+                for line in lines:
+                    yield parse_event(line.split())
+                return
+            chunk = tempfile.TemporaryFile('w+', encoding='utf-8')
+            chunk.writelines(line.rstrip('\n') + '\n' for line in lines)
+            chunk.seek(0)
+            chunks.append(chunk)
+        for line in heapq.merge(*chunks, key=_line_timestamp):
+            yield parse_event(line.split())
+    finally:
+        for chunk in chunks:
+            chunk.close()
+
+
+def _line_timestamp(line: str) -> int:
+    """Повертає мітку часу рядка <line> файлу подій.
+    """
+    return int(line.split(None, 1)[0])
+
+
+def _is_time_sorted(event_file: TextIO) -> bool:
+    """Повертає True, якщо мітки часу в <event_file> не спадають.
+    """
+    previous = None
+    for line in event_file:
+        if line.split():
+            time = _line_timestamp(line)
+            if previous is not None and time < previous:
+                return False
+            previous = time
+    return True
 
 
 if __name__ == '__main__':
@@ -232,5 +538,6 @@ if __name__ == '__main__':
     doctest.testmod()
     import python_ta
     python_ta.check_all(config={
-        'allowed-import-modules': ['__future__', 'typing', 'store',
+        'allowed-import-modules': ['__future__', 'typing', 'store', 'heapq',
+                                   'itertools', 'operator', 'tempfile',
                                    'python_ta', 'doctest']})
@@ -0,0 +1,180 @@
+"""
+Цей модуль містить генератор синтетичних файлів подій для великих
+вимірювань швидкодії.
+
+Події генеруються потоком у порядку зростання міток часу, тому навіть
+файли з мільйонами подій пишуться без зберігання їх у пам’яті.
+
+Запуск:
+    python generator.py --customers 1000000 --seed 1 --out big.txt
+"""
+from __future__ import annotations
+from typing import Callable, Iterator, Optional, Sequence, TextIO, Tuple, \
+    Union
+import argparse
+import math
+import random
+import sys
+from event import Event, CustomerArrival, CloseLine
+from store import Customer, Item, EXPRESS_LIMIT
+
+PRODUCTS = ['Bananas', 'Bread', 'Cheese', 'Chips', 'Fish', 'Flowers', 'Gum',
+            'Lettuce', 'Meat', 'Milk', 'Pop', 'Radish']
+
+# Подія генератора: (мітка часу, ім’я клієнта і його товари) для прибуття
+# або (мітка часу, номер рядка) для закриття каси.
+RawEvent = Tuple[int, Union[Tuple[str, list], int]]
+
+
+def daily_curve(base_rate: float, peak_rate: float,
+                day_length: int = 86400) -> Callable[[float], float]:
+    """Повертає інтенсивність прибуттів за часом доби: <base_rate> клієнтів
+    за секунду на початку і в кінці доби тривалістю <day_length> і
+    <peak_rate> опівдні.
+
+    >>> curve = daily_curve(1.0, 3.0, 100)
+    >>> curve(0), curve(50)
+    (1.0, 3.0)
+    """
+    def rate(t: float) -> float:
+        """Повертає інтенсивність прибуттів у момент <t>."""
+        phase = 2 * math.pi * (t % day_length) / day_length
+        return base_rate + (peak_rate - base_rate) * (1 - math.cos(phase)) / 2
+    return rate
+
+
+def iter_raw_workload(num_customers: int, seed: int = 0,
+                      rate: Union[float, Callable[[float], float]] = 1.0,
+                      max_rate: Optional[float] = None,
+                      express_share: float = 0.5, max_items: int = 20,
+                      item_time: Tuple[int, int] = (1, 10),
+                      closes: Sequence[Tuple[int, int]] = ()) \
+        -> Iterator[RawEvent]:
+    """Повертає події навантаження з <num_customers> клієнтів у порядку
+    зростання міток часу.
+
+    Прибуття утворюють пуассонівський процес з інтенсивністю <rate>
+    клієнтів за секунду.  Якщо <rate> — функція часу, процес неоднорідний
+    і генерується проріджуванням; тоді <max_rate> — її верхня межа.
+    Частка <express_share> клієнтів має не більше EXPRESS_LIMIT товарів,
+    решта — від EXPRESS_LIMIT + 1 до <max_items>.  Час кожного товару
+    рівномірно розподілений на відрізку <item_time>.  <closes> — пари
+    (мітка часу, номер рядка) закриття кас; кілька пар з однією міткою
+    часу утворюють хвилю закриттів.  Закриття йдуть раніше за прибуття з
+    тією ж міткою часу.
+
+    Однаковий <seed> дає однакові події.
+    """
+    rng = random.Random(seed)
+    if callable(rate):
+        if max_rate is None:
+            raise ValueError('max_rate is required for a rate curve')
+        intensity = rate
+        bound = max_rate
+    else:
+        intensity = None
+        bound = rate
+    pending_closes = sorted(closes)
+    close_index = 0
+    t = 0.0
+    for i in range(num_customers):
+        t += rng.expovariate(bound)
+        while intensity is not None and rng.random() * bound > intensity(t):
+            t += rng.expovariate(bound)
+        timestamp = int(t)
+        while close_index < len(pending_closes) and \
+                pending_closes[close_index][0] <= timestamp:
+            yield pending_closes[close_index]
+            close_index += 1
+        if rng.random() < express_share:
+            count = rng.randint(1, EXPRESS_LIMIT)
+        else:
+            count = rng.randint(EXPRESS_LIMIT + 1,
+                                max(max_items, EXPRESS_LIMIT + 1))
+        items = [(rng.choice(PRODUCTS), rng.randint(*item_time))
+                 for _ in range(count)]
+        yield timestamp, ('C' + str(i), items)
+    for close in pending_closes[close_index:]:
+        yield close
+
+
+def iter_workload(num_customers: int, seed: int = 0, **kwargs) \
+        -> Iterator[Event]:
+    """Повертає події навантаження з тими самими параметрами, що й у
+    iter_raw_workload, як об’єкти Event для GroceryStoreSimulation.run_events.
+    """
+    for timestamp, body in iter_raw_workload(num_customers, seed, **kwargs):
+        if isinstance(body, int):
+            yield CloseLine(timestamp, body)
+        else:
+            name, items = body
+            yield CustomerArrival(
+                timestamp,
+                Customer(name, [Item(product, time) for product, time in items]))
+
+
+def write_workload(out: TextIO, num_customers: int, seed: int = 0,
+                   **kwargs) -> int:
+    """Записує події навантаження з тими самими параметрами, що й у
+    iter_raw_workload, у файл подій <out>.  Повертає кількість подій.
+    """
+    count = 0
+    for timestamp, body in iter_raw_workload(num_customers, seed, **kwargs):
+        if isinstance(body, int):
+            out.write(str(timestamp) + ' Close ' + str(body) + '\n')
+        else:
+            name, items = body
+            out.write(str(timestamp) + ' Arrive ' + name + ' ' +
+                      ' '.join(product + ' ' + str(time)
+                               for product, time in items) + '\n')
+        count += 1
+    return count
+
+
+def parse_close(text: str) -> Tuple[int, int]:
+    """Повертає пару (мітка часу, номер рядка) із запису виду ЧАС:РЯДОК.
+
+    >>> parse_close('600:2')
+    (600, 2)
+    """
+    time, line = text.split(':')
+    return int(time), int(line)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Розбирає аргументи командного рядка <argv> і записує навантаження.
+    """
+    parser = argparse.ArgumentParser(
+        description='Generate a synthetic grocery store event file.')
+    parser.add_argument('--customers', type=int, required=True)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rate', type=float, default=1.0,
+                        help='arrivals per second (peak rate with --daily)')
+    parser.add_argument('--daily', type=float, default=None,
+                        metavar='BASE_RATE',
+                        help='use a time-of-day curve from BASE_RATE up to '
+                             '--rate at midday')
+    parser.add_argument('--express-share', type=float, default=0.5)
+    parser.add_argument('--max-items', type=int, default=20)
+    parser.add_argument('--item-time', type=int, nargs=2, default=[1, 10],
+                        metavar=('MIN', 'MAX'))
+    parser.add_argument('--close', type=parse_close, action='append',
+                        default=[], metavar='TIME:LINE')
+    parser.add_argument('--out', default='-',
+                        help='event file (default: stdout)')
+    args = parser.parse_args(argv)
+    kwargs = {'rate': args.rate, 'express_share': args.express_share,
+              'max_items': args.max_items,
+              'item_time': tuple(args.item_time), 'closes': args.close}
+    if args.daily is not None:
+        kwargs['rate'] = daily_curve(args.daily, args.rate)
+        kwargs['max_rate'] = max(args.daily, args.rate)
+    if args.out == '-':
+        write_workload(sys.stdout, args.customers, args.seed, **kwargs)
+    else:
+        with open(args.out, 'w') as out:
+            write_workload(out, args.customers, args.seed, **kwargs)
+
+
+if __name__ == '__main__':
+    main()
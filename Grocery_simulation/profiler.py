@@ -0,0 +1,203 @@
+"""
+Цей модуль містить необов’язкове профілювання циклу симуляції
+GroceryStoreSimulation.run_events.
+
+Профайлер рахує виконані події за класами, час у Event.do і в черзі подій,
+найбільшу довжину черги, повторні спроби клієнтів із зали очікування та
+кількість подій за секунду.  Без профайлера цикл симуляції виконується як
+зазвичай, без вимірювань часу.
+
+Приклад:
+    profiler = Profiler()
+    sim.run(event_file, profiler=profiler)
+    print(profiler.format_report())
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Sized
+import time
+from container import Container
+from event import Event, CustomersWaiting
+from store import GroceryStore
+
+
+class Profiler:
+    """Збирач статистики виконання однієї або кількох симуляцій.
+
+    === Атрибути ===
+    counts: кількість виконаних подій за назвою класу.
+    do_times: час у секундах, витрачений у Event.do, за назвою класу.
+    queue_time: час у секундах, витрачений в операціях черги подій.
+    peak_queue: найбільша кількість запланованих подій: у черзі подій і
+                серед уже вийнятих з неї подій поточної секунди.
+    retries: кількість повторних спроб клієнтів стати в чергу із зали
+             очікування, тобто викликів enter_line з CustomersWaiting.
+             Спроби, пропущені тому, що місце в магазині не звільнилося
+             або клієнт того самого класу вже не став у чергу, не
+             рахуються.
+    wall_time: загальний час симуляцій у секундах.
+    callback: функція, яку викликають після кожної події з цією подією і
+              часом її Event.do у секундах, або None.
+
+    === Приватні атрибути ===
+    _started: момент початку поточної симуляції за time.perf_counter.
+    """
+    counts: Dict[str, int]
+    do_times: Dict[str, float]
+    queue_time: float
+    peak_queue: int
+    retries: int
+    wall_time: float
+    callback: Optional[Callable[[Event, float], Any]]
+    _started: float
+
+    def __init__(self, callback: Optional[Callable[[Event, float], Any]]
+                 = None) -> None:
+        """Ініціалізація порожнього профайлера з функцією <callback>.
+        """
+        self.counts = {}
+        self.do_times = {}
+        self.queue_time = 0.0
+        self.peak_queue = 0
+        self.retries = 0
+        self.wall_time = 0.0
+        self.callback = callback
+        self._started = 0.0
+
+    def start(self) -> None:
+        """Позначає початок симуляції.
+        """
+        self._started = time.perf_counter()
+
+    def stop(self) -> None:
+        """Позначає кінець симуляції.
+        """
+        self.wall_time += time.perf_counter() - self._started
+
+    def do(self, event: Event, store: GroceryStore) -> List[Event]:
+        """Виконує <event> у магазині <store>, вимірюючи час Event.do, і
+        повертає створені події.
+        """
+        start = time.perf_counter()
+        spawns = event.do(store)
+        elapsed = time.perf_counter() - start
+        name = type(event).__name__
+        self.counts[name] = self.counts.get(name, 0) + 1
+        self.do_times[name] = self.do_times.get(name, 0.0) + elapsed
+        if isinstance(event, CustomersWaiting):
+            self.retries += event.attempts
+        if self.callback is not None:
+            self.callback(event, elapsed)
+        return spawns
+
+    def wrap(self, queue: Container, pending: Sized = ()) -> ProfiledQueue:
+        """Повертає чергу подій <queue>, операції якої вимірює цей профайлер.
+
+        <pending> — події, вийняті з <queue>, але ще не виконані; вони
+        входять у peak_queue.
+        """
+        return ProfiledQueue(queue, self, pending)
+
+    def observe_queue(self, length: int) -> None:
+        """Враховує <length> запланованих подій у peak_queue.
+        """
+        if length > self.peak_queue:
+            self.peak_queue = length
+
+    def num_events(self) -> int:
+        """Повертає загальну кількість виконаних подій.
+        """
+        return sum(self.counts.values())
+
+    def events_per_second(self) -> float:
+        """Повертає кількість виконаних подій за секунду симуляції.
+        """
+        if self.wall_time == 0:
+            return 0.0
+        return self.num_events() / self.wall_time
+
+    def report(self) -> Dict[str, Any]:
+        """Повертає зібрану статистику як словник для експорту, наприклад
+        у JSON.
+        """
+        return {'counts': dict(self.counts),
+                'do_times': dict(self.do_times),
+                'do_time': sum(self.do_times.values()),
+                'queue_time': self.queue_time,
+                'peak_queue': self.peak_queue,
+                'retries': self.retries,
+                'num_events': self.num_events(),
+                'wall_time': self.wall_time,
+                'events_per_second': self.events_per_second()}
+
+    def format_report(self) -> str:
+        """Повертає зібрану статистику як текст для друку.
+        """
+        lines = []
+        for name in sorted(self.counts):
+            lines.append('{:<20} {:>10} events {:>10.4f}s'.format(
+                name, self.counts[name], self.do_times[name]))
+        report = self.report()
+        lines.append('Event.do: {do_time:.4f}s, queue: {queue_time:.4f}s, '
+                     'total: {wall_time:.4f}s'.format(**report))
+        lines.append('peak queue: {peak_queue}, retries: {retries}, '
+                     '{events_per_second:.0f} events/s'.format(**report))
+        return '\n'.join(lines)
+
+
+class ProfiledQueue(Container):
+    """Черга подій, що передає операції іншій черзі й вимірює їхній час.
+
+    === Атрибути ===
+    queue: черга подій, якій передаються операції.
+    profiler: профайлер, до якого додається час операцій.
+    pending: події, вийняті з queue, але ще не виконані.
+    """
+    queue: Container
+    profiler: Profiler
+    pending: Sized
+
+    def __init__(self, queue: Container, profiler: Profiler,
+                 pending: Sized = ()) -> None:
+        """Ініціалізація черги, що передає операції черзі <queue>, з уже
+        вийнятими подіями <pending>.
+        """
+        self.queue = queue
+        self.profiler = profiler
+        self.pending = pending
+
+    def __len__(self) -> int:
+        """Повертає кількість подій у черзі.
+        """
+        return len(self.queue)
+
+    def add(self, item: Any) -> None:
+        """Додає <item> до черги.
+        """
+        start = time.perf_counter()
+        self.queue.add(item)
+        self.profiler.queue_time += time.perf_counter() - start
+        self.profiler.observe_queue(len(self.queue) + len(self.pending))
+
+    def remove(self) -> Any:
+        """Видаляє і повертає наступну подію.
+        """
+        start = time.perf_counter()
+        item = self.queue.remove()
+        self.profiler.queue_time += time.perf_counter() - start
+        return item
+
+    def is_empty(self) -> bool:
+        """Повертає True, якщо черга порожня.
+        """
+        start = time.perf_counter()
+        empty = self.queue.is_empty()
+        self.profiler.queue_time += time.perf_counter() - start
+        return empty
+
+    def peek(self) -> Any:
+        """Повертає наступну подію без видалення.
+        """
+        start = time.perf_counter()
+        item = self.queue.peek()
+        self.profiler.queue_time += time.perf_counter() - start
+        return item
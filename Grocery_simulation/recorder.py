@@ -0,0 +1,406 @@
+"""
+Цей модуль містить необов’язковий двійковий запис виконаних подій
+симуляції, читання такого запису і перевірку нової симуляції за записом.
+
+TraceWriter записує кожну виконану подію записом фіксованого розміру —
+чотири числа q (8 байтів у рідному порядку байтів):
+
+    kind, timestamp, arg, ref
+
+    ARRIVAL   — ref: клієнт
+    WAITING   — arg: Event.version, ref: кількість клієнтів групи; за ним
+                ідуть стільки ж записів MEMBER з ref клієнта
+    STARTED   — arg: номер каси
+    COMPLETED — arg: номер каси, ref: клієнт
+    CLOSE     — arg: номер каси
+
+Записи накопичуються в буфері і пишуться у файл великими блоками.  Клієнти
+нумеруються в порядку першої появи; їхні імена записуються один раз у кінці
+файлу, після записів:
+
+    name_offsets — q[nc + 1] межі імен у names
+    names        — байти     імена клієнтів у UTF-8
+
+Заголовок (MAGIC, кількість записів, кількість подій, кількість клієнтів,
+довжина names) заповнюється під час закриття файлу.
+
+TraceReader відтворює записані події, а отже і їхнє текстове
+представлення str(event).  TraceReplay перевіряє, що симуляція виконує ті
+самі події в тому самому порядку, що й записані.
+
+Приклад:
+    with TraceWriter('day.evlog') as recorder:
+        sim.run(event_file, recorder=recorder)
+    with TraceReplay('day.evlog') as replay:
+        new_sim.run(event_file, recorder=replay)
+
+Запуск: python recorder.py <запис подій>
+"""
+from __future__ import annotations
+from array import array
+from typing import Dict, Iterator, List, Optional
+import mmap
+import struct
+from event import Event, CustomerArrival, CustomersWaiting, CheckoutStarted, \
+    CheckoutCompleted, CloseLine, ARRIVAL, WAITING, STARTED, COMPLETED, CLOSE
+from store import Customer
+
+MAGIC = b'GSEVLOG1'
+HEADER = struct.Struct('=8s4q')
+# Запис клієнта групи очікування, що йде за записом WAITING.
+MEMBER = 5
+RECORD = struct.Struct('=4q')
+RECORD_FIELDS = 4
+_pack = RECORD.pack_into
+_SIZE = RECORD.size
+
+
+class TraceSink:
+    """Спостерігач, якому симуляція передає кожну виконану подію.
+
+    Цей клас є абстрактним; підкласи повинні реалізовувати record().
+    """
+
+    def record(self, event: Event) -> None:
+        """Враховує подію <event>, яка зараз виконається.
+        """
+        raise NotImplementedError
+
+
+class TraceWriter(TraceSink):
+    """Двійковий запис виконаних подій у файл.
+
+    Записи пакуються в буфер _buffer, який щоразу, коли заповнюється,
+    одним викликом write передається у файл.
+
+    === Атрибути ===
+    path: шлях до файлу запису.
+
+    === Приватні атрибути ===
+    _file: відкритий файл запису.
+    _buffer: буфер записів, ще не переданих у файл.
+    _pos: кількість зайнятих байтів _buffer.
+    _end: розмір _buffer у байтах.
+    _written: кількість записів, уже переданих у файл.
+    _members: кількість записів MEMBER.
+    _refs: номер кожного клієнта, що може ще з’явитися в подіях.
+    _names: ім’я кожного клієнта за його номером.
+    """
+    path: str
+    _buffer: bytearray
+    _pos: int
+    _end: int
+    _written: int
+    _members: int
+    _refs: Dict[Customer, int]
+    _names: List[str]
+
+    def __init__(self, path: str, buffer_size: int = 1 << 20) -> None:
+        """Відкриває файл <path> для запису подій блоками приблизно по
+        <buffer_size> байтів.
+        """
+        self.path = path
+        self._file = open(path, 'wb', buffering=0)
+        self._file.write(HEADER.pack(MAGIC, 0, 0, 0, 0))
+        self._end = max(buffer_size // _SIZE, 1) * _SIZE
+        self._buffer = bytearray(self._end)
+        self._pos = 0
+        self._written = 0
+        self._members = 0
+        self._refs = {}
+        self._names = []
+
+    def record(self, event: Event) -> None:
+        """Записує подію <event>.
+        """
+        kind = event.kind
+        pos = self._pos
+        if kind == STARTED or kind == CLOSE:
+            _pack(self._buffer, pos, kind, event.timestamp, event.line_number,
+                  0)
+        elif kind == ARRIVAL:
+            customer = event.customer
+            names = self._names
+            ref = len(names)
+            names.append(customer.name)
+            self._refs[customer] = ref
+            _pack(self._buffer, pos, ARRIVAL, event.timestamp, 0, ref)
+        elif kind == COMPLETED:
+            # Клієнт, що завершив оформлення, у подіях більше не з’явиться.
+            ref = self._refs.pop(event.customer, None)
+            if ref is None:
+                ref = len(self._names)
+                self._names.append(event.customer.name)
+            _pack(self._buffer, pos, COMPLETED, event.timestamp,
+                  event.line_number, ref)
+        elif kind == WAITING:
+            self._record_waiting(event)
+            return
+        else:
+            raise ValueError('cannot record ' + type(event).__name__)
+        pos += _SIZE
+        self._pos = pos
+        if pos == self._end:
+            self._flush()
+
+    def _record_waiting(self, event: CustomersWaiting) -> None:
+        """Записує групу очікування <event> і її клієнтів.
+        """
+        timestamp = event.timestamp
+        customers = event.customers
+        buffer = self._buffer
+        end = self._end
+        refs = self._refs
+        names = self._names
+        pos = self._pos
+        _pack(buffer, pos, WAITING, timestamp, event.version, len(customers))
+        pos += _SIZE
+        for customer in customers:
+            if pos == end:
+                self._pos = pos
+                self._flush()
+                pos = 0
+            ref = refs.get(customer)
+            if ref is None:
+                ref = len(names)
+                names.append(customer.name)
+                refs[customer] = ref
+            _pack(buffer, pos, MEMBER, timestamp, 0, ref)
+            pos += _SIZE
+        self._pos = pos
+        self._members += len(customers)
+        if pos == end:
+            self._flush()
+
+    def _flush(self) -> None:
+        """Передає накопичені записи у файл.
+        """
+        with memoryview(self._buffer) as view:
+            self._file.write(view[:self._pos])
+        self._written += self._pos // _SIZE
+        self._pos = 0
+
+    def close(self) -> None:
+        """Дописує імена клієнтів і заголовок та закриває файл.
+        """
+        if self._file.closed:
+            return
+        self._flush()
+        names = bytearray()
+        name_offsets = array('q', [0])
+        for name in self._names:
+            names += name.encode('utf-8')
+            name_offsets.append(len(names))
+        self._file.write(name_offsets.tobytes() + names)
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, self._written,
+                                     self._written - self._members,
+                                     len(self._names), len(names)))
+        self._file.close()
+        self._refs.clear()
+
+    def __enter__(self) -> TraceWriter:
+        """Повертає цей запис для використання в with.
+        """
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Закриває файл після with.
+        """
+        self.close()
+
+
+class TraceReader:
+    """Запис подій, відображений у пам’ять.
+
+    === Атрибути ===
+    records: записи файлу як memoryview над mmap, по RECORD_FIELDS чисел.
+
+    === Приватні атрибути ===
+    _events: кількість записаних подій.
+    _file: відкритий файл запису.
+    _map: відображення _file у пам’ять.
+    _view: memoryview над усім _map.
+    _name_offsets: межі імен у _names.
+    _names: таблиця імен клієнтів.
+    """
+    records: memoryview
+    _events: int
+    _view: memoryview
+    _name_offsets: memoryview
+    _names: memoryview
+
+    def __init__(self, path: str) -> None:
+        """Відкриває запис подій <path>, записаний TraceWriter.
+        """
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size or \
+                self._map[:len(MAGIC)] != MAGIC:
+            self._map.close()
+            self._file.close()
+            raise ValueError(path + ' is not an event trace')
+        _, n, self._events, nc, names_size = HEADER.unpack_from(self._map)
+        if min(n, self._events, nc, names_size) < 0 or self._events > n or \
+                len(self._map) != HEADER.size + 8 * (RECORD_FIELDS * n +
+                                                     nc + 1) + names_size:
+            self._map.close()
+            self._file.close()
+            raise ValueError(path + ' is truncated or corrupt')
+        view = memoryview(self._map)
+        self._view = view
+        pos = HEADER.size
+        size = 8 * RECORD_FIELDS * n
+        self.records = view[pos:pos + size].cast('q')
+        pos += size
+        self._name_offsets = view[pos:pos + 8 * (nc + 1)].cast('q')
+        pos += 8 * (nc + 1)
+        self._names = view[pos:pos + names_size]
+
+    def __len__(self) -> int:
+        """Повертає кількість записаних подій.
+        """
+        return self._events
+
+    def name(self, ref: int) -> str:
+        """Повертає ім’я клієнта з номером <ref>.
+        """
+        return str(self._names[self._name_offsets[ref]:
+                               self._name_offsets[ref + 1]], 'utf-8')
+
+    def iter_events(self) -> Iterator[Event]:
+        """Повертає записані події по одній у порядку виконання.
+
+        Клієнт з одним номером — це один об’єкт Customer, створений через
+        Customer.from_totals без товарів, доки він не завершить оформлення.
+        """
+        records = self.records
+        customers = {}
+
+        def customer(ref: int) -> Customer:
+            """Повертає клієнта з номером <ref>."""
+            if ref not in customers:
+                customers[ref] = Customer.from_totals(self.name(ref), 0, 0)
+            return customers[ref]
+
+        i = 0
+        while i < len(records):
+            kind, timestamp, arg, ref = records[i:i + RECORD_FIELDS]
+            i += RECORD_FIELDS
+            if kind == ARRIVAL:
+                yield CustomerArrival(timestamp, customer(ref))
+            elif kind == WAITING:
+                members = [customer(records[j + 3])
+                           for j in range(i, i + RECORD_FIELDS * ref,
+                                          RECORD_FIELDS)]
+                i += RECORD_FIELDS * ref
+                yield CustomersWaiting(timestamp, members, arg)
+            elif kind == STARTED:
+                yield CheckoutStarted(timestamp, arg)
+            elif kind == COMPLETED:
+                done = customer(ref)
+                del customers[ref]
+                yield CheckoutCompleted(timestamp, arg, done)
+            else:
+                yield CloseLine(timestamp, arg)
+
+    def iter_lines(self) -> Iterator[str]:
+        """Повертає текстове представлення записаних подій по одному рядку.
+        """
+        for event in self.iter_events():
+            yield str(event)
+
+    def close(self) -> None:
+        """Закриває файл.
+        """
+        for column in (self.records, self._name_offsets, self._names,
+                       self._view):
+            column.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> TraceReader:
+        """Повертає цей запис для використання в with.
+        """
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Закриває файл після with.
+        """
+        self.close()
+
+
+class TraceReplay(TraceSink):
+    """Перевірка симуляції за записом подій.
+
+    Кожна виконана подія порівнюється за текстовим представленням з
+    наступною записаною подією.  Перша розбіжність викликає ValueError з
+    номером події й обома представленнями.
+
+    === Атрибути ===
+    checked: кількість перевірених подій.
+
+    === Приватні атрибути ===
+    _reader: запис подій.
+    _expected: записані події, ще не перевірені.
+    """
+    checked: int
+    _reader: TraceReader
+    _expected: Iterator[Event]
+
+    def __init__(self, path: str) -> None:
+        """Відкриває запис подій <path> для перевірки.
+        """
+        self.checked = 0
+        self._reader = TraceReader(path)
+        self._expected = self._reader.iter_events()
+
+    def record(self, event: Event) -> None:
+        """Перевіряє, що подія <event> — наступна записана подія.
+        """
+        expected = next(self._expected, None)
+        actual = str(event)
+        if expected is None:
+            raise ValueError('event ' + str(self.checked) +
+                             ' is not in the trace: got ' + repr(actual))
+        if str(expected) != actual:
+            raise ValueError('event ' + str(self.checked) +
+                             ' differs: recorded ' + repr(str(expected)) +
+                             ', got ' + repr(actual))
+        self.checked += 1
+
+    def finish(self) -> None:
+        """Перевіряє, що всі записані події виконано.
+        """
+        if self.checked != len(self._reader):
+            raise ValueError('trace has ' + str(len(self._reader)) +
+                             ' events, but only ' + str(self.checked) +
+                             ' were executed')
+
+    def close(self) -> None:
+        """Закриває запис подій.
+        """
+        self._expected = iter([])
+        self._reader.close()
+
+    def __enter__(self) -> TraceReplay:
+        """Повертає цю перевірку для використання в with.
+        """
+        return self
+
+    def __exit__(self, exc_type: Optional[type], *args: object) -> None:
+        """Закриває запис після with; якщо винятку не було, перевіряє, що
+        всі записані події виконано.
+        """
+        try:
+            if exc_type is None:
+                self.finish()
+        finally:
+            self.close()
+
+
+if __name__ == '__main__':
+    import sys
+    with TraceReader(sys.argv[1]) as trace:
+        for line in trace.iter_lines():
+            print(line)
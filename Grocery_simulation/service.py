@@ -0,0 +1,209 @@
+"""
+Цей модуль містить асинхронний сервіс живої симуляції магазину.
+
+Події Arrive і Close надходять по одній — через асинхронну чергу в тому ж
+процесі (SimulationService) або через локальний сокет (serve) — і
+симуляція просувається щоразу, коли надходить подія.  Завершені
+оформлення (CheckoutCompleted) повертаються потоком.  Черги сервісу
+обмежені, тож повільний споживач результатів пригальмовує подачу подій, а
+пам’ять сервісу не росте.
+
+Протокол сокета — рядки тексту.  Клієнт надсилає рядки файлу подій,
+рядки «Advance T» (подій раніше за T більше не буде) і рядок «End»
+(або закриває запис).  Сервіс надсилає рядок str(CheckoutCompleted) для
+кожного завершеного оформлення, рядок «ERROR повідомлення» для
+неправильного рядка і наприкінці рядок «STATS» зі статистикою в JSON.
+
+Запуск:
+    python service.py --config input_files/config_111_10.json --port 8765
+"""
+from __future__ import annotations
+from typing import Any, AsyncIterator, Dict, Optional, Sequence, Tuple
+from io import StringIO
+import argparse
+import asyncio
+import json
+from event import Event, CheckoutCompleted, parse_event
+from simulation import GroceryStoreSimulation
+from streaming_stats import StatsCollector
+
+# Повідомлення вхідної черги сервісу: ('event', подія), ('advance', мітка
+# часу) або ('end', None).
+Message = Tuple[str, Any]
+
+
+class SimulationService:
+    """Жива симуляція магазину з асинхронними чергами подій і результатів.
+
+    === Атрибути ===
+    stats: статистика симуляції після завершення або None.
+    collector: збирач статистики симуляції або None.
+
+    === Приватні атрибути ===
+    _sim: симуляція магазину.
+    _inbox: обмежена черга повідомлень для симуляції.
+    _outbox: обмежена черга завершених оформлень; None позначає кінець.
+    """
+    stats: Optional[Dict[str, Any]]
+    collector: Optional[StatsCollector]
+    _sim: GroceryStoreSimulation
+    _inbox: asyncio.Queue
+    _outbox: asyncio.Queue
+
+    def __init__(self, sim: GroceryStoreSimulation, max_pending: int = 1024,
+                 collector: Optional[StatsCollector] = None) -> None:
+        """Ініціалізація сервісу для симуляції <sim>.  Кожна черга сервісу
+        містить не більше <max_pending> елементів.
+        """
+        self.stats = None
+        self.collector = collector
+        self._sim = sim
+        self._inbox = asyncio.Queue(max_pending)
+        self._outbox = asyncio.Queue(max_pending)
+
+    async def submit(self, event: Event) -> None:
+        """Подає початкову подію <event>; чекає, якщо вхідна черга повна.
+
+        Передумова: мітки часу поданих подій не спадають.
+        """
+        await self._inbox.put(('event', event))
+
+    async def advance(self, timestamp: int) -> None:
+        """Повідомляє, що подій раніше за <timestamp> більше не буде.
+        """
+        await self._inbox.put(('advance', timestamp))
+
+    async def close(self) -> None:
+        """Повідомляє, що подій більше не буде.
+        """
+        await self._inbox.put(('end', None))
+
+    async def results(self) -> AsyncIterator[CheckoutCompleted]:
+        """Повертає завершені оформлення в порядку часу, доки симуляція не
+        завершиться.
+        """
+        while True:
+            event = await self._outbox.get()
+            if event is None:
+                return
+            yield event
+
+    async def run(self) -> Dict[str, Any]:
+        """Виконує симуляцію, доки не буде викликано close, і повертає її
+        статистику.
+
+        Якщо мітка часу поданої події менша за мітку часу попередньої або
+        подія закриває касу, якої немає, виникає ValueError, і сервіс
+        зупиняється.  Якщо споживач результатів перестав їх читати, run
+        чекає на нього; скасування run зупиняє сервіс без очікування.
+        """
+        self._sim.start_live(self.collector)
+        ended = False
+        try:
+            while True:
+                kind, value = await self._inbox.get()
+                if kind == 'event':
+                    completed = self._sim.feed(value)
+                elif kind == 'advance':
+                    completed = self._sim.advance(value)
+                else:
+                    completed, self.stats = self._sim.finish_live()
+                for event in completed:
+                    await self._outbox.put(event)
+                if kind == 'end':
+                    await self._outbox.put(None)
+                    ended = True
+                    return self.stats
+        finally:
+            if not ended:
+                self._end_results()
+
+    def _end_results(self) -> None:
+        """Позначає кінець результатів, не чекаючи на споживача: якщо черга
+        результатів повна, найстаріший непрочитаний результат відкидається.
+        """
+        while True:
+            try:
+                self._outbox.put_nowait(None)
+                return
+            except asyncio.QueueFull:
+                self._outbox.get_nowait()
+
+
+async def handle_connection(config: str, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+    """Обслуговує одне з’єднання сокета: симулює магазин з конфігурацією
+    <config> для подій, прочитаних з <reader>, і пише результати в <writer>.
+
+    Кожне з’єднання має власну симуляцію.  Після кожного рядка сервіс
+    чекає, поки клієнт прочитає результати (writer.drain), тому повільний
+    клієнт пригальмовує сам себе.
+    """
+    sim = GroceryStoreSimulation(StringIO(config))
+    sim.start_live()
+    try:
+        while True:
+            line = await reader.readline()
+            words = line.decode('utf-8').split()
+            if not words:
+                if not line:
+                    break
+                continue
+            if words[0] == 'End':
+                break
+            # Рядок розбирається повністю до того, як симуляція його
+            # виконає; feed відхиляє неправильну подію, не змінюючи стану.
+            try:
+                if words[0] == 'Advance':
+                    completed = sim.advance(int(words[1]))
+                else:
+                    completed = sim.feed(parse_event(words))
+            except (ValueError, IndexError) as error:
+                writer.write(b'ERROR ' + str(error).encode('utf-8') + b'\n')
+                completed = []
+            for event in completed:
+                writer.write(str(event).encode('utf-8') + b'\n')
+            await writer.drain()
+        completed, stats = sim.finish_live()
+        for event in completed:
+            writer.write(str(event).encode('utf-8') + b'\n')
+        writer.write(b'STATS ' + json.dumps(stats).encode('utf-8') + b'\n')
+        await writer.drain()
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def serve(config: str, host: str = '127.0.0.1',
+                port: int = 8765) -> asyncio.AbstractServer:
+    """Запускає сервер живої симуляції магазину з конфігурацією <config>
+    (текст JSON) на <host>:<port> і повертає його.
+    """
+    return await asyncio.start_server(
+        lambda reader, writer: handle_connection(config, reader, writer),
+        host, port)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Розбирає аргументи командного рядка <argv> і запускає сервер.
+    """
+    parser = argparse.ArgumentParser(
+        description='Serve a live grocery store simulation over a socket.')
+    parser.add_argument('--config', required=True,
+                        help='store config JSON file')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args(argv)
+    with open(args.config) as config_file:
+        config = config_file.read()
+
+    async def run_server() -> None:
+        """Обслуговує з’єднання, доки процес не зупинять."""
+        server = await serve(config, args.host, args.port)
+        async with server:
+            await server.serve_forever()
+    asyncio.run(run_server())
+
+
+if __name__ == '__main__':
+    main()
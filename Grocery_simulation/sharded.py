@@ -0,0 +1,276 @@
+"""
+Цей модуль містить паралельну симуляцію мережі магазинів, що не впливають
+один на одного.
+
+Файл подій мережі — це файл подій, у якому перед кожним рядком стоїть
+ідентифікатор магазину:
+
+    store_7 12 Arrive Ann Gum 1 Milk 4
+    store_2 15 Close 0
+
+Файл подій мережі ділиться на файли подій окремих магазинів, магазини
+розподіляються між процесами так, щоб кожен процес отримав приблизно
+однакову кількість подій, і кожен магазин симулюється своєю
+GroceryStoreSimulation.  Статистика магазинів зливається в статистику
+мережі; процентилі часу очікування мережі обчислюються злиттям скетчів
+QuantileSketch магазинів.
+
+Запуск:
+    python sharded.py --configs stores.json --trace chain.txt --out out.json
+
+stores.json — словник: ідентифікатор магазину -> конфігурація магазину.
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Optional, Sequence, TextIO, \
+    Tuple
+import argparse
+import heapq
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+from event import Event, CustomerArrival, iter_sorted_events
+from simulation import GroceryStoreSimulation
+from streaming_stats import QuantileSketch, StatsCollector
+
+# Завдання одного процесу: (ідентифікатор магазину, конфігурація, шлях до
+# файлу подій) для кожного магазину.
+Shard = List[Tuple[str, Dict[str, int], str]]
+# Назва товарів клієнтів, для яких відомі лише кількість товарів і загальний
+# час оформлення.
+ITEM_NAME = 'Item'
+
+
+def split_trace(trace_file: TextIO, directory: str,
+                store_ids: Iterable[str],
+                buffer_lines: int = 65536) -> Dict[str, Tuple[str, int]]:
+    """Ділить файл подій мережі <trace_file> на файли подій магазинів
+    <store_ids> у каталозі <directory>.
+
+    Рядки накопичуються в пам’яті й дописуються у файли магазинів, щойно
+    їх набирається <buffer_lines>, тому одночасно відкритий не більше ніж
+    один файл магазину, хоч би скільки було магазинів.
+
+    Повертає для кожного магазину пару (шлях до файлу подій, кількість
+    подій).  Порожні рядки пропускаються.  Якщо магазину з рядка немає в
+    <store_ids>, виникає ValueError.
+    """
+    paths = {}
+    for i, store_id in enumerate(store_ids):
+        paths[store_id] = os.path.join(directory, str(i) + '.txt')
+        open(paths[store_id], 'w').close()
+    buffers = {store_id: [] for store_id in paths}
+    counts = dict.fromkeys(paths, 0)
+    buffered = 0
+    for line in trace_file:
+        parts = line.split(None, 1)
+        if not parts:
+            continue
+        store_id = parts[0]
+        if store_id not in buffers:
+            raise ValueError('no config for store ' + store_id)
+        buffers[store_id].append(parts[1] if len(parts) > 1 else '\n')
+        counts[store_id] += 1
+        buffered += 1
+        if buffered >= buffer_lines:
+            _flush_lines(paths, buffers)
+            buffered = 0
+    _flush_lines(paths, buffers)
+    return {store_id: (paths[store_id], counts[store_id])
+            for store_id in paths}
+
+
+def _flush_lines(paths: Dict[str, str],
+                 buffers: Dict[str, List[str]]) -> None:
+    """Дописує накопичені рядки <buffers> кожного магазину в його файл
+    подій з <paths> і очищає їх.
+    """
+    for store_id, lines in buffers.items():
+        if lines:
+            with open(paths[store_id], 'a') as store_file:
+                store_file.write(''.join(lines))
+            lines.clear()
+
+
+def balance(counts: Dict[str, int], shards: int) -> List[List[str]]:
+    """Розподіляє магазини з кількостями подій <counts> між <shards>
+    частинами так, щоб кількості подій частин були якомога ближчими.
+
+    Магазини розглядаються від найбільшого до найменшого, і кожен
+    дістається частині з найменшою кількістю подій.  Порожні частини не
+    повертаються.
+
+    >>> balance({'a': 10, 'b': 6, 'c': 5, 'd': 1}, 2)
+    [['a', 'd'], ['b', 'c']]
+    """
+    heap = [(0, i) for i in range(shards)]
+    result = [[] for _ in range(shards)]
+    for store_id in sorted(counts, key=lambda s: (-counts[s], s)):
+        total, i = heapq.heappop(heap)
+        result[i].append(store_id)
+        heapq.heappush(heap, (total + counts[store_id], i))
+    return [shard for shard in result if shard]
+
+
+def run_sharded(configs: Dict[str, Dict[str, int]], trace_file: TextIO,
+                processes: Optional[int] = None) -> Dict[str, Any]:
+    """Симулює магазини мережі з конфігураціями <configs> для файлу подій
+    мережі <trace_file> у пулі з <processes> процесів (за замовчуванням —
+    усі ядра).
+
+    Повертає словник зі статистикою кожного магазину ('stores') і
+    статистикою мережі ('chain').
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as directory:
+        files = split_trace(trace_file, directory, configs)
+        shards = balance({store_id: count
+                          for store_id, (_, count) in files.items()},
+                         processes)
+        tasks = [[(store_id, configs[store_id], files[store_id][0])
+                  for store_id in shard] for shard in shards]
+        with multiprocessing.Pool(min(processes, len(tasks) or 1)) as pool:
+            results = pool.map(run_shard, tasks)
+    return merge_results([row for shard in results for row in shard])
+
+
+def run_shard(shard: Shard) -> List[Tuple[str, Dict[str, Any],
+                                          QuantileSketch]]:
+    """Симулює магазини частини <shard> по черзі.
+
+    Повертає для кожного магазину трійку (ідентифікатор, статистика,
+    скетч часу очікування).
+    """
+    results = []
+    for store_id, config, path in shard:
+        sim = GroceryStoreSimulation(config)
+        collector = StatsCollector()
+        with open(path) as event_file:
+            stats = sim.run(event_file, collector=collector)
+        results.append((store_id, stats, collector.waits))
+    return results
+
+
+def merge_results(results: List[Tuple[str, Dict[str, Any], QuantileSketch]]) \
+        -> Dict[str, Any]:
+    """Зливає результати run_shard у статистику магазинів і мережі.
+    """
+    stores = {}
+    waits = QuantileSketch()
+    chain = {'stores': 0, 'num_customers': 0, 'total_time': 0,
+             'max_wait': -1}
+    for store_id, stats, sketch in sorted(results, key=lambda r: r[0]):
+        stores[store_id] = stats
+        waits.merge(sketch)
+        chain['stores'] += 1
+        chain['num_customers'] += stats['num_customers']
+        chain['total_time'] = max(chain['total_time'], stats['total_time'])
+        chain['max_wait'] = max(chain['max_wait'], stats['max_wait'])
+    chain.update({'mean_wait': waits.mean(),
+                  'p50_wait': waits.quantile(0.5),
+                  'p95_wait': waits.quantile(0.95),
+                  'p99_wait': waits.quantile(0.99)})
+    return {'stores': stores, 'chain': chain}
+
+
+def write_chain_trace(event_files: Dict[str, TextIO], out: TextIO) -> int:
+    """Записує файли подій магазинів <event_files> (ідентифікатор магазину
+    -> файл подій) у файл подій мережі <out> у порядку зростання міток
+    часу.  Повертає кількість записаних подій.
+    """
+    return write_chain_events({store_id: iter_sorted_events(event_file)
+                               for store_id, event_file
+                               in event_files.items()}, out)
+
+
+def write_chain_events(events: Dict[str, Iterable[Event]],
+                       out: TextIO) -> int:
+    """Записує початкові події магазинів <events> (ідентифікатор магазину
+    -> події в порядку зростання міток часу), наприклад з
+    BinaryTrace.iter_events(), у файл подій мережі <out> у порядку
+    зростання міток часу.  Повертає кількість записаних подій.
+    """
+    def tagged(store_id: str, store_events: Iterable[Event]) \
+            -> Iterable[tuple]:
+        """Повертає події магазину як трійки (мітка часу, ідентифікатор
+        магазину, подія)."""
+        for event in store_events:
+            yield event.timestamp, store_id, event
+    count = 0
+    streams = [tagged(store_id, store_events)
+               for store_id, store_events in events.items()]
+    for _, store_id, event in heapq.merge(*streams, key=lambda e: e[0]):
+        out.write(store_id + ' ' + _event_line(event) + '\n')
+        count += 1
+    return count
+
+
+def _event_line(event: Event) -> str:
+    """Повертає рядок файлу подій для події <event>.
+
+    Для клієнта, створеного Customer.from_totals, товари невідомі, тому
+    записуються товари ITEM_NAME з тією ж кількістю і загальним часом
+    оформлення.
+    """
+    if isinstance(event, CustomerArrival):
+        customer = event.customer
+        items = customer.get_items()
+        if items is None:
+            times = _item_times(customer.num_items(),
+                                customer.get_item_time())
+            items = [ITEM_NAME + ' ' + str(time) for time in times]
+        else:
+            items = [item.name + ' ' + str(item.get_time())
+                     for item in items]
+        return ' '.join([str(event.timestamp), 'Arrive', customer.name]
+                        + items)
+    return str(event.timestamp) + ' Close ' + str(event.line_number)
+
+
+def _item_times(num_items: int, item_time: int) -> List[int]:
+    """Повертає час оформлення кожного з <num_items> товарів із загальним
+    часом <item_time>, розподіленим якомога рівніше.
+
+    >>> _item_times(3, 8)
+    [3, 3, 2]
+    """
+    if num_items == 0:
+        if item_time != 0:
+            raise ValueError('a customer without items has checkout time ' +
+                             str(item_time))
+        return []
+    share, extra = divmod(item_time, num_items)
+    return [share + 1] * extra + [share] * (num_items - extra)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Розбирає аргументи командного рядка <argv> і запускає симуляцію
+    мережі.
+    """
+    parser = argparse.ArgumentParser(
+        description='Simulate a chain of independent grocery stores in '
+                    'parallel.')
+    parser.add_argument('--configs', required=True,
+                        help='JSON file mapping store ids to store configs')
+    parser.add_argument('--trace', required=True,
+                        help='chain event file with a store id column')
+    parser.add_argument('--out', default='-',
+                        help='JSON file for results (default: stdout)')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='number of worker processes (default: all cores)')
+    args = parser.parse_args(argv)
+    with open(args.configs) as config_file:
+        configs = json.load(config_file)
+    with open(args.trace) as trace_file:
+        results = run_sharded(configs, trace_file, args.processes)
+    if args.out == '-':
+        json.dump(results, sys.stdout, indent=2)
+    else:
+        with open(args.out, 'w') as out:
+            json.dump(results, out, indent=2)
+
+
+if __name__ == '__main__':
+    main()
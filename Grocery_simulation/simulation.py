@@ -3,10 +3,19 @@
 
 """
 from __future__ import annotations
-from typing import Dict, Any, TextIO
-from event import create_event_list, CustomerArrival, CheckoutCompleted
-from store import GroceryStore
-from container import PriorityQueue
+from typing import Deque, Dict, Any, Iterable, Iterator, List, Optional, \
+    TextIO, Tuple, Type
+from collections import deque
+import itertools
+from checkpoint import Snapshot, drain_events, read_snapshot, write_snapshot
+from event import iter_sorted_events, do_arrivals, Event, CustomerArrival, \
+    CheckoutCompleted, CustomersWaiting, ARRIVAL, WAITING, STARTED, \
+    COMPLETED, CLOSE, EVENT_ORDER
+from store import ConfigSource, GroceryStore
+from container import Container, PriorityQueue
+from profiler import Profiler
+from recorder import TraceSink
+from streaming_stats import StatsCollector
 
 
 class GroceryStoreSimulation:
@@ -18,50 +27,578 @@ class GroceryStoreSimulation:
 
      Приватні атрибути 
      _events: послідовність подій, упорядкованих за пріоритетом, визначеним подією
-              порядок сортування.
+              порядок сортування.  За замовчуванням це PriorityQueue з
+              ключем EVENT_ORDER; для магазинів з багатьма касами, де в
+              черзі багато подій із близькими мітками часу, можна обрати
+              CalendarQueue.
      _store: магазин, що моделюється.
+     _initial: початкові події з файлу подій, які ще не прочитано, у
+               порядку зростання міток часу.
+     _next_initial: наступна прочитана початкова подія або None, якщо
+                    початкові події закінчилися.
+     _tick: події поточної секунди з черги подій, що ще не виконані, у
+            порядку FIFO.
+     _stats: статистика поточної симуляції.
+     _consumed: кількість виконаних початкових подій.
+     _checkpoint_path: файл для знімків стану або None, якщо знімки не
+                       потрібні.
+     _checkpoint_interval: кількість подій між знімками стану.
+     _executed: кількість подій, виконаних поточним циклом симуляції.
+     _live: True, якщо триває жива симуляція (start_live), у якій наступні
+            початкові події ще не надійшли.
+     _watermark: у живій симуляції — мітка часу, раніше за яку початкових
+                 подій більше не буде.
+     _deferred: група очікування, наступну спробу якої можна запланувати
+                лише після надходження наступної початкової події, або None.
+     _collector: збирач статистики поточної симуляції або None.
+     _recorder: спостерігач, якому передається кожна виконана подія
+                поточної симуляції, або None.
+
+     Початкові події не додаються до _events: вони читаються з файлу по одній
+     і виконуються раніше за події з _events з тією ж міткою часу, так само
+     як якби їх додали до _events до початку симуляції.
+
+     Події секунди виконуються пакетом: коли черга подій доходить до нової
+     секунди, усі її події цієї секунди переносяться в _tick.  Подія,
+     створена на ту саму секунду, що й подія, яка її створила, додається в
+     кінець _tick, не проходячи через _events; якщо _tick порожня, спершу
+     туди переносяться події цієї секунди з _events.  Тому CheckoutStarted
+     ніколи не потрапляє в _events: оформлення кожного клієнта додає до
+     _events лише CheckoutCompleted, яку CheckoutStarted планує одразу, щойно
+     черга цієї секунди доходить до неї.  Початкові події CustomerArrival
+     однієї секунди, що йдуть підряд, виконуються разом функцією
+     do_arrivals.  Порядок виконання подій такий самий, як без пакетів.
+
+     Якщо події не спостерігають ні профайлер, ні збирач статистики, а
+     CheckoutStarted — єдина подія, створена подією, і має виконатися
+     одразу після неї, CheckoutStarted виконується в тому ж кроці: щойно
+     каса готова, оформлення починається і CheckoutCompleted планується
+     без окремого проходу циклу.  Профайлер і збирач статистики бачать
+     кожну CheckoutStarted окремо.
+
+     Цикл симуляції розрізняє події за кодом типу Event.kind: обробник,
+     що виконується перед Event.do, береться з таблиці _BEFORE_DO.
+
+     Одну симуляцію можна запускати багато разів: run_events і start_live
+     спершу повертають її в початковий стан методом reset, не читаючи
+     конфігурацію заново і не створюючи нових кас.
     """
-    _events: PriorityQueue
+    _events: Container
     _store: GroceryStore
+    _initial: Iterator[Event]
+    _next_initial: Optional[Event]
+    _tick: Deque[Event]
+    _stats: Dict[str, Any]
+    _consumed: int
+    _checkpoint_path: Optional[str]
+    _checkpoint_interval: int
+    _executed: int
+    _live: bool
+    _watermark: int
+    _deferred: Optional[CustomersWaiting]
+    _collector: Optional[StatsCollector]
+    _recorder: Optional[TraceSink]
 
-    def __init__(self, store_file: TextIO) -> None:
+    def __init__(self, store_file: ConfigSource,
+                 queue_class: Optional[Type[Container]] = None,
+                 checkpoint_path: Optional[str] = None,
+                 checkpoint_interval: int = 100000) -> None:
         """Ініціалізація GroceryStoreSimulation за допомогою конфігурації <store_file>.
+
+        Замість файлу конфігурації можна передати словник з ключами файлу
+        або StoreConfig.
+
+        <queue_class> — клас черги подій, наприклад CalendarQueue; за
+        замовчуванням — PriorityQueue, що порівнює мітки часу подій.  Якщо задано <checkpoint_path>, після кожних
+        <checkpoint_interval> подій стан симуляції записується в цей файл,
+        і з нього симуляцію можна продовжити методом resume.
         """
-        self._events = PriorityQueue()
+        if queue_class is None:
+            self._events = PriorityQueue(EVENT_ORDER)
+        else:
+            self._events = queue_class()
         self._store = GroceryStore(store_file)
+        self._initial = iter([])
+        self._next_initial = None
+        self._tick = deque()
+        self._stats = {'num_customers': 0, 'total_time': 0, 'max_wait': -1}
+        self._consumed = 0
+        self._checkpoint_path = checkpoint_path
+        self._checkpoint_interval = checkpoint_interval
+        self._executed = 0
+        self._live = False
+        self._watermark = 0
+        self._deferred = None
+        self._collector = None
+        self._recorder = None
 
-    def run(self, file: TextIO) -> Dict[str, Any]:
+    def reset(self) -> None:
+        """Повертає симуляцію в стан до першої події: магазин порожній,
+         черга подій порожня, статистика початкова.
+        """
+        self._store.reset()
+        while not self._events.is_empty():
+            self._events.remove()
+        self._tick.clear()
+        self._initial = iter([])
+        self._next_initial = None
+        self._stats = {'num_customers': 0, 'total_time': 0, 'max_wait': -1}
+        self._consumed = 0
+        self._executed = 0
+        self._live = False
+        self._watermark = 0
+        self._deferred = None
+        self._collector = None
+        self._recorder = None
+
+    def run(self, file: TextIO, profiler: Optional[Profiler] = None,
+            collector: Optional[StatsCollector] = None,
+            recorder: Optional[TraceSink] = None) -> Dict[str, Any]:
         """Запустіть симуляцію подій, збережених у <initial_events>.
 
          Повертає словник, що містить статистику дослідження
         """
-        #Ініціалізація статистики
-        stats = {
-            'num_customers': 0,
-            'total_time': 0,
-            'max_wait': -1
-        }
-        max_waits = dict()
-        initial_event_list = create_event_list(file)
+        return self.run_events(iter_sorted_events(file), profiler, collector,
+                               recorder)
 
-        for event in initial_event_list:
-            self._events.add(event)
-            if isinstance(event, CustomerArrival):
-                stats['num_customers'] += 1
-                max_waits[event.customer] = event.timestamp
+    def run_events(self, initial_events: Iterable[Event],
+                   profiler: Optional[Profiler] = None,
+                   collector: Optional[StatsCollector] = None,
+                   recorder: Optional[TraceSink] = None) \
+            -> Dict[str, Any]:
+        """Запустіть симуляцію початкових подій <initial_events>, наприклад
+         з BinaryTrace.iter_events().
+
+         Передумова: мітки часу <initial_events> не спадають.
+
+         Якщо задано <profiler>, він збирає статистику виконання подій.
+         Якщо задано <collector>, він збирає процентилі часу очікування і
+         завантаженість кас.  Якщо задано <recorder>, наприклад TraceWriter
+         або TraceReplay, йому передається кожна подія перед виконанням.
+
+         Повертає словник, що містить статистику дослідження
+        """
+        self.reset()
+        return self._start(initial_events, profiler, collector, recorder)
+
+    def resume(self, checkpoint_path: str, file: TextIO,
+               profiler: Optional[Profiler] = None,
+               collector: Optional[StatsCollector] = None,
+               recorder: Optional[TraceSink] = None) -> Dict[str, Any]:
+        """Продовжує симуляцію подій з <file> зі знімка <checkpoint_path>.
+
+         Повертає ту саму статистику, що й run без перерви.
+        """
+        return self.resume_events(checkpoint_path, iter_sorted_events(file),
+                                  profiler, collector, recorder)
+
+    def resume_events(self, checkpoint_path: str,
+                      initial_events: Iterable[Event],
+                      profiler: Optional[Profiler] = None,
+                      collector: Optional[StatsCollector] = None,
+                      recorder: Optional[TraceSink] = None) \
+            -> Dict[str, Any]:
+        """Продовжує симуляцію початкових подій <initial_events> зі знімка
+         <checkpoint_path>, записаного симуляцією тих самих подій у
+         магазині з тією самою конфігурацією.
+
+         Початкові події, виконані до знімка, пропускаються.  <profiler>,
+         <collector> і <recorder> бачать лише продовжену частину.
 
+         Повертає ту саму статистику, що й run_events без перерви.
+        """
+        snapshot = read_snapshot(checkpoint_path)
+        return self.run_from(snapshot,
+                             itertools.islice(initial_events,
+                                              snapshot.consumed, None),
+                             profiler, collector, recorder)
+
+    def run_from(self, snapshot: Snapshot, initial_events: Iterable[Event],
+                 profiler: Optional[Profiler] = None,
+                 collector: Optional[StatsCollector] = None,
+                 recorder: Optional[TraceSink] = None) \
+            -> Dict[str, Any]:
+        """Відновлює стан <snapshot> і продовжує симуляцію початковими
+         подіями <initial_events>, що йдуть після знімка.
+
+         Знімок використовується без копіювання: його клієнти й події
+         стають частиною цієї симуляції.
+
+         Повертає статистику всієї симуляції.
+        """
+        self._store.restore_state(snapshot.lines, snapshot.waiting,
+                                  snapshot.capacity_version)
         while not self._events.is_empty():
-            event = self._events.remove()
-            if isinstance(event, CheckoutCompleted):
-                max_waits[event.customer] = event.timestamp -   \
-                                            max_waits[event.customer]
+            self._events.remove()
+        self._tick.clear()
+        for event in snapshot.events:
+            self._events.add(event)
+        self._stats = snapshot.stats
+        self._consumed = snapshot.consumed
+        self._live = False
+        self._deferred = snapshot.deferred
+        return self._start(initial_events, profiler, collector, recorder)
+
+    def get_snapshot(self) -> Snapshot:
+        """Повертає поточний стан симуляції між подіями.
+
+         Знімок посилається на клієнтів і події цієї симуляції.
+        """
+        return Snapshot(dict(self._stats), self._consumed,
+                        self._store.get_capacity_version(),
+                        self._store.get_line_states(),
+                        self._store.get_waiting(),
+                        list(self._tick) + drain_events(self._events),
+                        self._deferred)
+
+    def save_checkpoint(self, path: str) -> None:
+        """Записує поточний стан симуляції у файл <path>.
+
+         Стан записується між подіями, тому його можна зберегти, наприклад,
+         із функції зворотного виклику Profiler.
+        """
+        write_snapshot(self.get_snapshot(), path)
+
+    def _start(self, initial_events: Iterable[Event],
+               profiler: Optional[Profiler],
+               collector: Optional[StatsCollector],
+               recorder: Optional[TraceSink]) -> Dict[str, Any]:
+        """Запускає цикл симуляції з <profiler>, якщо його задано.
+        """
+        if profiler is not None:
+            events = self._events
+            self._events = profiler.wrap(events, self._tick)
+            profiler.start()
+            try:
+                return self._run(initial_events, profiler, collector,
+                                 recorder)
+            finally:
+                profiler.stop()
+                self._events = events
+        return self._run(initial_events, None, collector, recorder)
+
+    def _run(self, initial_events: Iterable[Event],
+             profiler: Optional[Profiler],
+             collector: Optional[StatsCollector],
+             recorder: Optional[TraceSink]) -> Dict[str, Any]:
+        """Виконує цикл симуляції для run_events.
+        """
+        checkpoint_path = self._checkpoint_path
+        next_checkpoint = self._checkpoint_interval
+        self._executed = 0
+        self._collector = collector
+        self._recorder = recorder
+        self._initial = iter(initial_events)
+        self._next_initial = next(self._initial, None)
+        if self._deferred is not None:
+            deferred = self._deferred
+            self._deferred = None
+            self._add_waiting(deferred)
+        if collector is not None:
+            collector.start(self._store)
+
+        while self._step(profiler) is not None:
+            if checkpoint_path is not None and \
+                    self._executed >= next_checkpoint:
+                self.save_checkpoint(checkpoint_path)
+                next_checkpoint = self._executed + self._checkpoint_interval
+
+        # Клієнти, які так і не стали в чергу, не завершують оформлення і
+        # не мають часу очікування; якщо таких клієнтів немає, max_wait
+        # залишається -1.
+        if collector is not None:
+            collector.finish(self._store)
+        return self._stats
+
+    def start_live(self, collector: Optional[StatsCollector] = None,
+                   recorder: Optional[TraceSink] = None) -> None:
+        """Починає живу симуляцію, у якій початкові події надходять по одній
+         методом feed.  Якщо задано <collector>, він збирає процентилі часу
+         очікування і завантаженість кас; якщо задано <recorder>, йому
+         передається кожна подія перед виконанням.
+        """
+        self.reset()
+        self._live = True
+        self._collector = collector
+        self._recorder = recorder
+        if collector is not None:
+            collector.start(self._store)
+
+    def feed(self, event: Event) -> List[CheckoutCompleted]:
+        """Виконує початкову подію живої симуляції <event> і всі події, які
+         мають виконатися до неї.
+
+         Повертає події CheckoutCompleted, виконані під час цього виклику.
+
+         Якщо мітка часу <event> менша за мітку часу попередньої поданої
+         події або <event> закриває касу, якої немає, виникає ValueError, і
+         стан симуляції не змінюється.
+        """
+        if event.timestamp < self._watermark:
+            raise ValueError('event at ' + str(event.timestamp) +
+                             ' is older than ' + str(self._watermark))
+        if event.kind == CLOSE and not \
+                0 <= event.line_number < len(self._store.get_line_kinds()):
+            raise ValueError('there is no line ' + str(event.line_number))
+        self._watermark = event.timestamp
+        self._next_initial = event
+        return self._run_live()
+
+    def advance(self, timestamp: int) -> List[CheckoutCompleted]:
+        """Повідомляє живій симуляції, що початкових подій з міткою часу
+         раніше за <timestamp> більше не буде, і виконує всі події до
+         <timestamp>.
+
+         Повертає події CheckoutCompleted, виконані під час цього виклику.
+        """
+        self._watermark = max(self._watermark, timestamp)
+        return self._run_live()
+
+    def finish_live(self) -> Tuple[List[CheckoutCompleted], Dict[str, Any]]:
+        """Завершує живу симуляцію: початкових подій більше не буде.
+
+         Повертає події CheckoutCompleted, що залишилися, і статистику
+         симуляції.
+        """
+        self._live = False
+        completed = self._run_live()
+        event = self._step(None)
+        while event is not None:
+            if event.kind == COMPLETED:
+                completed.append(event)
+            event = self._step(None)
+        if self._collector is not None:
+            self._collector.finish(self._store)
+        return completed, self._stats
+
+    def _run_live(self) -> List[CheckoutCompleted]:
+        """Виконує події живої симуляції, порядок яких уже визначено, і
+         повертає виконані події CheckoutCompleted.
+
+         Подія з черги подій з міткою часу _watermark або пізніше чекає:
+         початкова подія з тією ж міткою часу, що надійде пізніше, має
+         виконатися раніше за неї.
+        """
+        if self._deferred is not None:
+            deferred = self._deferred
+            self._deferred = None
+            self._add_waiting(deferred)
+        completed = []
+        while True:
+            head = self._head_timestamp()
+            if self._next_initial is None and \
+                    (head is None or head >= self._watermark):
+                return completed
+            event = self._step(None)
+            if event.kind == COMPLETED:
+                completed.append(event)
+
+    def _step(self, profiler: Optional[Profiler]) -> Optional[Event]:
+        """Виконує наступну подію і повертає її або повертає None, якщо
+         подій немає.
+
+         Без профайлера початкові події CustomerArrival з тією ж міткою
+         часу, що йдуть за наступною подією, виконуються разом з нею, і
+         повертається остання з них.
+        """
+        tick = self._tick
+        if tick:
+            head = tick[0]
+        elif self._events.is_empty():
+            head = None
+        else:
+            head = self._events.peek()
+        event = self._next_initial
+        if event is not None and \
+                (head is None or event.timestamp <= head.timestamp):
+            self._next_initial = next(self._initial, None)
+            if event.kind == ARRIVAL:
+                following = self._next_initial
+                if profiler is None and following is not None and \
+                        following.kind == ARRIVAL and \
+                        following.timestamp == event.timestamp:
+                    return self._step_arrivals(event)
+                self._stats['num_customers'] += 1
+                event.customer.store_arrival_time = event.timestamp
+            self._consumed += 1
+        elif head is None:
+            return None
+        else:
+            if not tick:
+                self._fill_tick(head.timestamp)
+            event = tick.popleft()
+        self._executed += 1
+        timestamp = event.timestamp
+        before_do = _BEFORE_DO[event.kind]
+        if before_do is not None:
+            before_do(self, event)
+        recorder = self._recorder
+        if recorder is not None:
+            recorder.record(event)
+        if profiler is None:
             spawns = event.do(self._store)
-            for spawn in spawns:
+        else:
+            spawns = profiler.do(event, self._store)
+        if self._collector is not None:
+            self._collector.observe(event, spawns)
+        elif profiler is None and len(spawns) == 1 and \
+                spawns[0].kind == STARTED and self._is_next_now(timestamp):
+            self._executed += 1
+            if recorder is not None:
+                recorder.record(spawns[0])
+            spawns = spawns[0].do(self._store)
+        for spawn in spawns:
+            if spawn.kind == WAITING:
+                self._add_waiting(spawn)
+            elif spawn.timestamp == timestamp:
+                if not tick:
+                    self._fill_tick(timestamp)
+                tick.append(spawn)
+            else:
                 self._events.add(spawn)
-            stats['total_time'] = event.timestamp
+        if profiler is not None:
+            profiler.observe_queue(len(self._events) + len(tick))
+        self._stats['total_time'] = event.timestamp
+        return event
+
+    def _step_arrivals(self, first: CustomerArrival) -> Event:
+        """Виконує початкову подію <first> разом з наступними початковими
+         подіями CustomerArrival з тією ж міткою часу і повертає останню з
+         них.
+        """
+        timestamp = first.timestamp
+        arrivals = [first]
+        while self._next_initial is not None and \
+                self._next_initial.kind == ARRIVAL and \
+                self._next_initial.timestamp == timestamp:
+            arrivals.append(self._next_initial)
+            self._next_initial = next(self._initial, None)
+        for arrival in arrivals:
+            arrival.customer.store_arrival_time = timestamp
+        self._stats['num_customers'] += len(arrivals)
+        self._consumed += len(arrivals)
+        self._executed += len(arrivals)
+        if self._recorder is not None:
+            for arrival in arrivals:
+                self._recorder.record(arrival)
+        collector = self._collector
+        tick = self._tick
+        last = len(arrivals) - 1
+        for i, spawns in enumerate(do_arrivals(arrivals, self._store)):
+            if collector is not None:
+                collector.observe(arrivals[i], spawns)
+            for spawn in spawns:
+                if spawn.kind != WAITING:
+                    if not tick:
+                        self._fill_tick(timestamp)
+                    tick.append(spawn)
+                elif i == last:
+                    self._add_waiting(spawn)
+                else:
+                    # Поки в пакеті є наступні клієнти, наступна подія —
+                    # у цю ж секунду, тож групу очікування просто додаємо.
+                    self._events.add(spawn)
+        self._stats['total_time'] = timestamp
+        return arrivals[last]
+
+    def _is_next_now(self, timestamp: int) -> bool:
+        """Повертає True, якщо подія, створена на поточну секунду
+         <timestamp>, виконається наступною: інших подій цієї секунди
+         немає і вже не буде.
+        """
+        if not self._tick:
+            self._fill_tick(timestamp)
+            following = self._next_initial
+            return not self._tick and \
+                (following is None or following.timestamp > timestamp) and \
+                (not self._live or timestamp < self._watermark)
+        return False
+
+    def _fill_tick(self, timestamp: int) -> None:
+        """Переносить з _events у _tick усі події з міткою часу <timestamp>.
+
+         Передумова: _tick порожня, а в _events немає подій раніше за
+         <timestamp>.
+        """
+        events = self._events
+        while not events.is_empty() and \
+                events.peek().timestamp == timestamp:
+            self._tick.append(events.remove())
+
+    def _head_timestamp(self) -> Optional[int]:
+        """Повертає мітку часу наступної події з _tick або _events чи None,
+         якщо таких подій немає.
+        """
+        if self._tick:
+            return self._tick[0].timestamp
+        if self._events.is_empty():
+            return None
+        return self._events.peek().timestamp
+
+    def _initial_is_next(self) -> bool:
+        """Повертає True, якщо наступною має виконатися початкова подія.
+        """
+        if self._next_initial is None:
+            return False
+        head = self._head_timestamp()
+        return head is None or self._next_initial.timestamp <= head
+
+    def _next_timestamp(self) -> Optional[int]:
+        """Повертає мітку часу наступної події або None, якщо подій немає.
+        """
+        if self._initial_is_next():
+            return self._next_initial.timestamp
+        return self._head_timestamp()
+
+    def _merge_waiting(self, event: CustomersWaiting) -> None:
+        """Приєднує до <event> групи очікування, що йдуть одразу після неї.
+
+         Група виконується з _tick, тож усі події її секунди вже там.
+        """
+        tick = self._tick
+        while tick and tick[0].kind == WAITING:
+            event.merge(tick.popleft())
+
+    def _record_wait(self, event: CheckoutCompleted) -> None:
+        """Враховує час очікування клієнта, що завершує оформлення подією
+         <event>.
+        """
+        wait = event.timestamp - event.customer.store_arrival_time
+        if wait > self._stats['max_wait']:
+            self._stats['max_wait'] = wait
+        if self._collector is not None:
+            self._collector.add_wait(wait)
+
+    def _add_waiting(self, event: CustomersWaiting) -> None:
+        """Планує наступну спробу групи очікування <event>.
+
+         Поки в магазині не звільниться місце, спроби групи невдалі, тому
+         секунди без жодних інших подій пропускаються.  Якщо інших подій
+         немає зовсім, місце вже ніколи не звільниться, і група
+         залишається в залі очікування назавжди.
+
+         У живій симуляції, доки наступна початкова подія не надійшла,
+         секунду наступної спроби можна визначити, лише якщо в черзі
+         подій є подія раніше за _watermark; інакше планування
+         відкладається до наступного виклику feed, advance або
+         finish_live.
+        """
+        if self._live and self._next_initial is None:
+            head = self._head_timestamp()
+            if head is None or head >= self._watermark:
+                self._deferred = event
+                return
+        next_time = self._next_timestamp()
+        if next_time is None:
+            return
+        event.timestamp = max(event.timestamp, next_time)
+        self._events.add(event)
+
 
-        stats['max_wait'] = max_waits[max(max_waits, key=max_waits.get)]
-        return stats
+# Обробники, що виконуються перед Event.do, за кодом типу події
+# (Event.kind), або None.
+_BEFORE_DO = [None, GroceryStoreSimulation._merge_waiting, None,
+              GroceryStoreSimulation._record_wait, None]
 
 
 if __name__ == '__main__':
@@ -2,12 +2,95 @@
 Цей модуль містить усі класи, необхідні для моделювання об’єктів у продуктовому магазині.
 """
 from __future__ import annotations
-from typing import List, Optional, TextIO
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, \
+    Set, TextIO, Tuple, Union
+from collections import deque
+import heapq
 import json
 
 EXPRESS_LIMIT = 7
 
 
+class StoreConfig:
+    """Розібрана конфігурація продуктового магазину.
+
+     === Атрибути ===
+     regular_count: кількість регулярних касових ліній
+     express_count: кількість ліній швидкої каси
+     self_serve_count: кількість черг каси самообслуговування
+     line_capacity: максимальна місткість усіх ліній
+    """
+    regular_count: int
+    express_count: int
+    self_serve_count: int
+    line_capacity: int
+
+    def __init__(self, regular_count: int, express_count: int,
+                 self_serve_count: int, line_capacity: int) -> None:
+        """Ініціалізація конфігурації з кількостями кас кожного типу і
+         місткістю ліній.
+        """
+        self.regular_count = regular_count
+        self.express_count = express_count
+        self.self_serve_count = self_serve_count
+        self.line_capacity = line_capacity
+
+    @classmethod
+    def from_dict(cls, config: Dict[str, int]) -> StoreConfig:
+        """Повертає конфігурацію зі словника <config> з ключами файлу
+         конфігурації.
+
+        >>> c = StoreConfig.from_dict({'regular_count': 2, 'express_count': 1,
+        ...                            'self_serve_count': 0,
+        ...                            'line_capacity': 5})
+        >>> c.to_dict() == {'regular_count': 2, 'express_count': 1,
+        ...                 'self_serve_count': 0, 'line_capacity': 5}
+        True
+        """
+        return cls(config['regular_count'], config['express_count'],
+                   config['self_serve_count'], config['line_capacity'])
+
+    @classmethod
+    def from_file(cls, config_file: TextIO) -> StoreConfig:
+        """Повертає конфігурацію з JSON-файлу конфігурації <config_file>.
+        """
+        return cls.from_dict(json.load(config_file))
+
+    def to_dict(self) -> Dict[str, int]:
+        """Повертає цю конфігурацію як словник з ключами файлу конфігурації.
+        """
+        return {'regular_count': self.regular_count,
+                'express_count': self.express_count,
+                'self_serve_count': self.self_serve_count,
+                'line_capacity': self.line_capacity}
+
+    def __eq__(self, other: Any) -> bool:
+        """Повертає True, якщо <other> — така сама конфігурація.
+        """
+        return isinstance(other, StoreConfig) and \
+            self.to_dict() == other.to_dict()
+
+    def __ne__(self, other: Any) -> bool:
+        """Повертає True, якщо <other> — інша конфігурація.
+        """
+        return not self.__eq__(other)
+
+
+# Джерело конфігурації магазину: JSON-файл, словник з ключами файлу або
+# розібрана конфігурація.
+ConfigSource = Union[TextIO, Dict[str, int], StoreConfig]
+
+
+def load_config(source: ConfigSource) -> StoreConfig:
+    """Повертає розібрану конфігурацію магазину з <source>.
+    """
+    if isinstance(source, StoreConfig):
+        return source
+    if isinstance(source, dict):
+        return StoreConfig.from_dict(source)
+    return StoreConfig.from_file(source)
+
+
 class GroceryStore:
     """Продуктовий магазин.
 
@@ -17,22 +100,41 @@ class GroceryStore:
      _self_serve_count: кількість черг каси самообслуговування
      _line_capacity: максимальна місткість усіх ліній
      _checkout_lines: список кас у цьому продуктовому магазині
+     _waiting_room: клієнти, які не змогли стати в жодну чергу і чекають,
+                    поки звільниться місце
+     _capacity_version: лічильник звільнень місць у чергах; змінюється
+                        щоразу, коли якась черга завершує оформлення
+     _line_heaps: для кожного типу каси мін-купа пар (довжина черги, номер
+                  рядка) для вибору черги в enter_line
+
+     Інваріанти подання
+     - Для кожного відкритого неповного рядка i купа його типу містить
+       пару (len(рядок i), i).  Купа може містити й застарілі пари; вони
+       відкидаються, коли опиняються на вершині.
     """
     _regular_count: int
     _express_count: int
     _self_serve_count: int
     _line_capacity: int
     _checkout_lines: List[CheckoutLine]
+    _waiting_room: Set[Customer]
+    _capacity_version: int
+    _line_heaps: Dict[type, List[Tuple[int, int]]]
 
-    def __init__(self, config_file: TextIO) -> None:
+    def __init__(self, config_file: ConfigSource) -> None:
         """Ініціалізуйте GroceryStore із файлу конфігурації <config_file>.
+
+         Замість файлу можна передати словник з ключами файлу або
+         StoreConfig.
         """
-        j = json.load(config_file)
-        self._regular_count = j['regular_count']
-        self._express_count = j['express_count']
-        self._self_serve_count = j['self_serve_count']
-        self._line_capacity = j['line_capacity']
+        config = load_config(config_file)
+        self._regular_count = config.regular_count
+        self._express_count = config.express_count
+        self._self_serve_count = config.self_serve_count
+        self._line_capacity = config.line_capacity
         self._checkout_lines = []
+        self._waiting_room = set()
+        self._capacity_version = 0
 
         for _ in range(self._regular_count):
             self._checkout_lines.append(RegularLine(self._line_capacity))
@@ -41,6 +143,30 @@ class GroceryStore:
         for _ in range(self._self_serve_count):
             self._checkout_lines.append(SelfServeLine(self._line_capacity))
 
+        self._line_heaps = {}
+        for i, line in enumerate(self._checkout_lines):
+            self._line_heaps.setdefault(type(line), []).append((len(line), i))
+        for heap in self._line_heaps.values():
+            heapq.heapify(heap)
+
+    def get_config(self) -> StoreConfig:
+        """Повертає конфігурацію цього магазину.
+        """
+        return StoreConfig(self._regular_count, self._express_count,
+                           self._self_serve_count, self._line_capacity)
+
+    def reset(self) -> None:
+        """Повертає магазин у початковий стан: усі каси відкриті й порожні,
+         зала очікування порожня.
+
+         Каси не створюються заново, а очищаються на місці.
+        """
+        for line in self._checkout_lines:
+            line.reset()
+        self._waiting_room.clear()
+        self._capacity_version = 0
+        self._reindex_lines()
+
     def enter_line(self, customer: Customer) -> int:
         """Вибирає новий рядок, щоб <клієнт> приєднався.
 
@@ -48,19 +174,165 @@ class GroceryStore:
          Необхідно скористатися алгоритмом із роздаткового матеріалу.
 
          Повертає -1, якщо немає лінії, до якої клієнт може приєднатися.
+
+         Клієнт стає в найкоротшу з черг, що можуть його прийняти, а серед
+         однаково коротких — у чергу з найменшим номером.  Каси одного типу
+         приймають однакових клієнтів, тому достатньо перевірити лише
+         найкоротшу відкриту неповну чергу кожного типу.
         """
-        smallest = self._line_capacity + 1
-        enter = 0
-        for line in self._checkout_lines:
-            size = len(line)
-            if size < smallest and line.can_accept(customer):
-                smallest = size
-                enter = line
-        if enter == 0:
+        best = None
+        for heap in self._line_heaps.values():
+            top = self._shortest_line(heap)
+            if top is not None and (best is None or top < best) and \
+                    self._checkout_lines[top[1]].can_accept(customer):
+                best = top
+        if best is None:
             return -1
-        else:
-            enter.accept(customer)
-            return self._checkout_lines.index(enter)
+        line_number = best[1]
+        self._checkout_lines[line_number].accept(customer)
+        self._update_line_index(line_number)
+        return line_number
+
+    def enter_lines(self, customers: Iterable[Customer]) \
+            -> List[Tuple[int, bool]]:
+        """Ставить клієнтів <customers> у черги по одному, так само як
+         послідовні виклики enter_line.
+
+         Повертає для кожного клієнта пару (номер рядка або -1, чи став
+         клієнт першим у черзі).
+
+         Найкоротша черга кожного типу знаходиться один раз на весь пакет;
+         після кожного клієнта оновлюється лише купа типу каси, до якої він
+         став, бо черги інших типів не змінилися.
+        """
+        lines = self._checkout_lines
+        heaps = self._line_heaps
+        tops = {kind: self._shortest_line(heap)
+                for kind, heap in heaps.items()}
+        result = []
+        for customer in customers:
+            best = None
+            for top in tops.values():
+                if top is not None and (best is None or top < best) and \
+                        lines[top[1]].can_accept(customer):
+                    best = top
+            if best is None:
+                result.append((-1, False))
+                continue
+            line_number = best[1]
+            line = lines[line_number]
+            line.accept(customer)
+            self._update_line_index(line_number)
+            tops[type(line)] = self._shortest_line(heaps[type(line)])
+            result.append((line_number, len(line) == 1))
+        return result
+
+    def _shortest_line(self, heap: List[Tuple[int, int]]) \
+            -> Optional[Tuple[int, int]]:
+        """Повертає пару (довжина черги, номер рядка) для найкоротшої
+         відкритої неповної черги в <heap> або None, якщо такої немає.
+
+         Застарілі пари на вершині <heap> видаляються.
+        """
+        while heap:
+            if self._is_current(heap[0]):
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def _update_line_index(self, line_number: int) -> None:
+        """Оновлює купу для рядка <line_number> після зміни його черги.
+        """
+        line = self._checkout_lines[line_number]
+        heap = self._line_heaps[type(line)]
+        if line.is_open and len(line) < line.capacity:
+            heapq.heappush(heap, (len(line), line_number))
+        if len(heap) > 2 * len(self._checkout_lines) + 8:
+            self._rebuild_line_index(heap)
+
+    def _rebuild_line_index(self, heap: List[Tuple[int, int]]) -> None:
+        """Перебудовує <heap> без застарілих пар.
+        """
+        heap[:] = sorted(set(entry for entry in heap
+                             if self._is_current(entry)))
+
+    def _is_current(self, entry: Tuple[int, int]) -> bool:
+        """Повертає True, якщо пара <entry> відповідає поточному стану
+         відкритого неповного рядка.
+        """
+        size, line_number = entry
+        line = self._checkout_lines[line_number]
+        return line.is_open and size == len(line) < line.capacity
+
+    def wait(self, customer: Customer) -> None:
+        """Відправляє <customer> до зали очікування.
+        """
+        self._waiting_room.add(customer)
+
+    def leave_waiting_room(self, customer: Customer) -> None:
+        """Прибирає <customer>, який став у чергу, із зали очікування.
+        """
+        self._waiting_room.discard(customer)
+
+    def get_waiting(self) -> List[Customer]:
+        """Повертає клієнтів, які досі чекають у залі очікування.
+        """
+        return list(self._waiting_room)
+
+    def get_capacity_version(self) -> int:
+        """Повертає лічильник звільнень місць у чергах.
+
+         Якщо лічильник не змінився після невдалої спроби клієнта стати в
+         чергу, то й повторна спроба буде невдалою: черги лише заповнюються
+         або закриваються.
+        """
+        return self._capacity_version
+
+    def get_line_kinds(self) -> List[str]:
+        """Повертає назву типу кожної каси, наприклад 'RegularLine'.
+        """
+        return [type(line).__name__ for line in self._checkout_lines]
+
+    def get_peak_lengths(self) -> List[int]:
+        """Повертає найбільшу довжину черги кожної каси.
+        """
+        return [line.peak_length for line in self._checkout_lines]
+
+    def get_line_states(self) -> List[Tuple[bool, int, List[Customer]]]:
+        """Повертає для кожної каси трійку (чи відкрита, найбільша довжина
+         черги, клієнти в черзі в порядку FIFO).
+        """
+        return [(line.is_open, line.peak_length, line.queue)
+                for line in self._checkout_lines]
+
+    def restore_state(self, line_states: List[Tuple[bool, int,
+                                                    List[Customer]]],
+                      waiting: Iterable[Customer],
+                      capacity_version: int) -> None:
+        """Відновлює стан кас <line_states> у форматі get_line_states,
+         залу очікування <waiting> і лічильник звільнень місць
+         <capacity_version>.
+
+         Передумова: <line_states> описує каси магазину з тією самою
+         конфігурацією.
+        """
+        for line, (is_open, peak, customers) in zip(self._checkout_lines,
+                                                    line_states):
+            line.is_open = is_open
+            line.peak_length = peak
+            line.queue = customers
+        self._waiting_room = set(waiting)
+        self._capacity_version = capacity_version
+        self._reindex_lines()
+
+    def _reindex_lines(self) -> None:
+        """Заново заповнює купи всіх типів кас за поточним станом кас.
+        """
+        for line_type, heap in self._line_heaps.items():
+            heap[:] = [(len(line), i)
+                       for i, line in enumerate(self._checkout_lines)
+                       if type(line) is line_type]
+            self._rebuild_line_index(heap)
 
     def line_is_ready(self, line_number: int) -> bool:
         """Таким чином, line_is_ready має повертати True тоді і тільки тоді, коли в черзі точно один клієнт.
@@ -78,13 +350,22 @@ class GroceryStore:
     def complete_checkout(self, line_number: int) -> bool:
         """ Повертає True, якщо в рядку <line_number> залишилися клієнти, яких потрібно розрахувати
         """
-        return self._checkout_lines[line_number].complete_checkout()
+        self._capacity_version += 1
+        are_more = self._checkout_lines[line_number].complete_checkout()
+        self._update_line_index(line_number)
+        return are_more
 
     def close_line(self, line_number: int) -> List[Customer]:
         """Закриває рядок <line_number> і поверніть клієнтів із тієї черги, які все ще чекають на розрахунок.
         """
         return self._checkout_lines[line_number].close()
 
+    def close_line_queue(self, line_number: int) -> Deque[Customer]:
+        """Закриває рядок <line_number> і повертає клієнтів, які ще чекають
+         на розрахунок, як deque цього рядка, без копіювання.
+        """
+        return self._checkout_lines[line_number].close_queue()
+
     def get_first_in_line(self, line_number: int) -> Optional[Customer]:
         """ Повернути першого клієнта в черзі <line_number> або None, якщо в черзі немає клієнтів.
         """
@@ -92,7 +373,7 @@ class GroceryStore:
         if len(line) == 0:
             return None
         else:
-            return line.queue[0]
+            return line.first()
 
 
 class Customer:
@@ -102,34 +383,90 @@ class Customer:
     Атрибути
     name:  унікальний ідентифікатор для цього клієнта.
     arrival_time: час, коли цей клієнт приєднався до черги.
-    _items: елементи, які має цей клієнт.
+    store_arrival_time: час, коли цей клієнт прийшов до магазину, тобто
+                        мітка часу його події з файлу подій; від нього
+                        рахується час очікування.
+    _items: елементи, які має цей клієнт, або None для клієнта,
+            створеного from_totals.
+    _num_items: кількість елементів, які має цей клієнт.
+    _item_time: кількість секунд, необхідних для перевірки цього клієнта.
 
     Інваріант подання 
     arrival_time >= 0, якщо цей клієнт приєднався до черги, і -1 в іншому випадку
+    store_arrival_time >= 0, якщо цей клієнт прийшов до магазину, і -1 в
+    іншому випадку
+    _num_items і _item_time обчислюються один раз під час створення клієнта.
     """
+    __slots__ = ('name', 'arrival_time', 'store_arrival_time', '_items',
+                 '_num_items', '_item_time')
     name: str
     arrival_time: int
-    _items: List[Item]
+    store_arrival_time: int
+    _items: Optional[List[Item]]
+    _num_items: int
+    _item_time: int
 
     def __init__(self, name: str, items: List[Item]) -> None:
         """Ініціалізація клієнта заданим ім`ям, початковим часом прибуття
         """
         self.name = name
         self.arrival_time = -1
+        self.store_arrival_time = -1
         self._items = items
+        self._num_items = len(items)
+        time = 0
+        for item in items:
+            time += item.get_time()
+        self._item_time = time
+
+    @classmethod
+    def from_totals(cls, name: str, num_items: int,
+                    item_time: int) -> Customer:
+        """Повертає клієнта з ім`ям <name>, який має <num_items> елементів
+         із загальним часом перевірки <item_time>, не створюючи Item.
+
+        >>> c = Customer.from_totals('Ann', 3, 12)
+        >>> c.num_items(), c.get_item_time()
+        (3, 12)
+        """
+        customer = cls.__new__(cls)
+        customer.name = name
+        customer.arrival_time = -1
+        customer.store_arrival_time = -1
+        customer._items = None
+        customer._num_items = num_items
+        customer._item_time = item_time
+        return customer
+
+    def get_items(self) -> Optional[List[Item]]:
+        """Повертає елементи цього клієнта або None, якщо клієнта створено
+         from_totals.
+        """
+        return self._items
 
     def num_items(self) -> int:
         """Повертає кількість елементів, які має цей клієнт.
         """
-        return len(self._items)
+        return self._num_items
 
     def get_item_time(self) -> int:
         """Повертає кількість секунд, необхідних для перевірки цього клієнта.
         """
-        time = 0
-        for item in self._items:
-            time += item.get_time()
-        return time
+        return self._item_time
+
+
+def customers_from_arrays(names: Sequence[str], num_items: Sequence[int],
+                          item_times: Sequence[int]) -> List[Customer]:
+    """Повертає клієнтів, задані паралельними масивами імен <names>,
+     кількостей елементів <num_items> і загального часу перевірки
+     <item_times>.
+
+    >>> cs = customers_from_arrays(['A', 'B'], [1, 8], [7, 16])
+    >>> [(c.name, c.num_items(), c.get_item_time()) for c in cs]
+    [('A', 1, 7), ('B', 8, 16)]
+    """
+    return [Customer.from_totals(name, count, time)
+            for name, count, time in zip(names, num_items, item_times)]
 
 
 class Item:
@@ -141,6 +478,7 @@ class Item:
      name: назва цього елемента
      _time: час, необхідний для оформлення цього товару
     """
+    __slots__ = ('name', '_time')
     name: str
     _time: int
 
@@ -165,7 +503,10 @@ class CheckoutLine:
      === Атрибути ===
      capacity: дозволена кількість клієнтів у цій касовій лінії.
      is_open: Правда, якщо лінія відкрита.
-     queue: клієнти в цьому рядку в порядку FIFO.
+     queue: клієнти в цьому рядку в порядку FIFO (копія у вигляді
+            списку).  Присвоєний список перетворюється на внутрішню deque.
+     peak_length: найбільша кількість клієнтів, що одночасно були в цьому
+                  рядку.
 
      Інваріанти подання
      - Кожен клієнт у цій лінії ще не перевірений.
@@ -173,19 +514,43 @@ class CheckoutLine:
     """
     capacity: int
     is_open: bool
-    queue: List[Customer]
+    peak_length: int
+    _queue: Deque[Customer]
 
     def __init__(self, capacity: int) -> None:
         """Ініціалізація відкритого і порожнього рядка каси.
         """
         self.capacity = capacity
         self.is_open = True
-        self.queue = []
+        self.peak_length = 0
+        self._queue = deque()
+
+    @property
+    def queue(self) -> List[Customer]:
+        """Повертає копію клієнтів у цьому рядку в порядку FIFO.
+
+        Зміни повернутого списку не змінюють рядок; щоб замінити клієнтів,
+        присвойте новий список атрибуту queue.
+        """
+        return list(self._queue)
+
+    @queue.setter
+    def queue(self, customers: Iterable[Customer]) -> None:
+        """Замінює клієнтів у цьому рядку на <customers>.
+        """
+        self._queue = deque(customers)
 
     def __len__(self) -> int:
         """Повертає розмір цього CheckoutLine.
         """
-        return len(self.queue)
+        return len(self._queue)
+
+    def reset(self) -> None:
+        """Відкриває цей рядок і очищає його чергу й найбільшу довжину.
+        """
+        self.is_open = True
+        self.peak_length = 0
+        self._queue.clear()
 
     def can_accept(self, customer: Customer) -> bool:
         """
@@ -201,7 +566,9 @@ class CheckoutLine:
          Повертає True, якщо клієнта прийнято.
         """
         if self.can_accept(customer):
-            self.queue.append(customer)
+            self._queue.append(customer)
+            if len(self._queue) > self.peak_length:
+                self.peak_length = len(self._queue)
             return True
         else:
             return False
@@ -211,15 +578,22 @@ class CheckoutLine:
 
          Повернення часу, який знадобиться для оплати наступного клієнта.
         """
-        return self.queue[0].get_item_time()
+        return self._queue[0].get_item_time()
+
+    def first(self) -> Customer:
+        """Повертає першого клієнта в цьому рядку.
+
+         Передумова: у рядку є клієнт.
+        """
+        return self._queue[0]
 
     def complete_checkout(self) -> bool:
         """Завершення оформлення замовлення для цієї каси.
 
          Повідомляє, чи залишилися клієнти в черзі.
         """
-        self.queue.pop(0)
-        if len(self.queue) > 0:
+        self._queue.popleft()
+        if len(self._queue) > 0:
             return True
         else:
             return False
@@ -227,11 +601,20 @@ class CheckoutLine:
     def close(self) -> List[Customer]:
         """Закриття цього рядка.
 
-        Повернення списку усіх клієнтів, яких потрібно перемістити на інший рядок.
+        Повернення усіх клієнтів, яких потрібно перемістити на інший рядок.
+        Клієнт, що вже оформлює замовлення, залишається.
+        """
+        return list(self.close_queue())
+
+    def close_queue(self) -> Deque[Customer]:
+        """Закриває цей рядок, як close, але повертає клієнтів, яких
+        потрібно перемістити, як колишню deque цього рядка без копіювання.
         """
         self.is_open = False
-        remaining = self.queue[1:]
-        self.queue = self.queue[:1]
+        remaining = self._queue
+        self._queue = deque()
+        if remaining:
+            self._queue.append(remaining.popleft())
         return remaining
 
 
@@ -260,7 +643,7 @@ class SelfServeLine(CheckoutLine):
 
          Повернення часу, який знадобиться для оплати наступного клієнта.
         """
-        return self.queue[0].get_item_time() * 2
+        return self._queue[0].get_item_time() * 2
 
 
 if __name__ == '__main__':
@@ -268,6 +651,7 @@ if __name__ == '__main__':
     doctest.testmod()
     import python_ta
     python_ta.check_all(config={
-        'allowed-import-modules': ['__future__', 'typing', 'json',
+        'allowed-import-modules': ['__future__', 'typing', 'json', 'heapq',
+                                   'collections',
                                    'python_ta', 'doctest'],
         'disable': ['W0613']})
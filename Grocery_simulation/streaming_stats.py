@@ -0,0 +1,225 @@
+"""
+Цей модуль містить потокову статистику симуляції: процентилі часу
+очікування і завантаженість кожної каси.
+
+Статистика накопичується під час симуляції й займає сталу пам’ять, хоч
+скільки клієнтів пройде через магазин: час очікування записується в
+скетч квантилів з логарифмічними кошиками, а для кас зберігаються лише
+лічильники.
+
+Приклад:
+    collector = StatsCollector()
+    sim.run(event_file, collector=collector)
+    print(collector.report())
+"""
+from __future__ import annotations
+from typing import Any, Dict, List
+import math
+from event import Event, CheckoutStarted, CheckoutCompleted
+from store import GroceryStore
+
+
+class QuantileSketch:
+    """Скетч квантилів невід’ємних чисел з відносною похибкою.
+
+    Кожне додатне значення v потрапляє в кошик з номером
+    ceil(log(v) / log(gamma)), де gamma = (1 + accuracy) / (1 - accuracy).
+    Квантиль повертається як середина кошика, тому він відрізняється від
+    точного значення не більше ніж у (1 ± accuracy) разів.  Кількість
+    кошиків залежить лише від діапазону значень, а не від їхньої кількості.
+    Два скетчі з однаковою точністю можна злити.
+
+    >>> sketch = QuantileSketch()
+    >>> for v in range(1, 101):
+    ...     sketch.add(v)
+    >>> abs(sketch.quantile(0.5) - 50) <= 0.01 * 50
+    True
+
+    === Атрибути ===
+    accuracy: відносна похибка квантилів.
+    count: кількість доданих значень.
+    total: сума доданих значень.
+    min_value: найменше додане значення.
+    max_value: найбільше додане значення.
+
+    === Приватні атрибути ===
+    _log_gamma: натуральний логарифм gamma.
+    _zeros: кількість доданих нулів.
+    _buckets: кількість значень у кожному кошику за його номером.
+    """
+    accuracy: float
+    count: int
+    total: float
+    min_value: float
+    max_value: float
+    _log_gamma: float
+    _zeros: int
+    _buckets: Dict[int, int]
+
+    def __init__(self, accuracy: float = 0.01) -> None:
+        """Ініціалізація порожнього скетчу з відносною похибкою <accuracy>.
+        """
+        self.accuracy = accuracy
+        self.count = 0
+        self.total = 0
+        self.min_value = math.inf
+        self.max_value = -math.inf
+        self._log_gamma = math.log((1 + accuracy) / (1 - accuracy))
+        self._zeros = 0
+        self._buckets = {}
+
+    def add(self, value: float) -> None:
+        """Додає невід’ємне значення <value>.
+        """
+        self.count += 1
+        self.total += value
+        self.min_value = min(self.min_value, value)
+        self.max_value = max(self.max_value, value)
+        if value <= 0:
+            self._zeros += 1
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self._buckets[key] = self._buckets.get(key, 0) + 1
+
+    def merge(self, other: QuantileSketch) -> None:
+        """Додає до цього скетчу всі значення скетчу <other>.
+
+        Передумова: обидва скетчі мають однакову точність.
+        """
+        if other.accuracy != self.accuracy:
+            raise ValueError('cannot merge sketches of different accuracy')
+        self.count += other.count
+        self.total += other.total
+        self.min_value = min(self.min_value, other.min_value)
+        self.max_value = max(self.max_value, other.max_value)
+        self._zeros += other._zeros
+        for key, count in other._buckets.items():
+            self._buckets[key] = self._buckets.get(key, 0) + count
+
+    def mean(self) -> float:
+        """Повертає середнє доданих значень або 0.0 для порожнього скетчу.
+        """
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Повертає наближений <q>-квантиль (0 <= q <= 1) доданих значень
+        або 0.0 для порожнього скетчу.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self._zeros
+        if rank < seen:
+            return 0.0
+        gamma = math.exp(self._log_gamma)
+        for key in sorted(self._buckets):
+            seen += self._buckets[key]
+            if rank < seen:
+                value = 2 * gamma ** key / (gamma + 1)
+                return min(max(value, self.min_value), self.max_value)
+        return self.max_value
+
+
+class StatsCollector:
+    """Потокова статистика однієї або кількох симуляцій.
+
+    === Атрибути ===
+    waits: скетч часу очікування клієнтів від прибуття до завершення
+           оформлення.
+    busy_times: загальний час оформлення на кожній касі.
+    completed: кількість клієнтів, що завершили оформлення на кожній касі.
+    line_kinds: тип кожної каси, наприклад 'RegularLine'.
+    peak_lengths: найбільша довжина черги кожної каси.
+    total_time: мітка часу останньої події.
+    """
+    waits: QuantileSketch
+    busy_times: List[int]
+    completed: List[int]
+    line_kinds: List[str]
+    peak_lengths: List[int]
+    total_time: int
+
+    def __init__(self, accuracy: float = 0.01) -> None:
+        """Ініціалізація порожньої статистики зі скетчем точності <accuracy>.
+        """
+        self.waits = QuantileSketch(accuracy)
+        self.busy_times = []
+        self.completed = []
+        self.line_kinds = []
+        self.peak_lengths = []
+        self.total_time = 0
+
+    def start(self, store: GroceryStore) -> None:
+        """Готує статистику до симуляції магазину <store>.
+        """
+        if not self.line_kinds:
+            self.line_kinds = store.get_line_kinds()
+            self.busy_times = [0] * len(self.line_kinds)
+            self.completed = [0] * len(self.line_kinds)
+            self.peak_lengths = [0] * len(self.line_kinds)
+
+    def observe(self, event: Event, spawns: List[Event]) -> None:
+        """Враховує виконану подію <event>, що створила події <spawns>.
+        """
+        self.total_time = event.timestamp
+        if isinstance(event, CheckoutStarted):
+            self.busy_times[event.line_number] += \
+                spawns[0].timestamp - event.timestamp
+        elif isinstance(event, CheckoutCompleted):
+            self.completed[event.line_number] += 1
+
+    def add_wait(self, wait: int) -> None:
+        """Враховує клієнта, що чекав <wait> секунд.
+        """
+        self.waits.add(wait)
+
+    def finish(self, store: GroceryStore) -> None:
+        """Завершує статистику після симуляції магазину <store>.
+        """
+        for i, length in enumerate(store.get_peak_lengths()):
+            self.peak_lengths[i] = max(self.peak_lengths[i], length)
+
+    def merge(self, other: StatsCollector) -> None:
+        """Додає до цієї статистики статистику <other> для магазину з такими
+        самими касами.
+        """
+        if not self.line_kinds:
+            self.line_kinds = list(other.line_kinds)
+            self.busy_times = [0] * len(other.line_kinds)
+            self.completed = [0] * len(other.line_kinds)
+            self.peak_lengths = [0] * len(other.line_kinds)
+        if other.line_kinds and other.line_kinds != self.line_kinds:
+            raise ValueError('cannot merge stats of different stores')
+        self.waits.merge(other.waits)
+        for i in range(len(other.line_kinds)):
+            self.busy_times[i] += other.busy_times[i]
+            self.completed[i] += other.completed[i]
+            self.peak_lengths[i] = max(self.peak_lengths[i],
+                                       other.peak_lengths[i])
+        self.total_time = max(self.total_time, other.total_time)
+
+    def report(self) -> Dict[str, Any]:
+        """Повертає статистику як словник для експорту, наприклад у JSON.
+
+        Завантаженість каси — частка часу симуляції, коли каса оформлювала
+        клієнта.  Пропускна здатність — кількість клієнтів за секунду.
+        """
+        elapsed = self.total_time
+        lines = []
+        throughput = {}
+        for i, kind in enumerate(self.line_kinds):
+            lines.append({
+                'line': i, 'kind': kind, 'completed': self.completed[i],
+                'busy_time': self.busy_times[i],
+                'utilization': self.busy_times[i] / elapsed if elapsed else 0,
+                'peak_length': self.peak_lengths[i]})
+            throughput[kind] = throughput.get(kind, 0) + self.completed[i]
+        for kind in throughput:
+            throughput[kind] = throughput[kind] / elapsed if elapsed else 0
+        return {'customers': self.waits.count,
+                'mean_wait': self.waits.mean(),
+                'p50_wait': self.waits.quantile(0.5),
+                'p95_wait': self.waits.quantile(0.95),
+                'p99_wait': self.waits.quantile(0.99),
+                'lines': lines,
+                'throughput': throughput}
@@ -0,0 +1,165 @@
+"""
+Цей модуль містить паралельний перебір симуляцій для сітки конфігурацій
+магазину і файлів подій.
+
+Кожен файл подій розбирається один раз: він перетворюється на двійковий
+файл подій (binary_trace), який процеси-виконавці відкривають через mmap.
+З каталогом кешу (--cache) розібрані файли подій і статистика зберігаються
+в SimulationCache, і повторний перебір симулює лише нові пари.
+
+Запуск:
+    python sweep.py --configs input_files/config_*.json \
+        --events input_files/events_mixtures.txt --out results.csv \
+        --cache .sim_cache
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Sequence, TextIO, Tuple
+import argparse
+import csv
+import multiprocessing
+import os
+import sys
+import tempfile
+from binary_trace import BinaryTrace, convert_text_trace
+from cache import SimulationCache
+from simulation import GroceryStoreSimulation
+
+COLUMNS = ['config', 'events', 'num_customers', 'total_time', 'max_wait',
+           'error']
+STATS = ['num_customers', 'total_time', 'max_wait']
+
+# Двійкові файли подій процесу-виконавця: шлях до текстового файлу подій ->
+# шлях до двійкового файлу.
+_traces: Dict[str, str] = {}
+# Симуляції процесу-виконавця за шляхом до файлу конфігурації; кожна
+# запускається знову для кожного файлу подій.
+_sims: Dict[str, GroceryStoreSimulation] = {}
+
+
+def sweep(configs: Sequence[str], event_files: Sequence[str],
+          processes: Optional[int] = None,
+          cache: Optional[SimulationCache] = None) -> List[Dict[str, Any]]:
+    """Запускає симуляцію для кожної пари (конфігурація, файл подій) з
+    <configs> × <event_files> у пулі з <processes> процесів (за
+    замовчуванням — усі ядра).
+
+    Якщо задано <cache>, статистика пар, що вже є в кеші, береться з нього,
+    а нова статистика й розібрані файли подій зберігаються в ньому.
+
+    Повертає рядки результатів зі стовпцями COLUMNS у порядку сітки.
+    Якщо симуляція завершилася помилкою, її текст записується в 'error'.
+    """
+    tasks = [(config, events) for config in configs for events in event_files]
+    rows = [None] * len(tasks)
+    missing = []
+    for i, (config, events) in enumerate(tasks):
+        stats = None if cache is None else cache.get_stats(config, events)
+        if stats is None:
+            missing.append(i)
+        else:
+            rows[i] = _new_row(config, events)
+            rows[i].update(stats)
+    if not missing:
+        return rows
+    with tempfile.TemporaryDirectory() as directory:
+        if cache is not None:
+            # Файли подій закріплені, доки пул не завершиться, щоб розбір
+            # наступного файлу не витіснив потрібний іншим парам.
+            try:
+                traces = cache.pin_traces(event_files)
+                results = _run_pool(traces, [tasks[i] for i in missing],
+                                    processes)
+            finally:
+                cache.unpin()
+        else:
+            traces = {}
+            for i, events in enumerate(event_files):
+                traces[events] = os.path.join(directory, str(i) + '.gst')
+                with open(events) as event_file:
+                    convert_text_trace(event_file, traces[events])
+            results = _run_pool(traces, [tasks[i] for i in missing],
+                                processes)
+    for i, row in zip(missing, results):
+        rows[i] = row
+        if cache is not None and not row['error']:
+            cache.put_stats(row['config'], row['events'],
+                            {key: row[key] for key in STATS})
+    return rows
+
+
+def _run_pool(traces: Dict[str, str], tasks: List[Tuple[str, str]],
+              processes: Optional[int]) -> List[Dict[str, Any]]:
+    """Запускає симуляції для пар <tasks> з двійковими файлами подій
+    <traces> у пулі з <processes> процесів.
+    """
+    with multiprocessing.Pool(processes, _init_worker, (traces,)) as pool:
+        return pool.map(_run_task, tasks)
+
+
+def _init_worker(traces: Dict[str, str]) -> None:
+    """Запам’ятовує двійкові файли подій <traces> у процесі-виконавці.
+    """
+    _traces.update(traces)
+
+
+def _run_task(task: Tuple[str, str]) -> Dict[str, Any]:
+    """Запускає симуляцію для пари <task> (конфігурація, файл подій).
+    """
+    config, events = task
+    row = _new_row(config, events)
+    try:
+        if config not in _sims:
+            with open(config) as config_file:
+                _sims[config] = GroceryStoreSimulation(config_file)
+        sim = _sims[config]
+        with BinaryTrace(_traces[events]) as trace:
+            row.update(sim.run_events(trace.iter_events()))
+    except Exception as error:
+        row['error'] = type(error).__name__ + ': ' + str(error)
+    return row
+
+
+def _new_row(config: str, events: str) -> Dict[str, Any]:
+    """Повертає порожній рядок результатів для пари (<config>, <events>).
+    """
+    return {'config': config, 'events': events, 'num_customers': '',
+            'total_time': '', 'max_wait': '', 'error': ''}
+
+
+def write_csv(rows: List[Dict[str, Any]], out: TextIO) -> None:
+    """Записує рядки результатів <rows> у CSV-файл <out>.
+    """
+    writer = csv.DictWriter(out, COLUMNS)
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Розбирає аргументи командного рядка <argv> і запускає перебір.
+    """
+    parser = argparse.ArgumentParser(
+        description='Run grocery store simulations over a grid of '
+                    'store configs and event files.')
+    parser.add_argument('--configs', nargs='+', required=True,
+                        help='store config JSON files')
+    parser.add_argument('--events', nargs='+', required=True,
+                        help='event files')
+    parser.add_argument('--out', default='-',
+                        help='CSV file for results (default: stdout)')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='number of worker processes (default: all cores)')
+    parser.add_argument('--cache', default=None,
+                        help='cache directory for parsed event files and '
+                             'results (default: no cache)')
+    args = parser.parse_args(argv)
+    cache = None if args.cache is None else SimulationCache(args.cache)
+    rows = sweep(args.configs, args.events, args.processes, cache)
+    if args.out == '-':
+        write_csv(rows, sys.stdout)
+    else:
+        with open(args.out, 'w', newline='') as out:
+            write_csv(rows, out)
+
+
+if __name__ == '__main__':
+    main()
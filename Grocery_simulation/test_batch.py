@@ -0,0 +1,105 @@
+"""Цей модуль містить тести для пакетного рушія симуляції.
+"""
+import json
+import os
+import random
+from io import StringIO
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from batch import batch_stats, event_arrays, run_batch
+from event import iter_sorted_events
+from simulation import GroceryStoreSimulation
+
+CONFIGS = sorted(f for f in os.listdir('input_files') if f.endswith('.json'))
+CLOSE_FREE_EVENTS = [
+    'events_no_express.txt',
+    'events_one.txt',
+    'events_one_at_a_time.txt',
+    'events_two.txt',
+]
+
+
+def simulate(config: str, events: str) -> dict:
+    """Повертає статистику GroceryStoreSimulation.run для <config> і <events>."""
+    with open(config) as config_file:
+        sim = GroceryStoreSimulation(config_file)
+    with open(events) as event_file:
+        return sim.run(event_file)
+
+
+def test_batch_matches_simulation() -> None:
+    """Перевіряє run_batch на всіх конфігураціях із input_files."""
+    for config in CONFIGS:
+        for events in CLOSE_FREE_EVENTS:
+            config_path = 'input_files/' + config
+            events_path = 'input_files/' + events
+            expected = simulate(config_path, events_path)
+            with open(config_path) as config_file, \
+                    open(events_path) as event_file:
+                assert run_batch(config_file, event_file) == expected
+
+def test_batch_fast_path_random() -> None:
+    """Перевіряє пакетний рушій без переходу на звичайний рушій."""
+    rng = random.Random(5)
+    lines = []
+    t = 0
+    for i in range(2000):
+        t += rng.choice([0, 0, 1, 2, 3])
+        items = ' '.join('Gum ' + str(rng.randint(0, 4))
+                         for _ in range(rng.randint(0, 12)))
+        lines.append(str(t) + ' Arrive C' + str(i) + ' ' + items)
+    trace = '\n'.join(lines)
+    config = {'regular_count': 3, 'express_count': 2,
+              'self_serve_count': 4, 'line_capacity': 1000}
+    expected = GroceryStoreSimulation(StringIO(str(config).replace("'", '"')))\
+        .run(StringIO(trace))
+    arrays = event_arrays(list(iter_sorted_events(StringIO(trace))))
+    assert batch_stats(config, **arrays) == expected
+
+def test_batch_reports_blocked_customers() -> None:
+    """Перевіряє, що пакетний рушій відмовляється, коли черги заповнені."""
+    config = {'regular_count': 1, 'express_count': 0,
+              'self_serve_count': 0, 'line_capacity': 1}
+    arrays = event_arrays(list(iter_sorted_events(
+        StringIO('0 Arrive A Gum 5\n1 Arrive B Gum 1\n'))))
+    assert batch_stats(config, **arrays) is None
+
+def test_batch_random_configs() -> None:
+    """Перевіряє пакетний рушій на випадкових конфігураціях, зокрема лише з
+    експрес-касами і з малою місткістю черг."""
+    rng = random.Random(11)
+    for case in range(60):
+        t = 0
+        lines = []
+        for i in range(400):
+            t += rng.choice([0, 0, 1, 3])
+            items = ' '.join('Gum ' + str(rng.randint(1, 6))
+                             for _ in range(rng.randint(1, 10)))
+            lines.append(str(t) + ' Arrive C' + str(i) + ' ' + items)
+        trace = '\n'.join(lines)
+        config = {'regular_count': rng.randint(0, 30),
+                  'express_count': rng.randint(0, 10),
+                  'self_serve_count': rng.randint(0, 20),
+                  'line_capacity': rng.randint(1, 40)}
+        expected = GroceryStoreSimulation(config).run(StringIO(trace))
+        arrays = event_arrays(list(iter_sorted_events(StringIO(trace))))
+        stats = batch_stats(config, **arrays)
+        assert stats is None or stats == expected
+        assert run_batch(StringIO(json.dumps(config)),
+                         StringIO(trace)) == expected
+
+def test_batch_without_lines() -> None:
+    """Перевіряє, що магазин без кас обробляє звичайний рушій."""
+    config = '{"regular_count": 0, "express_count": 0, ' \
+             '"self_serve_count": 0, "line_capacity": 3}'
+    trace = '0 Arrive A Gum 5\n1 Arrive B Gum 1\n'
+    arrays = event_arrays(list(iter_sorted_events(StringIO(trace))))
+    assert batch_stats(json.loads(config), **arrays) is None
+    expected = GroceryStoreSimulation(StringIO(config)).run(StringIO(trace))
+    assert run_batch(StringIO(config), StringIO(trace)) == expected
+
+
+if __name__ == '__main__':
+    pytest.main(['test_batch.py'])
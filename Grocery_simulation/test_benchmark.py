@@ -0,0 +1,93 @@
+"""Цей модуль містить тести для набору вимірювань швидкодії.
+"""
+import os
+import tempfile
+from io import StringIO
+import pytest
+from benchmark import run_suite, check_regression, save_results, \
+    load_results, main, bench_simulation_queues, replay_queue, \
+    store_config, workload_text, RecordingQueue, BASELINE_PATH, SIZES
+from container import CalendarQueue, PriorityQueue
+from event import EVENT_ORDER
+from simulation import GroceryStoreSimulation
+
+
+def test_run_suite_covers_hot_paths() -> None:
+    """Перевіряє, що набір вимірює всі гарячі шляхи для кожного розміру."""
+    results = run_suite({'events': [50], 'lanes': [3, 6]}, repeat=1)
+    names = [row['name'] for row in results]
+    assert names == ['priority_queue/n=50', 'parse/n=50',
+                     'enter_line/n=50/lanes=3', 'simulation/n=50/lanes=3',
+                     'enter_line/n=50/lanes=6', 'simulation/n=50/lanes=6']
+    assert all(row['throughput'] > 0 for row in results)
+
+def test_simulation_queue_replay() -> None:
+    """Перевіряє, що записані операції черги подій симуляції дають той
+    самий порядок подій для PriorityQueue і CalendarQueue."""
+    sim = GroceryStoreSimulation(store_config(12, 20), RecordingQueue)
+    sim.run(StringIO(workload_text(500, 0.2)))
+    ops = sim._events.ops
+    removed = replay_queue(PriorityQueue(EVENT_ORDER), ops)
+    assert len(removed) >= 500
+    assert replay_queue(CalendarQueue(), ops) == removed
+    rows = bench_simulation_queues(200, [3, 48], repeat=1)
+    assert [row['lanes'] for row in rows] == [3, 48]
+    assert all(row['heap'] > 0 and row['calendar'] > 0 for row in rows)
+
+def test_check_regression() -> None:
+    """Перевіряє поріг регресії пропускної здатності."""
+    baseline = [{'name': 'a', 'throughput': 1000.0},
+                {'name': 'b', 'throughput': 1000.0}]
+    results = [{'name': 'a', 'throughput': 900.0},
+               {'name': 'b', 'throughput': 500.0},
+               {'name': 'c', 'throughput': 1.0}]
+    assert check_regression(results, baseline, 20) == \
+        ['b: 500 ops/s vs baseline 1000 ops/s (-50.0%)']
+    assert check_regression(results, baseline, 60) == []
+
+def test_baseline_round_trip() -> None:
+    """Перевіряє запис і читання результатів і код виходу main."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'baseline.json')
+        results = [{'name': 'a', 'ops': 10, 'seconds': 0.5,
+                    'throughput': 20.0}]
+        save_results(results, path)
+        assert load_results(path) == results
+        fast = [{'name': 'simulation/n=1000/lanes=3', 'throughput': 1e12}]
+        save_results(fast, path)
+        assert main(['--scale', 'small', '--repeat', '1',
+                     '--baseline', path]) == 1
+
+def test_committed_baseline() -> None:
+    """Перевіряє формат збережених еталонних результатів і те, що вони
+    покривають набір small."""
+    baseline = load_results(BASELINE_PATH)
+    for row in baseline:
+        assert set(row) == {'name', 'ops', 'seconds', 'throughput'}
+        assert isinstance(row['name'], str)
+        assert row['ops'] > 0 and row['seconds'] > 0
+        assert row['throughput'] > 0
+    names = {row['name'] for row in baseline}
+    assert len(names) == len(baseline)
+    sizes = SIZES['small']
+    for n in sizes['events']:
+        assert {'priority_queue/n={}'.format(n),
+                'parse/n={}'.format(n)} <= names
+        for lanes in sizes['lanes']:
+            assert {'enter_line/n={}/lanes={}'.format(n, lanes),
+                    'simulation/n={}/lanes={}'.format(n, lanes)} <= names
+    assert check_regression(baseline, baseline, 0) == []
+
+@pytest.mark.skipif(not os.environ.get('GROCERY_BENCHMARK'),
+                    reason='set GROCERY_BENCHMARK=1 to compare wall-clock '
+                           'throughput with the committed baseline')
+def test_committed_baseline_regression() -> None:
+    """Запускає набір small і порівнює його зі збереженими еталонними
+    результатами.  Результат залежить від машини, тому тест запускається
+    лише з GROCERY_BENCHMARK=1."""
+    assert main(['--scale', 'small', '--repeat', '5', '--baseline',
+                 '--tolerance', '30']) == 0
+
+if __name__ == '__main__':
+    import pytest
+    pytest.main(['test_benchmark.py'])
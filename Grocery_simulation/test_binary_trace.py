@@ -0,0 +1,85 @@
+"""Цей модуль містить тести для двійкового формату файлів подій.
+"""
+import os
+import tempfile
+import pytest
+from binary_trace import BinaryTrace, convert_directory, convert_text_trace
+from event import iter_sorted_events
+from simulation import GroceryStoreSimulation
+
+
+def convert(events: str, directory: str) -> str:
+    """Перетворює файл подій <events> і повертає шлях до двійкового файлу."""
+    path = os.path.join(directory, events + '.gst')
+    with open('input_files/' + events) as event_file:
+        convert_text_trace(event_file, path)
+    return path
+
+
+def test_binary_trace_round_trip() -> None:
+    """Перевіряє, що двійковий файл містить ті самі події."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = convert('events_mixtures.txt', directory)
+        with open('input_files/events_mixtures.txt') as event_file:
+            expected = [str(e) for e in iter_sorted_events(event_file)]
+        with BinaryTrace(path) as trace:
+            events = list(trace.iter_events())
+            assert len(trace) == len(expected)
+        assert [str(e) for e in events] == expected
+        assert events[2].customer.num_items() == 7
+        assert events[2].customer.get_item_time() == 7
+
+def test_binary_trace_simulation() -> None:
+    """Перевіряє, що симуляція з двійкового файлу дає ту саму статистику."""
+    with tempfile.TemporaryDirectory() as directory:
+        for events in ['events_mixtures.txt', 'events_one_close.txt']:
+            path = convert(events, directory)
+            with open('input_files/config_333_01.json') as config_file:
+                sim = GroceryStoreSimulation(config_file)
+            with open('input_files/' + events) as event_file:
+                expected = sim.run(event_file)
+            with open('input_files/config_333_01.json') as config_file:
+                sim = GroceryStoreSimulation(config_file)
+            with BinaryTrace(path) as trace:
+                assert sim.run_events(trace.iter_events()) == expected
+
+def test_convert_directory() -> None:
+    """Перевіряє перетворення всіх файлів подій каталогу."""
+    with tempfile.TemporaryDirectory() as directory:
+        paths = convert_directory('input_files', directory)
+        names = sorted(name for name in os.listdir('input_files')
+                       if name.endswith('.txt'))
+        assert paths == [os.path.join(directory, name[:-4] + '.gst')
+                         for name in names]
+        for name, path in zip(names, paths):
+            with open('input_files/' + name) as event_file:
+                expected = [str(e) for e in iter_sorted_events(event_file)]
+            with BinaryTrace(path) as trace:
+                assert [str(e) for e in trace.iter_events()] == expected
+
+def test_not_a_binary_trace() -> None:
+    """Перевіряє, що короткі й чужі файли не приймаються."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'short.gst')
+        with open(path, 'wb') as short_file:
+            short_file.write(b'GSTRACE1')
+        for bad in [path, 'input_files/config_111_01.json']:
+            with pytest.raises(ValueError):
+                BinaryTrace(bad)
+
+def test_truncated_binary_trace() -> None:
+    """Перевіряє, що обрізаний або подовжений двійковий файл не
+    приймається."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = convert('events_mixtures.txt', directory)
+        with open(path, 'rb') as trace_file:
+            data = trace_file.read()
+        for bad in [data[:-3], data[:-len(data) // 2], data + b'\0']:
+            with open(path, 'wb') as trace_file:
+                trace_file.write(bad)
+            with pytest.raises(ValueError):
+                BinaryTrace(path)
+
+
+if __name__ == '__main__':
+    pytest.main(['test_binary_trace.py'])
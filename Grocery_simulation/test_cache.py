@@ -0,0 +1,117 @@
+"""Цей модуль містить тести для кешу файлів подій і статистики симуляцій.
+"""
+import os
+import shutil
+import tempfile
+import pytest
+from cache import SimulationCache, STATS_SUFFIX, TRACE_SUFFIX
+from simulation import GroceryStoreSimulation
+from sweep import sweep
+
+CONFIG = 'input_files/config_111_10.json'
+EVENTS = 'input_files/events_mixtures.txt'
+
+
+def run(config: str, events: str) -> dict:
+    """Повертає статистику окремого запуску симуляції."""
+    with open(config) as config_file:
+        sim = GroceryStoreSimulation(config_file)
+    with open(events) as event_file:
+        return sim.run(event_file)
+
+
+def test_cache_hits() -> None:
+    """Перевіряє, що кеш повертає ту саму статистику з пам’яті й з диска,
+    а той самий вміст за іншим шляхом чи в іншому форматі JSON — теж."""
+    expected = run(CONFIG, EVENTS)
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SimulationCache(os.path.join(directory, 'cache'))
+        assert cache.stats(CONFIG, EVENTS) == expected
+        assert cache.stats(CONFIG, EVENTS) == expected
+        assert (cache.misses, cache.memory_hits, cache.disk_hits) == (1, 1, 0)
+        cache = SimulationCache(cache.directory)
+        assert cache.stats(CONFIG, EVENTS) == expected
+        assert (cache.misses, cache.memory_hits, cache.disk_hits) == (0, 0, 1)
+
+        events = os.path.join(directory, 'copy.txt')
+        shutil.copy(EVENTS, events)
+        config = os.path.join(directory, 'config.json')
+        with open(config, 'w') as config_file:
+            config_file.write('{"line_capacity":10, "self_serve_count":1,\n'
+                              ' "express_count":1, "regular_count":1}')
+        assert run(config, events) == expected
+        assert cache.stats(config, events) == expected
+        assert cache.misses == 0
+        assert len([name for name in os.listdir(cache.directory)
+                    if name.endswith(TRACE_SUFFIX)]) == 1
+
+        with open(events, 'a') as event_file:
+            event_file.write('\n500 Arrive Zed Milk 3\n')
+        assert cache.get_stats(config, events) is None
+        assert cache.stats(config, events) == run(config, events)
+        assert cache.misses == 2
+
+
+def test_cache_eviction() -> None:
+    """Перевіряє, що кеш на диску не перевищує обмеження й витісняє файл,
+    що найдовше не використовувався."""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SimulationCache(directory, max_bytes=0)
+        first = cache.trace_path('input_files/events_base.txt')
+        assert os.listdir(directory) == [os.path.basename(first)]
+        with tempfile.TemporaryDirectory() as other:
+            size = os.path.getsize(SimulationCache(other).trace_path(EVENTS))
+        cache.max_bytes = size + 100
+        cache.put_stats(CONFIG, 'input_files/events_base.txt', {'a': 1})
+        cache.trace_path(EVENTS)
+        names = os.listdir(directory)
+        assert os.path.basename(first) not in names
+        assert sum(os.path.getsize(os.path.join(directory, name))
+                   for name in names) <= cache.max_bytes
+        assert any(name.endswith(STATS_SUFFIX) for name in names)
+
+
+def test_cache_skips_errors() -> None:
+    """Перевіряє, що помилки симуляції не кешуються."""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SimulationCache(directory)
+        for _ in range(2):
+            with pytest.raises(IndexError):
+                cache.stats('input_files/config_001_10.json', EVENTS)
+        assert cache.misses == 2
+        assert not any(name.endswith(STATS_SUFFIX)
+                       for name in os.listdir(directory))
+
+
+def test_sweep_with_cache() -> None:
+    """Перевіряє, що перебір з кешем дає ті самі рядки й удруге не симулює
+    жодної пари без помилки."""
+    configs = [CONFIG, 'input_files/config_001_10.json']
+    event_files = ['input_files/events_base.txt', EVENTS]
+    expected = sweep(configs, event_files, processes=1)
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SimulationCache(directory)
+        assert sweep(configs, event_files, 1, cache) == expected
+        misses = cache.misses
+        assert sweep(configs, event_files, 1, cache) == expected
+        failed = sum(1 for row in expected if row['error'])
+        assert cache.misses - misses == failed
+        assert cache.memory_hits == len(expected) - failed
+
+
+def test_sweep_with_small_cache() -> None:
+    """Перевіряє, що перебір з малим кешем не витісняє файли подій, потрібні
+    ще не виконаним парам, а після перебору кеш знову в межах обмеження."""
+    event_files = ['input_files/events_base.txt', EVENTS,
+                   'input_files/events_one_close.txt']
+    expected = sweep([CONFIG], event_files, processes=1)
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SimulationCache(directory, max_bytes=3000)
+        assert sweep([CONFIG], event_files, 2, cache) == expected
+        assert not any(row['error'] for row in expected)
+        assert sum(os.path.getsize(os.path.join(directory, name))
+                   for name in os.listdir(directory)) <= cache.max_bytes
+
+
+if __name__ == '__main__':
+    pytest.main(['test_cache.py'])
@@ -137,6 +137,45 @@ def test_close() -> None:
     assert b.queue == [c2]
     assert c.queue == []
 
+def test_close_returns_list() -> None:
+    """Перевіряє, що close і queue повертають списки, зміна яких не
+    змінює рядок."""
+    a = RegularLine(3)
+    c1 = Customer('A', [Item('bananas', 7)])
+    c2 = Customer('B', [Item('apple', 2)])
+    a.accept(c1)
+    a.accept(c2)
+    remaining = a.close()
+    assert type(remaining) is list and remaining == [c2]
+    remaining.append(c1)
+    a.queue.append(c2)
+    assert type(a.queue) is list and a.queue == [c1]
+    assert len(a) == 1
+
+def test_close_queue_hands_over_deque() -> None:
+    """Перевіряє, що close_queue повертає колишню deque рядка без
+    копіювання, а клієнт на касі залишається."""
+    a = ExpressLine(3)
+    customers = [Customer(name, [Item('gum', 1)]) for name in 'ABC']
+    for customer in customers:
+        a.accept(customer)
+    queue = a._queue
+    remaining = a.close_queue()
+    assert remaining is queue and list(remaining) == customers[1:]
+    assert a.queue == customers[:1] and not a.is_open
+
+def test_peak_length() -> None:
+    """Перевіряє, що каса запам'ятовує найбільшу довжину черги."""
+    a = RegularLine(3)
+    c1 = Customer('A', [Item('bananas', 7)])
+    c2 = Customer('B', [Item('apple', 2)])
+    assert a.peak_length == 0
+    a.accept(c1)
+    a.accept(c2)
+    a.complete_checkout()
+    a.accept(c1)
+    assert a.peak_length == 2
+
 
 if __name__ == '__main__':
     import pytest
@@ -0,0 +1,104 @@
+"""Цей модуль містить тести для знімків стану і відновлення симуляції.
+"""
+import os
+import tempfile
+from io import StringIO
+import pytest
+from checkpoint import Snapshot, read_snapshot, write_snapshot
+from container import CalendarQueue
+from event import CheckoutCompleted
+from generator import write_workload
+from profiler import Profiler
+from simulation import GroceryStoreSimulation
+
+CONFIG = '{"regular_count": 2, "express_count": 1, ' \
+         '"self_serve_count": 1, "line_capacity": 3}'
+
+
+class Crash(Exception):
+    """Імітація збою симуляції."""
+
+
+def workload() -> str:
+    """Повертає файл подій з чергами, залою очікування і закриттям кас."""
+    out = StringIO()
+    write_workload(out, 300, seed=9, rate=0.1, closes=[(500, 0), (900, 2)])
+    return out.getvalue()
+
+
+def crash_after(count: int) -> Profiler:
+    """Повертає профайлер, що перериває симуляцію після <count> подій."""
+    seen = []
+
+    def callback(event, elapsed) -> None:
+        """Рахує події і перериває симуляцію."""
+        seen.append(event)
+        if len(seen) == count:
+            raise Crash()
+    return Profiler(callback)
+
+
+def test_resume_after_crash() -> None:
+    """Перевіряє, що продовжена після збою симуляція дає той самий
+    результат."""
+    events = workload()
+    expected = GroceryStoreSimulation(StringIO(CONFIG)).run(StringIO(events))
+    assert expected['max_wait'] > 0
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'sim.snap')
+        for interval, crash in [(1, 5), (50, 130), (200, 999), (7, 1200)]:
+            sim = GroceryStoreSimulation(StringIO(CONFIG),
+                                         checkpoint_path=path,
+                                         checkpoint_interval=interval)
+            with pytest.raises(Crash):
+                sim.run(StringIO(events), profiler=crash_after(crash))
+            snapshot = read_snapshot(path)
+            assert snapshot.consumed > 0
+            resumed = GroceryStoreSimulation(StringIO(CONFIG))
+            assert resumed.resume(path, StringIO(events)) == expected
+            os.remove(path)
+
+def describe(snapshot: Snapshot) -> tuple:
+    """Повертає вміст знімка <snapshot> у вигляді для порівняння."""
+    return (snapshot.stats, snapshot.consumed, snapshot.capacity_version,
+            [(is_open, peak, [c.name for c in queue])
+             for is_open, peak, queue in snapshot.lines],
+            sorted(c.name for c in snapshot.waiting),
+            [str(e) for e in snapshot.events])
+
+
+def test_snapshot_round_trip() -> None:
+    """Перевіряє, що знімок зберігає стан і спільних клієнтів."""
+    events = workload()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'sim.snap')
+        sim = GroceryStoreSimulation(StringIO(CONFIG),
+                                     queue_class=CalendarQueue,
+                                     checkpoint_path=path,
+                                     checkpoint_interval=400)
+        with pytest.raises(Crash):
+            sim.run(StringIO(events), profiler=crash_after(401))
+        snapshot = read_snapshot(path)
+        assert any(not is_open for is_open, _, _ in snapshot.lines)
+        assert snapshot.waiting
+        in_lines = {id(c) for _, _, queue in snapshot.lines for c in queue}
+        completing = [e.customer for e in snapshot.events
+                      if isinstance(e, CheckoutCompleted)]
+        assert completing and all(id(c) in in_lines for c in completing)
+        copy = os.path.join(directory, 'copy.snap')
+        write_snapshot(snapshot, copy)
+        assert describe(read_snapshot(copy)) == describe(snapshot)
+        expected = GroceryStoreSimulation(StringIO(CONFIG)).run(
+            StringIO(events))
+        resumed = GroceryStoreSimulation(StringIO(CONFIG),
+                                         queue_class=CalendarQueue)
+        assert resumed.resume(path, StringIO(events)) == expected
+
+def test_not_a_snapshot() -> None:
+    """Перевіряє, що інші файли не приймаються як знімки."""
+    with pytest.raises(ValueError):
+        read_snapshot('input_files/config_111_01.json')
+
+
+if __name__ == '__main__':
+    pytest.main(['test_checkpoint.py'])
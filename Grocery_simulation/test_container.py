@@ -0,0 +1,134 @@
+"""Цей модуль містить тести для класу PriorityQueue.
+"""
+import random
+from container import PriorityQueue, CalendarQueue
+from event import Event, EVENT_ORDER
+from benchmark import ListPriorityQueue, random_timestamps
+
+
+def test_priority_queue_order() -> None:
+    """Перевіряє, що елементи видаляються за пріоритетом."""
+    pq = PriorityQueue()
+    for t in [5, 1, 4, 2, 3]:
+        pq.add(Event(t))
+    assert len(pq) == 5
+    assert [pq.remove().timestamp for _ in range(5)] == [1, 2, 3, 4, 5]
+    assert pq.is_empty()
+
+def test_priority_queue_fifo_ties() -> None:
+    """Перевіряє, що рівні елементи видаляються в порядку FIFO."""
+    pq = PriorityQueue()
+    e1 = Event(3)
+    e2 = Event(1)
+    e3 = Event(3)
+    e4 = Event(3)
+    for e in [e1, e2, e3, e4]:
+        pq.add(e)
+    assert pq.peek() is e2
+    assert pq.remove() is e2
+    assert pq.remove() is e1
+    assert pq.remove() is e3
+    assert pq.remove() is e4
+
+def test_priority_queue_matches_list_version() -> None:
+    """Перевіряє, що порядок видалення збігається зі списковою реалізацією."""
+    pq = PriorityQueue()
+    lpq = ListPriorityQueue()
+    for t in random_timestamps(300, seed=7):
+        e = Event(t)
+        pq.add(e)
+        lpq.add(e)
+    while not lpq.is_empty():
+        assert pq.remove() is lpq.remove()
+    assert pq.is_empty()
+
+def test_calendar_queue_matches_priority_queue() -> None:
+    """Перевіряє, що CalendarQueue видаляє події в тому ж порядку."""
+    pq = PriorityQueue()
+    cq = CalendarQueue(width=16)
+    for t in random_timestamps(300, seed=3):
+        e = Event(t)
+        pq.add(e)
+        cq.add(e)
+    assert len(cq) == 300
+    while not pq.is_empty():
+        assert cq.peek() is pq.peek()
+        assert cq.remove() is pq.remove()
+    assert cq.is_empty()
+
+def test_calendar_queue_interleaved() -> None:
+    """Перевіряє додавання подій під час видалення, як у симуляції."""
+    pq = PriorityQueue()
+    cq = CalendarQueue(width=4)
+    for t in [50, 3, 3, 1000, 7]:
+        e = Event(t)
+        pq.add(e)
+        cq.add(e)
+    while not pq.is_empty():
+        e = pq.remove()
+        assert cq.remove() is e
+        if e.timestamp < 200:
+            for delay in [1, 9]:
+                spawn = Event(e.timestamp + delay * 20)
+                pq.add(spawn)
+                cq.add(spawn)
+    assert cq.is_empty()
+
+def test_calendar_queue_peek_keeps_window() -> None:
+    """Перевіряє, що події, додані після peek раніше за знайдену, стають у
+    свій кошик без зсуву вікна назад, а порядок збігається з
+    PriorityQueue і за довільних додавань."""
+    rewinds = []
+
+    class CountingQueue(CalendarQueue):
+        """Черга, що рахує зсуви вікна назад."""
+        def _rewind(self, t: int) -> None:
+            rewinds.append(t)
+            CalendarQueue._rewind(self, t)
+
+    rng = random.Random(5)
+    for behind in [False, True]:
+        pq = PriorityQueue()
+        cq = CountingQueue(width=8)
+        now = 0
+        for _ in range(2000):
+            op = rng.random()
+            if pq.is_empty() or op < 0.5:
+                low = 0 if behind and rng.random() < 0.05 else now
+                e = Event(rng.randint(low, now + 40))
+                pq.add(e)
+                cq.add(e)
+            elif op < 0.75:
+                assert cq.peek() is pq.peek()
+            else:
+                e = pq.remove()
+                assert cq.remove() is e
+                now = e.timestamp
+        while not pq.is_empty():
+            assert cq.remove() is pq.remove()
+        assert cq.is_empty()
+        assert bool(rewinds) == behind
+
+def test_priority_queue_key_skips_comparisons() -> None:
+    """Перевіряє, що черга з ключем EVENT_ORDER упорядковує події за
+    міткою часу, не викликаючи методів порівняння Event."""
+    class UnorderedEvent(Event):
+        """Подія, яку не можна порівнювати."""
+        __slots__ = ()
+
+        def __eq__(self, other) -> bool:
+            raise AssertionError('events were compared')
+        __lt__ = __le__ = __gt__ = __ge__ = __eq__
+    pq = PriorityQueue(EVENT_ORDER)
+    events = [UnorderedEvent(t) for t in [3, 1, 3, 2, 1]]
+    for e in events:
+        pq.add(e)
+    assert pq.peek() is events[1]
+    order = [pq.remove() for _ in range(5)]
+    assert [id(e) for e in order] == \
+        [id(events[i]) for i in [1, 4, 3, 0, 2]]
+
+
+if __name__ == '__main__':
+    import pytest
+    pytest.main(['test_container.py'])
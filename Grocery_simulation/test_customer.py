@@ -2,6 +2,7 @@
 """
 from store import Customer
 from store import Item
+from store import customers_from_arrays
 
 
 def test_customer_init() -> None:
@@ -28,6 +29,22 @@ def test_customer_get_item_time() -> None:
     assert c1.get_item_time() == 8
     assert c2.get_item_time() == 0
 
+def test_customer_from_totals() -> None:
+    """Перевіряє клієнтів, створених без об'єктів Item."""
+    c1 = Customer.from_totals('Valeriy', 2, 8)
+    assert c1.name == 'Valeriy'
+    assert c1.arrival_time == -1
+    assert c1.num_items() == 2
+    assert c1.get_item_time() == 8
+    c2, c3 = customers_from_arrays(['Anton', 'Olha'], [0, 3], [0, 9])
+    assert (c2.name, c2.num_items(), c2.get_item_time()) == ('Anton', 0, 0)
+    assert (c3.name, c3.num_items(), c3.get_item_time()) == ('Olha', 3, 9)
+
+def test_customer_slots() -> None:
+    """Перевіряє, що Customer і Item не мають __dict__."""
+    assert not hasattr(Customer('Anton', []), '__dict__')
+    assert not hasattr(Item('mango', 1), '__dict__')
+
 if __name__ == '__main__':
     import pytest
     pytest.main(['test_customer.py'])
@@ -0,0 +1,90 @@
+"""Цей модуль містить тести для читання файлів подій.
+"""
+from io import StringIO
+from event import create_event_list, iter_events, iter_sorted_events, \
+    CustomerArrival, CustomersWaiting, CheckoutStarted, CheckoutCompleted, \
+    CloseLine, ARRIVAL, WAITING, STARTED, COMPLETED, CLOSE
+from store import Customer, Item
+
+UNSORTED_EVENTS = '''10 Arrive Tamara Bananas 7
+5 Arrive Jugo Bread 3 Cheese 3
+7 Close 0
+
+5 Arrive Ann Gum 1
+3 Close 1
+10 Arrive Ivan Milk 4
+'''
+
+
+class UnseekableFile(StringIO):
+    """Файл, який можна прочитати лише один раз, як канал."""
+    def seekable(self) -> bool:
+        return False
+
+
+def event_keys(events) -> list:
+    """Повертає пари (мітка часу, ім'я або номер рядка) для <events>."""
+    keys = []
+    for e in events:
+        if isinstance(e, CustomerArrival):
+            keys.append((e.timestamp, e.customer.name))
+        else:
+            keys.append((e.timestamp, e.line_number))
+    return keys
+
+
+def test_iter_events_matches_create_event_list() -> None:
+    """Перевіряє, що потокове читання дає ті самі події."""
+    with open('input_files/events_mixtures.txt') as f:
+        expected = event_keys(create_event_list(f))
+    with open('input_files/events_mixtures.txt') as f:
+        assert event_keys(iter_events(f)) == expected
+    assert isinstance(next(iter_events(StringIO('7 Close 2'))), CloseLine)
+
+def test_iter_sorted_events_stable() -> None:
+    """Перевіряє сортування за часом зі збереженням порядку файлу."""
+    expected = [(3, 1), (5, 'Jugo'), (5, 'Ann'), (7, 0),
+                (10, 'Tamara'), (10, 'Ivan')]
+    assert event_keys(iter_sorted_events(StringIO(UNSORTED_EVENTS))) == \
+        expected
+    assert event_keys(iter_sorted_events(UnseekableFile(UNSORTED_EVENTS),
+                                         chunk_size=2)) == expected
+
+def test_iter_sorted_events_sorted_file() -> None:
+    """Перевіряє, що впорядкований файл читається без змін."""
+    with open('input_files/events_base.txt') as f:
+        expected = event_keys(create_event_list(f))
+    with open('input_files/events_base.txt') as f:
+        assert event_keys(iter_sorted_events(f)) == expected
+
+def test_events_are_compact() -> None:
+    """Перевіряє, що події не мають словника атрибутів і мають свій код
+    типу."""
+    c = Customer('Ann', [Item('Gum', 1)])
+    events = [CustomerArrival(0, c), CustomersWaiting(1, [c], 0),
+              CheckoutStarted(2, 0), CheckoutCompleted(3, 0, c),
+              CloseLine(4, 1)]
+    for e in events:
+        assert not hasattr(e, '__dict__')
+    assert [e.kind for e in events] == \
+        [ARRIVAL, WAITING, STARTED, COMPLETED, CLOSE]
+
+def test_waiting_group_merge_keeps_order() -> None:
+    """Перевіряє, що злиття груп очікування зберігає порядок спроб
+    незалежно від того, яка група більша."""
+    small = [Customer(str(i), [Item('Gum', 1)]) for i in range(3)]
+    large = [Customer(str(i), [Item('Gum', 1)] * 9) for i in range(3, 6)]
+    first = [small[0], large[0]]
+    second = [large[1], small[1], small[2], large[2]]
+    for a, b in [(first, second), (second, first)]:
+        group = CustomersWaiting(1, list(a), 3)
+        group.merge(CustomersWaiting(1, list(b), 2))
+        assert group.customers == a + b
+        assert len(group) == 6 and group.version == 2
+        group.merge(CustomersWaiting(1, [small[0]], 2))
+        assert group.customers == a + b + [small[0]]
+
+
+if __name__ == '__main__':
+    import pytest
+    pytest.main(['test_event.py'])
@@ -0,0 +1,54 @@
+"""Цей модуль містить тести для генератора синтетичних файлів подій.
+"""
+from io import StringIO
+from event import create_event_list, CustomerArrival, CloseLine
+from generator import daily_curve, iter_workload, write_workload
+from store import EXPRESS_LIMIT
+
+
+def generate(num_customers: int, seed: int, **kwargs) -> str:
+    """Повертає текст файлу подій, створеного write_workload."""
+    out = StringIO()
+    write_workload(out, num_customers, seed, **kwargs)
+    return out.getvalue()
+
+
+def test_workload_is_reproducible() -> None:
+    """Перевіряє, що однаковий seed дає однаковий файл."""
+    assert generate(200, 3) == generate(200, 3)
+    assert generate(200, 3) != generate(200, 4)
+
+def test_workload_is_readable_and_sorted() -> None:
+    """Перевіряє, що файл читається create_event_list і впорядкований."""
+    text = generate(500, 1, rate=2.0, closes=[(30, 1), (30, 2), (90, 0)])
+    events = create_event_list(StringIO(text))
+    times = [e.timestamp for e in events]
+    assert times == sorted(times)
+    closes = [(e.timestamp, e.line_number) for e in events
+              if isinstance(e, CloseLine)]
+    assert closes == [(30, 1), (30, 2), (90, 0)]
+    assert sum(isinstance(e, CustomerArrival) for e in events) == 500
+
+def test_workload_express_share() -> None:
+    """Перевіряє частку клієнтів, які можуть стати в експрес-касу."""
+    events = list(iter_workload(2000, 2, express_share=0.3, max_items=15))
+    small = sum(e.customer.num_items() <= EXPRESS_LIMIT for e in events)
+    assert 450 < small < 750
+    assert max(e.customer.num_items() for e in events) <= 15
+
+def test_iter_workload_matches_file() -> None:
+    """Перевіряє, що події напряму збігаються з подіями з файлу."""
+    kwargs = {'rate': daily_curve(0.5, 4.0, 600), 'max_rate': 4.0,
+              'closes': [(100, 0)]}
+    from_file = create_event_list(StringIO(generate(300, 7, **kwargs)))
+    direct = list(iter_workload(300, 7, **kwargs))
+    assert [str(e) for e in direct] == [str(e) for e in from_file]
+    assert [e.customer.get_item_time() for e in direct
+            if isinstance(e, CustomerArrival)] == \
+        [e.customer.get_item_time() for e in from_file
+         if isinstance(e, CustomerArrival)]
+
+
+if __name__ == '__main__':
+    import pytest
+    pytest.main(['test_generator.py'])
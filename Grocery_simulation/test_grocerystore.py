@@ -129,6 +129,107 @@ def test_close_line_and_get_first_in_line() -> None:
     assert gs._checkout_lines[0].queue == [c1]
     assert gs2.get_first_in_line(0) is None
 
+def test_waiting_room() -> None:
+    """Перевіряє залу очікування класу GroceryStore."""
+    gs = GroceryStore(StringIO(ONE_LINE_FILE_CONTENTS))
+    c1 = Customer('A', [Item('bananas', 7)])
+    c2 = Customer('B', [Item('apple', 2)])
+    gs.wait(c1)
+    gs.wait(c2)
+    assert set(gs.get_waiting()) == {c1, c2}
+    gs.leave_waiting_room(c1)
+    assert gs.get_waiting() == [c2]
+
+def test_capacity_version() -> None:
+    """Перевіряє, що лічильник змінюється лише при звільненні місця."""
+    gs = GroceryStore(StringIO(ONE_LINE_FILE_CONTENTS))
+    version = gs.get_capacity_version()
+    gs.enter_line(Customer('A', [Item('bananas', 7)]))
+    gs.enter_line(Customer('B', [Item('apple', 2)]))
+    gs.close_line(0)
+    assert gs.get_capacity_version() == version
+    gs.complete_checkout(0)
+    assert gs.get_capacity_version() != version
+
+def test_enter_line_matches_linear_scan() -> None:
+    """Перевіряє, що enter_line обирає ту саму чергу, що й повний перебір:
+    найкоротшу з тих, що приймають клієнта, а серед рівних — першу."""
+    import random
+    rng = random.Random(1)
+    gs = GroceryStore(StringIO('{"regular_count": 4,"express_count": 3, '
+                               '"self_serve_count": 5,"line_capacity": 4}'))
+    lines = gs._checkout_lines
+    for step in range(2000):
+        action = rng.random()
+        line_number = rng.randrange(len(lines))
+        if action < 0.6:
+            c = Customer(str(step), [Item('gum', 1)] * rng.randrange(1, 12))
+            expected = -1
+            for i, line in enumerate(lines):
+                if line.can_accept(c) and \
+                        (expected == -1 or len(line) < len(lines[expected])):
+                    expected = i
+            assert gs.enter_line(c) == expected
+        elif action < 0.98:
+            if len(lines[line_number]) > 0:
+                gs.complete_checkout(line_number)
+        elif lines[line_number].is_open:
+            gs.close_line(line_number)
+
+def test_enter_lines_matches_enter_line() -> None:
+    """Перевіряє, що enter_lines ставить пакет клієнтів так само, як
+    послідовні виклики enter_line."""
+    import random
+    rng = random.Random(2)
+    config = '{"regular_count": 3,"express_count": 2, ' \
+             '"self_serve_count": 2,"line_capacity": 3}'
+    batched = GroceryStore(StringIO(config))
+    single = GroceryStore(StringIO(config))
+    for step in range(300):
+        line_number = rng.randrange(7)
+        if rng.random() < 0.5:
+            customers = [Customer(str(step), [Item('gum', 1)] *
+                                  rng.randrange(1, 12))
+                         for _ in range(rng.randrange(1, 6))]
+            expected = []
+            for c in customers:
+                i = single.enter_line(c)
+                expected.append((i, i != -1 and single.line_is_ready(i)))
+            assert batched.enter_lines(customers) == expected
+        elif len(single._checkout_lines[line_number]) > 0:
+            single.complete_checkout(line_number)
+            batched.complete_checkout(line_number)
+        elif rng.random() < 0.1:
+            single.close_line(line_number)
+            batched.close_line(line_number)
+    assert [len(line) for line in batched._checkout_lines] == \
+        [len(line) for line in single._checkout_lines]
+
+def test_store_config_and_reset() -> None:
+    """Перевіряє створення магазину зі словника і StoreConfig та reset, що
+    очищає каси на місці."""
+    config = StoreConfig.from_file(StringIO(SHORT_FILE_CONTENTS))
+    gs = GroceryStore(config.to_dict())
+    assert gs.get_config() == config
+    assert GroceryStore(config).get_line_kinds() == gs.get_line_kinds()
+    lines = list(gs._checkout_lines)
+    for name in 'ABCDEFG':
+        c = Customer(name, [Item('gum', 1)])
+        if gs.enter_line(c) == -1:
+            gs.wait(c)
+    gs.complete_checkout(0)
+    gs.close_line(1)
+    gs.reset()
+    assert gs._checkout_lines == lines
+    assert gs.get_line_states() == [(True, 0, [])] * 3
+    assert gs.get_waiting() == []
+    assert gs.get_capacity_version() == 0
+    fresh = GroceryStore(config)
+    for name in 'ABCDEFG':
+        c = Customer(name, [Item('gum', 1)] * 8)
+        assert gs.enter_line(c) == fresh.enter_line(c)
+
+
 if __name__ == '__main__':
     import pytest
     pytest.main(['test_grocerystore.py'])
@@ -0,0 +1,92 @@
+"""Цей модуль містить тести для профілювання симуляції.
+"""
+import json
+from io import StringIO
+from container import PriorityQueue
+from event import create_event_list
+from profiler import Profiler
+from simulation import GroceryStoreSimulation
+
+
+def run_profiled(config: str, events: str, profiler: Profiler) -> dict:
+    """Запускає симуляцію з <profiler> для <config> і <events> з каталогу
+    input_files."""
+    with open('input_files/' + config) as config_file:
+        sim = GroceryStoreSimulation(config_file)
+    with open('input_files/' + events) as event_file:
+        return sim.run(event_file, profiler=profiler)
+
+
+def test_profiler_does_not_change_stats() -> None:
+    """Перевіряє, що профілювання не змінює статистику симуляції."""
+    profiler = Profiler()
+    stats = run_profiled('config_111_01.json', 'events_mixtures.txt',
+                         profiler)
+    assert stats == {'num_customers': 75, 'total_time': 2209,
+                     'max_wait': 2207}
+    assert profiler.counts['CustomerArrival'] == 75
+    assert profiler.counts['CheckoutCompleted'] == 75
+    assert profiler.retries > 0
+    assert profiler.peak_queue > 0
+    report = profiler.report()
+    assert report['num_events'] == sum(profiler.counts.values())
+    assert report['events_per_second'] > 0
+    assert json.loads(json.dumps(report)) == report
+    assert 'CheckoutStarted' in profiler.format_report()
+
+def test_profiler_callback_sees_every_event() -> None:
+    """Перевіряє, що функція зворотного виклику отримує кожну подію."""
+    seen = []
+    profiler = Profiler(lambda event, elapsed: seen.append(event.timestamp))
+    run_profiled('config_111_10.json', 'events_base.txt', profiler)
+    assert len(seen) == profiler.num_events()
+    assert seen == sorted(seen)
+    with open('input_files/events_base.txt') as event_file:
+        initial = create_event_list(event_file)
+    assert profiler.counts['CustomerArrival'] + profiler.counts['CloseLine'] \
+        == len(initial)
+
+def test_profiler_restores_queue() -> None:
+    """Перевіряє, що після симуляції черга подій знову не профілюється."""
+    with open('input_files/config_111_10.json') as config_file:
+        sim = GroceryStoreSimulation(config_file)
+    with open('input_files/events_base.txt') as event_file:
+        sim.run(event_file, profiler=Profiler())
+    assert type(sim._events) is PriorityQueue
+
+def test_profiler_counts_only_real_retries() -> None:
+    """Перевіряє, що пропущені спроби клієнтів із зали очікування не
+    рахуються як повторні."""
+    config = '{"regular_count": 1, "express_count": 0, ' \
+             '"self_serve_count": 0, "line_capacity": 1}'
+    profiler = Profiler()
+    sim = GroceryStoreSimulation(StringIO(config))
+    stats = sim.run(StringIO('0 Arrive A Gum 100\n1 Arrive B Gum 2\n'
+                             '10 Arrive C Gum 3\n20 Arrive D Gum 4\n'),
+                    profiler=profiler)
+    assert stats == {'num_customers': 4, 'total_time': 109, 'max_wait': 108}
+    # Клієнти в залі очікування пробують стати в чергу лише тоді, коли
+    # каса звільняється: у моменти 100 (D стає, C ні), 104 (C стає, B ні)
+    # і 107 (B).  Після невдачі C у момент 100 B вже не пробує, а групи
+    # в моменти 10, 11, 20, 21, 101 і 105 пропускаються.
+    assert profiler.counts['CustomersWaiting'] == 9
+    assert profiler.retries == 5
+
+def test_profiler_peak_queue_counts_same_second_events() -> None:
+    """Перевіряє, що peak_queue враховує події поточної секунди, вже
+    вийняті з черги подій."""
+    config = '{"regular_count": 80, "express_count": 0, ' \
+             '"self_serve_count": 0, "line_capacity": 1}'
+    events = ''.join('{} Arrive {}{} Gum 5\n'.format(t, name, i)
+                     for t, name in [(0, 'A'), (5, 'B')] for i in range(40))
+    profiler = Profiler()
+    sim = GroceryStoreSimulation(StringIO(config))
+    stats = sim.run(StringIO(events), profiler=profiler)
+    assert stats == {'num_customers': 80, 'total_time': 10, 'max_wait': 5}
+    # У момент 5 сорок CheckoutCompleted для A вже вийнято з черги подій,
+    # а сорок клієнтів B додають ще сорок CheckoutStarted тієї ж секунди.
+    assert profiler.peak_queue == 80
+
+if __name__ == '__main__':
+    import pytest
+    pytest.main(['test_profiler.py'])
@@ -0,0 +1,128 @@
+"""Цей модуль містить тести для двійкового запису виконаних подій.
+"""
+import itertools
+import os
+import tempfile
+from io import StringIO
+import pytest
+from container import CalendarQueue
+from event import Event
+from generator import write_workload
+from profiler import Profiler
+from recorder import TraceReader, TraceReplay, TraceSink, TraceWriter
+from simulation import GroceryStoreSimulation
+
+CONFIG = '{"regular_count": 2, "express_count": 1, ' \
+         '"self_serve_count": 1, "line_capacity": 3}'
+
+
+class LineSink(TraceSink):
+    """Спостерігач, що запам'ятовує текстове представлення подій."""
+    def __init__(self) -> None:
+        self.lines = []
+
+    def record(self, event: Event) -> None:
+        self.lines.append(str(event))
+
+
+def workload() -> str:
+    """Повертає файл подій, клієнти якого приходять швидше, ніж їх
+    обслуговують 12 місць магазину CONFIG: групи очікування набагато
+    більші за буфер на 64 байти, а дві каси закриваються з клієнтами в
+    черзі."""
+    out = StringIO()
+    write_workload(out, 150, seed=4, rate=0.5, closes=[(60, 0), (150, 3)])
+    return out.getvalue()
+
+
+def test_trace_round_trip() -> None:
+    """Перевіряє, що запис відтворює всі виконані події в тому ж порядку,
+    зокрема групи очікування, що не вміщуються в буфер."""
+    events = workload()
+    expected = LineSink()
+    stats = GroceryStoreSimulation(StringIO(CONFIG)).run(
+        StringIO(events), profiler=Profiler(), recorder=expected)
+    assert any('keep waiting' in line for line in expected.lines)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'day.evlog')
+        for buffer_size in [64, 1 << 20]:
+            with TraceWriter(path, buffer_size) as recorder:
+                sim = GroceryStoreSimulation(StringIO(CONFIG))
+                assert sim.run(StringIO(events), recorder=recorder) == stats
+            with TraceReader(path) as trace:
+                assert len(trace) == len(expected.lines)
+                assert list(trace.iter_lines()) == expected.lines
+
+
+def test_trace_replay() -> None:
+    """Перевіряє, що перевірка за записом приймає іншу реалізацію черги
+    подій і знаходить розбіжності."""
+    events = workload()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'day.evlog')
+        with TraceWriter(path) as recorder:
+            GroceryStoreSimulation(StringIO(CONFIG)).run(StringIO(events),
+                                                         recorder=recorder)
+        with TraceReplay(path) as replay:
+            sim = GroceryStoreSimulation(StringIO(CONFIG), CalendarQueue)
+            sim.run(StringIO(events), recorder=replay)
+        with pytest.raises(ValueError, match='differs'):
+            with TraceReplay(path) as replay:
+                sim = GroceryStoreSimulation(
+                    StringIO(CONFIG.replace('"line_capacity": 3',
+                                            '"line_capacity": 4')))
+                sim.run(StringIO(events), recorder=replay)
+        with TraceReader(path) as trace:
+            first = list(itertools.islice(trace.iter_events(), 3))
+        with pytest.raises(ValueError, match='only 3'):
+            with TraceReplay(path) as replay:
+                for event in first:
+                    replay.record(event)
+
+
+def test_trace_after_resume() -> None:
+    """Перевіряє запис симуляції, продовженої зі знімка, де частина
+    клієнтів з’явилася до початку запису."""
+    events = workload()
+    full = LineSink()
+    GroceryStoreSimulation(StringIO(CONFIG)).run(StringIO(events),
+                                                 recorder=full)
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot = os.path.join(directory, 'sim.snap')
+        GroceryStoreSimulation(StringIO(CONFIG), checkpoint_path=snapshot,
+                               checkpoint_interval=700).run(StringIO(events))
+        path = os.path.join(directory, 'rest.evlog')
+        with TraceWriter(path) as recorder:
+            GroceryStoreSimulation(StringIO(CONFIG)).resume(
+                snapshot, StringIO(events), recorder=recorder)
+        with TraceReader(path) as trace:
+            lines = list(trace.iter_lines())
+        assert 0 < len(lines) < len(full.lines)
+        assert full.lines[-len(lines):] == lines
+
+
+def test_not_a_trace() -> None:
+    """Перевіряє, що інші файли не приймаються як запис подій."""
+    with pytest.raises(ValueError):
+        TraceReader('input_files/config_111_01.json')
+
+
+def test_truncated_trace() -> None:
+    """Перевіряє, що обрізаний або подовжений запис подій не
+    приймається."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'day.evlog')
+        with TraceWriter(path) as recorder:
+            GroceryStoreSimulation(StringIO(CONFIG)).run(
+                StringIO(workload()), recorder=recorder)
+        with open(path, 'rb') as trace_file:
+            data = trace_file.read()
+        for bad in [data[:-3], data[:-len(data) // 2], data + b'\0']:
+            with open(path, 'wb') as trace_file:
+                trace_file.write(bad)
+            with pytest.raises(ValueError, match='truncated'):
+                TraceReader(path)
+
+
+if __name__ == '__main__':
+    pytest.main(['test_recorder.py'])
@@ -0,0 +1,208 @@
+"""Цей модуль містить тести для асинхронного сервісу живої симуляції.
+"""
+import asyncio
+import json
+import os
+import random
+import pytest
+from event import CheckoutCompleted, iter_sorted_events, parse_event
+from profiler import Profiler
+from service import SimulationService, serve
+from simulation import GroceryStoreSimulation
+
+CONFIG = 'input_files/config_111_01.json'
+EVENTS = 'input_files/events_mixtures.txt'
+ALL_CONFIGS = sorted(f for f in os.listdir('input_files')
+                     if f.endswith('.json'))
+ALL_EVENTS = sorted(f for f in os.listdir('input_files')
+                    if f.endswith('.txt'))
+
+
+def batch_run() -> tuple:
+    """Повертає статистику і завершені оформлення звичайної симуляції."""
+    completed = []
+
+    def callback(event, elapsed) -> None:
+        """Запам'ятовує завершені оформлення."""
+        if isinstance(event, CheckoutCompleted):
+            completed.append(str(event))
+    with open(CONFIG) as config_file:
+        sim = GroceryStoreSimulation(config_file)
+    with open(EVENTS) as event_file:
+        stats = sim.run(event_file, profiler=Profiler(callback))
+    return stats, completed
+
+
+def new_service(max_pending: int = 1024) -> SimulationService:
+    """Повертає сервіс для магазину з конфігурацією CONFIG."""
+    with open(CONFIG) as config_file:
+        return SimulationService(GroceryStoreSimulation(config_file),
+                                 max_pending)
+
+
+def test_live_matches_batch() -> None:
+    """Перевіряє, що жива симуляція дає ті самі результати."""
+    expected_stats, expected = batch_run()
+
+    async def scenario() -> tuple:
+        """Подає події і збирає результати."""
+        service = new_service()
+        runner = asyncio.create_task(service.run())
+        results = []
+
+        async def consume() -> None:
+            """Збирає завершені оформлення."""
+            async for event in service.results():
+                results.append(str(event))
+        consumer = asyncio.create_task(consume())
+        with open(EVENTS) as event_file:
+            events = list(iter_sorted_events(event_file))
+        for event, following in zip(events, events[1:] + [None]):
+            await service.submit(event)
+            if following is not None:
+                await service.advance(following.timestamp)
+        await service.close()
+        stats = await runner
+        await consumer
+        return stats, results
+    stats, results = asyncio.run(scenario())
+    assert stats == expected_stats
+    assert results == expected
+
+@pytest.mark.parametrize('config', ALL_CONFIGS)
+@pytest.mark.parametrize('events', ALL_EVENTS)
+def test_live_matches_run_everywhere(config: str, events: str) -> None:
+    """Перевіряє живу симуляцію з випадковими водяними знаками для кожної
+    пари (конфігурація, файл подій) з input_files."""
+    rng = random.Random(config + ' ' + events)
+    completed = []
+
+    def callback(event, elapsed) -> None:
+        """Запам'ятовує завершені оформлення."""
+        if isinstance(event, CheckoutCompleted):
+            completed.append(str(event))
+    with open('input_files/' + config) as config_file:
+        sim = GroceryStoreSimulation(config_file)
+    with open('input_files/' + events) as event_file:
+        try:
+            expected = sim.run(event_file, profiler=Profiler(callback))
+        except IndexError:
+            expected = None
+    with open('input_files/' + events) as event_file:
+        initial = list(iter_sorted_events(event_file))
+    # Виконана CloseLine змінює свою мітку часу, тому мітки беруться
+    # заздалегідь.
+    times = [event.timestamp for event in initial]
+    live = []
+    sim.start_live()
+    try:
+        for i, event in enumerate(initial):
+            live.extend(sim.feed(event))
+            end = times[i + 1] if i + 1 < len(times) else times[i] + 30
+            for _ in range(rng.randint(0, 3)):
+                watermark = rng.randint(times[i], end)
+                live.extend(sim.advance(watermark))
+                if watermark == end:
+                    break
+        rest, stats = sim.finish_live()
+    except ValueError as error:
+        # Жива симуляція відхиляє закриття каси, якої немає, до його
+        # виконання, а run падає з IndexError під час виконання.
+        assert expected is None
+        assert str(error).startswith('there is no line')
+        return
+    assert stats == expected
+    assert [str(e) for e in live + rest] == completed
+
+def test_backpressure_bounds_queues() -> None:
+    """Перевіряє, що без споживача результатів подача подій зупиняється."""
+    async def scenario() -> None:
+        """Подає події без читання результатів."""
+        service = new_service(max_pending=2)
+        runner = asyncio.create_task(service.run())
+
+        async def produce() -> None:
+            """Подає всі події."""
+            with open(EVENTS) as event_file:
+                for event in iter_sorted_events(event_file):
+                    await service.submit(event)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(produce(), 0.2)
+        assert service._outbox.qsize() <= 2
+        assert service._inbox.qsize() <= 2
+        runner.cancel()
+    asyncio.run(scenario())
+
+def test_cancel_without_consumer() -> None:
+    """Перевіряє, що скасований сервіс зупиняється, навіть якщо черга
+    результатів повна, і позначає кінець результатів."""
+    async def scenario() -> list:
+        """Заповнює чергу результатів і скасовує сервіс."""
+        service = new_service(max_pending=2)
+        runner = asyncio.create_task(service.run())
+        with open(EVENTS) as event_file:
+            for event in list(iter_sorted_events(event_file))[:20]:
+                await service.submit(event)
+        await service.advance(10 ** 6)
+        await asyncio.sleep(0.05)
+        assert service._outbox.full()
+        runner.cancel()
+        await asyncio.wait_for(asyncio.gather(runner,
+                                              return_exceptions=True), 1)
+        return [event async for event in service.results()]
+    assert len(asyncio.run(scenario())) == 1
+
+def test_bad_close_keeps_state() -> None:
+    """Перевіряє, що закриття каси, якої немає, відхиляється до виконання
+    і не змінює стану живої симуляції."""
+    expected_stats, expected = batch_run()
+    with open(CONFIG) as config_file:
+        sim = GroceryStoreSimulation(config_file)
+    with open(EVENTS) as event_file:
+        initial = list(iter_sorted_events(event_file))
+    sim.start_live()
+    live = []
+    for i, event in enumerate(initial):
+        live.extend(sim.feed(event))
+        if i == len(initial) // 2:
+            for line_number in (3, -1):
+                with pytest.raises(ValueError):
+                    sim.feed(parse_event([str(event.timestamp), 'Close',
+                                          str(line_number)]))
+    rest, stats = sim.finish_live()
+    assert stats == expected_stats
+    assert [str(e) for e in live + rest] == expected
+
+def test_socket_protocol() -> None:
+    """Перевіряє обмін подіями і результатами через сокет."""
+    expected_stats, expected = batch_run()
+    with open(CONFIG) as config_file:
+        config = config_file.read()
+    with open(EVENTS) as event_file:
+        lines = sorted((line.strip() + '\n' for line in event_file
+                        if line.strip()),
+                       key=lambda line: int(line.split()[0]))
+
+    async def scenario() -> list:
+        """Надсилає файл подій серверу і читає відповіді."""
+        server = await serve(config, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(''.join(lines).encode('utf-8'))
+            writer.write(b'0 Close 0\nEnd\n')
+            await writer.drain()
+            replies = (await reader.read()).decode('utf-8').splitlines()
+            writer.close()
+            await writer.wait_closed()
+        return replies
+    replies = asyncio.run(scenario())
+    assert replies[-1].startswith('STATS ')
+    assert json.loads(replies[-1][6:]) == expected_stats
+    assert [r for r in replies if r.startswith('ERROR')] == \
+        ['ERROR event at 0 is older than 60']
+    assert [r for r in replies[:-1] if not r.startswith('ERROR')] == expected
+
+
+if __name__ == '__main__':
+    pytest.main(['test_service.py'])
@@ -0,0 +1,125 @@
+"""Цей модуль містить тести для паралельної симуляції мережі магазинів.
+"""
+import json
+import os
+import tempfile
+from io import StringIO
+import pytest
+from binary_trace import BinaryTrace, convert_text_trace
+from generator import write_workload
+from sharded import balance, run_sharded, split_trace, write_chain_events, \
+    write_chain_trace
+from simulation import GroceryStoreSimulation
+
+CONFIGS = ['config_111_01.json', 'config_111_10.json', 'config_642_05.json']
+EVENTS = ['events_base.txt', 'events_mixtures.txt', 'events_two.txt']
+
+
+def load_configs() -> dict:
+    """Повертає конфігурації трьох магазинів з каталогу input_files."""
+    configs = {}
+    for i, name in enumerate(CONFIGS):
+        with open('input_files/' + name) as config_file:
+            configs['store_' + str(i)] = json.load(config_file)
+    return configs
+
+
+def chain_trace() -> str:
+    """Повертає файл подій мережі з подій трьох магазинів."""
+    files = {}
+    for i, name in enumerate(EVENTS):
+        with open('input_files/' + name) as event_file:
+            files['store_' + str(i)] = StringIO(event_file.read())
+    out = StringIO()
+    write_chain_trace(files, out)
+    return out.getvalue()
+
+
+def test_balance_by_event_count() -> None:
+    """Перевіряє, що частини мають близьку кількість подій."""
+    counts = {'s' + str(i): (i * 37) % 101 + 1 for i in range(60)}
+    shards = balance(counts, 4)
+    assert sorted(s for shard in shards for s in shard) == sorted(counts)
+    totals = [sum(counts[s] for s in shard) for shard in shards]
+    assert max(totals) - min(totals) <= max(counts.values())
+    assert balance({'a': 5}, 3) == [['a']]
+
+def test_sharded_matches_single_store_runs() -> None:
+    """Перевіряє статистику кожного магазину і мережі."""
+    configs = load_configs()
+    results = run_sharded(configs, StringIO(chain_trace()), processes=2)
+    expected = {}
+    for i, (config, events) in enumerate(zip(CONFIGS, EVENTS)):
+        with open('input_files/' + config) as config_file:
+            sim = GroceryStoreSimulation(config_file)
+        with open('input_files/' + events) as event_file:
+            expected['store_' + str(i)] = sim.run(event_file)
+    assert results['stores'] == expected
+    chain = results['chain']
+    assert chain['stores'] == 3
+    assert chain['num_customers'] == \
+        sum(s['num_customers'] for s in expected.values())
+    assert chain['max_wait'] == max(s['max_wait'] for s in expected.values())
+    assert 0 < chain['p50_wait'] <= chain['p99_wait'] <= chain['max_wait']
+
+def test_store_without_events_and_unknown_store() -> None:
+    """Перевіряє магазин без подій і магазин без конфігурації."""
+    configs = load_configs()
+    out = StringIO()
+    write_workload(out, 20, seed=1)
+    trace = ''.join('store_0 ' + line for line in out.getvalue().splitlines(
+        keepends=True))
+    results = run_sharded(configs, StringIO(trace), processes=2)
+    assert results['stores']['store_0']['num_customers'] == 20
+    assert results['stores']['store_2'] == \
+        {'num_customers': 0, 'total_time': 0, 'max_wait': -1}
+    with pytest.raises(ValueError):
+        run_sharded(configs, StringIO('store_9 1 Close 0\n'), processes=1)
+
+def test_chain_from_binary_traces() -> None:
+    """Перевіряє файл подій мережі з клієнтів без об’єктів Item."""
+    configs = load_configs()
+    with tempfile.TemporaryDirectory() as directory:
+        traces = {}
+        for i, name in enumerate(EVENTS):
+            traces['store_' + str(i)] = os.path.join(directory, name)
+            with open('input_files/' + name) as event_file:
+                convert_text_trace(event_file, traces['store_' + str(i)])
+        out = StringIO()
+        readers = {store_id: BinaryTrace(path)
+                   for store_id, path in traces.items()}
+        try:
+            write_chain_events({store_id: trace.iter_events()
+                                for store_id, trace in readers.items()}, out)
+        finally:
+            for trace in readers.values():
+                trace.close()
+    assert run_sharded(configs, StringIO(out.getvalue()), processes=1) == \
+        run_sharded(configs, StringIO(chain_trace()), processes=1)
+
+def test_split_trace_many_stores() -> None:
+    """Перевіряє, що поділ файлу подій не тримає відкритим файл кожного
+    магазину."""
+    resource = pytest.importorskip('resource')
+    store_ids = ['store_' + str(i) for i in range(300)]
+    trace = ''.join(store_ids[(i * 7) % 300] + ' ' + str(i) + ' Close 0\n'
+                    for i in range(2000))
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    with tempfile.TemporaryDirectory() as directory:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(64, hard), hard))
+        try:
+            files = split_trace(StringIO(trace), directory, store_ids,
+                                buffer_lines=128)
+        finally:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+        assert sum(count for _, count in files.values()) == 2000
+        path, count = files['store_7']
+        with open(path) as store_file:
+            lines = store_file.read().splitlines()
+        assert len(lines) == count
+        assert lines == [str(i) + ' Close 0' for i in range(2000)
+                         if (i * 7) % 300 == 7]
+
+
+if __name__ == '__main__':
+    pytest.main(['test_sharded.py'])
@@ -0,0 +1,290 @@
+"""Цей модуль містить тести для класу GroceryStoreSimulation.
+"""
+from io import StringIO
+from typing import Iterator, List
+import gc
+import itertools
+import json
+import pytest
+from container import CalendarQueue, PriorityQueue
+from event import CheckoutCompleted, CheckoutStarted, CustomerArrival, \
+    CustomersWaiting, Event, EVENT_ORDER, iter_sorted_events
+from generator import iter_workload
+from profiler import Profiler
+from simulation import GroceryStoreSimulation
+from store import Customer, GroceryStore, StoreConfig
+from streaming_stats import StatsCollector
+
+CONFIGS = [
+    'config_111_01.json',
+    'config_111_10.json',
+    'config_300_10.json',
+    'config_333_01.json',
+    'config_642_05.json',
+]
+
+EVENTS = [
+    'events_base.txt',
+    'events_mixtures.txt',
+    'events_no_express.txt',
+    'events_one_close.txt',
+    'events_two.txt',
+]
+
+
+def run_simulation(config: str, events: str, **kwargs) -> dict:
+    """Запускає симуляцію для <config> і <events> з каталогу input_files."""
+    with open('input_files/' + config) as config_file:
+        sim = GroceryStoreSimulation(config_file, **kwargs)
+    with open('input_files/' + events) as event_file:
+        return sim.run(event_file)
+
+
+def test_calendar_queue_engine() -> None:
+    """Перевіряє, що CalendarQueue дає ту саму статистику, що й PriorityQueue."""
+    for config in CONFIGS:
+        for events in EVENTS:
+            expected = run_simulation(config, events)
+            assert run_simulation(config, events,
+                                  queue_class=CalendarQueue) == expected
+
+def test_waiting_customers_do_not_poll() -> None:
+    """Перевіряє, що заблоковані клієнти не створюють подію щосекунди."""
+    added = []
+
+    class CountingQueue(PriorityQueue):
+        """Черга, що запам'ятовує всі додані події."""
+        def add(self, item) -> None:
+            added.append(item)
+            PriorityQueue.add(self, item)
+
+    stats = run_simulation('config_111_01.json', 'events_mixtures.txt',
+                           queue_class=CountingQueue)
+    assert stats == {'num_customers': 75, 'total_time': 2209,
+                     'max_wait': 2207}
+    assert len(added) < 1000
+    assert any(isinstance(e, CustomersWaiting) for e in added)
+
+def test_waiting_room_retries_scale_linearly() -> None:
+    """Перевіряє, що в перевантаженому магазині кількість спроб клієнтів
+    із зали очікування лінійна за кількістю клієнтів, а не квадратична."""
+    config = {'regular_count': 2, 'express_count': 1,
+              'self_serve_count': 0, 'line_capacity': 2}
+    for n in [1000, 4000]:
+        profiler = Profiler()
+        stats = GroceryStoreSimulation(config).run_events(
+            iter_workload(n, seed=2, rate=0.5), profiler=profiler)
+        assert stats['num_customers'] == n
+        # Кожна спроба або ставить клієнта в чергу, або є першою невдачею
+        # свого класу, а спроби бувають лише після звільнення місця.
+        assert profiler.retries <= 3 * n
+
+def test_all_lines_closed_terminates() -> None:
+    """Перевіряє, що симуляція завершується, коли всі каси закрито."""
+    config = '{"regular_count": 1, "express_count": 0, ' \
+             '"self_serve_count": 0, "line_capacity": 1}'
+    events = '0 Arrive A Bread 3\n1 Arrive B Gum 1\n2 Close 0\n' \
+             '9 Arrive C Milk 4\n'
+    sim = GroceryStoreSimulation(StringIO(config))
+    stats = sim.run(StringIO(events))
+    assert stats == {'num_customers': 3, 'total_time': 10, 'max_wait': 3}
+
+def test_completed_customers_are_released() -> None:
+    """Перевіряє, що симуляція не тримає посилань на обслужених клієнтів."""
+    config = '{"regular_count": 2, "express_count": 1, ' \
+             '"self_serve_count": 1, "line_capacity": 10}'
+    alive = []
+
+    def events():
+        """Повертає події і рахує живих клієнтів після останньої з них."""
+        yield from iter_workload(3000, seed=4, rate=0.02)
+        gc.collect()
+        alive.append(sum(isinstance(obj, Customer)
+                         for obj in gc.get_objects()))
+
+    sim = GroceryStoreSimulation(StringIO(config))
+    stats = sim.run_events(events())
+    assert stats['num_customers'] == 3000 and stats['max_wait'] > 0
+    assert alive[0] < 100
+
+def test_waiting_room_only_has_no_wait() -> None:
+    """Перевіряє, що клієнти, які не стали в чергу, не мають часу
+    очікування."""
+    config = '{"regular_count": 1, "express_count": 0, ' \
+             '"self_serve_count": 0, "line_capacity": 1}'
+    sim = GroceryStoreSimulation(StringIO(config))
+    stats = sim.run(StringIO('0 Close 0\n1 Arrive A Gum 1\n'))
+    assert stats == {'num_customers': 1, 'total_time': 1, 'max_wait': -1}
+
+class RecordingCollector(StatsCollector):
+    """Збирач статистики, що запам'ятовує кожну виконану подію."""
+    def __init__(self) -> None:
+        StatsCollector.__init__(self)
+        self.events = []
+
+    def observe(self, event, spawns) -> None:
+        self.events.append(str(event))
+        StatsCollector.observe(self, event, spawns)
+
+
+def run_one_by_one(config: str, events: list,
+                   collector: StatsCollector) -> dict:
+    """Виконує початкові події <events> у магазині з конфігурацією <config>
+    по одній через одну чергу PriorityQueue, без пакетів секунд."""
+    store = GroceryStore(StringIO(config))
+    queue = PriorityQueue()
+    stats = {'num_customers': 0, 'total_time': 0, 'max_wait': -1}
+    collector.start(store)
+    i = 0
+
+    def initial_is_next() -> bool:
+        return i < len(events) and (queue.is_empty() or
+                                    events[i].timestamp <=
+                                    queue.peek().timestamp)
+    while i < len(events) or not queue.is_empty():
+        if initial_is_next():
+            event = events[i]
+            i += 1
+            if isinstance(event, CustomerArrival):
+                stats['num_customers'] += 1
+                event.customer.store_arrival_time = event.timestamp
+        else:
+            event = queue.remove()
+        if isinstance(event, CheckoutCompleted):
+            stats['max_wait'] = max(stats['max_wait'], event.timestamp -
+                                    event.customer.store_arrival_time)
+        while isinstance(event, CustomersWaiting) and \
+                not queue.is_empty() and \
+                isinstance(queue.peek(), CustomersWaiting) and \
+                queue.peek().timestamp == event.timestamp:
+            event.merge(queue.remove())
+        spawns = event.do(store)
+        collector.observe(event, spawns)
+        for spawn in spawns:
+            if isinstance(spawn, CustomersWaiting):
+                if initial_is_next():
+                    spawn.timestamp = max(spawn.timestamp,
+                                          events[i].timestamp)
+                elif queue.is_empty():
+                    continue
+                else:
+                    spawn.timestamp = max(spawn.timestamp,
+                                          queue.peek().timestamp)
+            queue.add(spawn)
+        stats['total_time'] = event.timestamp
+    return stats
+
+def test_same_second_batches_keep_order() -> None:
+    """Перевіряє, що пакетне виконання подій однієї секунди дає ту саму
+    статистику і той самий порядок подій, що й виконання по одній."""
+    traces = []
+    for events in EVENTS:
+        with open('input_files/' + events) as event_file:
+            traces.append(event_file.read())
+    for seed in range(3):
+        out = []
+        for event in iter_workload(400, seed, rate=3.0,
+                                   closes=[(20, 0), (20, 1), (60, 2)]):
+            if isinstance(event, CustomerArrival):
+                out.append('{} Arrive {} Gum {}'.format(
+                    event.timestamp, event.customer.name,
+                    event.customer.get_item_time()))
+            else:
+                out.append('{} Close {}'.format(event.timestamp,
+                                                event.line_number))
+        traces.append('\n'.join(out))
+    for config in CONFIGS:
+        with open('input_files/' + config) as config_file:
+            text = config_file.read()
+        for trace in traces:
+            expected = RecordingCollector()
+            expected_stats = run_one_by_one(
+                text, list(iter_sorted_events(StringIO(trace))), expected)
+            for queue_class in [PriorityQueue, CalendarQueue]:
+                actual = RecordingCollector()
+                sim = GroceryStoreSimulation(StringIO(text), queue_class)
+                assert sim.run(StringIO(trace), collector=actual) == \
+                    expected_stats
+                assert actual.events == expected.events
+    config = '{"regular_count": 1, "express_count": 0, ' \
+             '"self_serve_count": 0, "line_capacity": 1}'
+    sim = GroceryStoreSimulation(StringIO(config))
+    stats = sim.run(StringIO('0 Close 0\n1 Arrive A Gum 1\n'
+                             '1 Arrive B Gum 1\n'))
+    assert stats == {'num_customers': 2, 'total_time': 2, 'max_wait': -1}
+
+def test_checkout_starts_skip_event_queue() -> None:
+    """Перевіряє, що CheckoutStarted не проходить через чергу подій, а
+    статистика й події для профайлера залишаються тими самими."""
+    added = []
+
+    class CountingQueue(PriorityQueue):
+        """Черга подій, що запам'ятовує всі додані події."""
+        def __init__(self) -> None:
+            PriorityQueue.__init__(self, EVENT_ORDER)
+
+        def add(self, item) -> None:
+            added.append(item)
+            PriorityQueue.add(self, item)
+
+    trace = '\n'.join('{} Arrive C{} Gum {}'.format(t // 2, t, 1 + t % 9)
+                      for t in range(300)) + '\n40 Close 0\n90 Close 1\n'
+    for config in CONFIGS:
+        with open('input_files/' + config) as config_file:
+            text = config_file.read()
+        expected = run_one_by_one(
+            text, list(iter_sorted_events(StringIO(trace))),
+            StatsCollector())
+        del added[:]
+        sim = GroceryStoreSimulation(StringIO(text), CountingQueue)
+        assert sim.run(StringIO(trace)) == expected
+        assert not any(isinstance(e, CheckoutStarted) for e in added)
+        assert sum(isinstance(e, CheckoutCompleted) for e in added) == 300
+        profiler = Profiler()
+        sim = GroceryStoreSimulation(StringIO(text))
+        assert sim.run(StringIO(trace), profiler=profiler) == expected
+        assert profiler.counts['CheckoutStarted'] == 300
+
+
+def test_simulation_reuse() -> None:
+    """Перевіряє, що одна симуляція дає ту саму статистику при повторних
+    запусках, зокрема після незавершеного запуску і живої симуляції."""
+    with open('input_files/config_111_10.json') as config_file:
+        config = json.load(config_file)
+    sim = GroceryStoreSimulation(config)
+    expected = {}
+    for name in EVENTS:
+        expected[name] = GroceryStoreSimulation(
+            StoreConfig.from_dict(config)).run_events(read_events(name))
+    events = read_events('events_mixtures.txt')
+    sim.start_live()
+    for event in events[:len(events) // 2]:
+        sim.feed(event)
+    for name in EVENTS + EVENTS:
+        assert sim.run_events(read_events(name)) == expected[name]
+    with pytest.raises(RuntimeError):
+        sim.run_events(itertools.chain(read_events('events_two.txt'),
+                                       failing()))
+    assert sim.run_events(read_events('events_base.txt')) == \
+        expected['events_base.txt']
+    sim.start_live()
+    for event in read_events('events_mixtures.txt'):
+        sim.feed(event)
+    assert sim.finish_live()[1] == expected['events_mixtures.txt']
+
+
+def read_events(name: str) -> List[Event]:
+    """Повертає нові початкові події з файлу подій <name> з input_files;
+    виконані події повторно не використовуються."""
+    with open('input_files/' + name) as event_file:
+        return list(iter_sorted_events(event_file))
+
+
+def failing() -> Iterator[Event]:
+    """Початкові події, читання яких переривається помилкою."""
+    raise RuntimeError('broken event file')
+    yield
+
+if __name__ == '__main__':
+    import pytest
+    pytest.main(['test_simulation.py'])
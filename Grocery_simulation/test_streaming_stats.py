@@ -0,0 +1,86 @@
+"""Цей модуль містить тести для потокової статистики симуляції.
+"""
+import random
+from io import StringIO
+from generator import write_workload
+from simulation import GroceryStoreSimulation
+from streaming_stats import QuantileSketch, StatsCollector
+
+
+def exact_quantile(values: list, q: float) -> float:
+    """Повертає точний <q>-квантиль <values> з тим самим рангом, що й у
+    QuantileSketch."""
+    return sorted(values)[int(q * (len(values) - 1))]
+
+
+def test_sketch_relative_accuracy() -> None:
+    """Перевіряє відносну похибку квантилів і сталий розмір скетчу."""
+    rng = random.Random(5)
+    values = [int(rng.expovariate(0.01)) for _ in range(100000)]
+    sketch = QuantileSketch(0.01)
+    for v in values:
+        sketch.add(v)
+    for q in [0.5, 0.95, 0.99]:
+        exact = exact_quantile(values, q)
+        assert abs(sketch.quantile(q) - exact) <= 0.01 * exact + 1e-9
+    assert sketch.max_value == max(values)
+    assert len(sketch._buckets) < 1000
+
+def test_sketch_merge() -> None:
+    """Перевіряє, що злиті скетчі дають те саме, що й один скетч."""
+    whole = QuantileSketch()
+    parts = [QuantileSketch(), QuantileSketch()]
+    for v in range(1000):
+        whole.add(v % 97)
+        parts[v % 2].add(v % 97)
+    parts[0].merge(parts[1])
+    assert parts[0].count == whole.count
+    assert parts[0].mean() == whole.mean()
+    for q in [0, 0.5, 0.99, 1]:
+        assert parts[0].quantile(q) == whole.quantile(q)
+
+def test_collector_matches_simulation() -> None:
+    """Перевіряє статистику кас і часу очікування для симуляції."""
+    collector = StatsCollector()
+    with open('input_files/config_642_05.json') as config_file:
+        sim = GroceryStoreSimulation(config_file)
+    with open('input_files/events_mixtures.txt') as event_file:
+        stats = sim.run(event_file, collector=collector)
+    report = collector.report()
+    assert report['customers'] == stats['num_customers']
+    assert collector.waits.max_value == stats['max_wait']
+    assert 0 < report['p50_wait'] <= report['p95_wait'] <= report['p99_wait']
+    assert collector.total_time == stats['total_time']
+    assert len(report['lines']) == 12
+    assert sum(line['completed'] for line in report['lines']) == \
+        stats['num_customers']
+    for line in report['lines']:
+        assert 0 <= line['utilization'] <= 1
+        assert line['peak_length'] <= 5
+    assert set(report['throughput']) == {'RegularLine', 'ExpressLine',
+                                         'SelfServeLine'}
+
+def test_collector_merge() -> None:
+    """Перевіряє злиття статистики двох симуляцій одного магазину."""
+    config = '{"regular_count": 2, "express_count": 1, ' \
+             '"self_serve_count": 1, "line_capacity": 10}'
+    collectors = []
+    for seed in [1, 2]:
+        out = StringIO()
+        write_workload(out, 200, seed, rate=0.05)
+        collector = StatsCollector()
+        GroceryStoreSimulation(StringIO(config)).run(
+            StringIO(out.getvalue()), collector=collector)
+        collectors.append(collector)
+    total = StatsCollector()
+    for collector in collectors:
+        total.merge(collector)
+    assert total.waits.count == 400
+    assert total.busy_times == [a + b for a, b in
+                                zip(collectors[0].busy_times,
+                                    collectors[1].busy_times)]
+
+
+if __name__ == '__main__':
+    import pytest
+    pytest.main(['test_streaming_stats.py'])
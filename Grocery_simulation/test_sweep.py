@@ -0,0 +1,42 @@
+"""Цей модуль містить тести для паралельного перебору симуляцій.
+"""
+import csv
+from io import StringIO
+from simulation import GroceryStoreSimulation
+from sweep import sweep, write_csv
+
+CONFIGS = ['input_files/config_111_10.json', 'input_files/config_300_01.json',
+           'input_files/config_001_10.json']
+EVENTS = ['input_files/events_base.txt', 'input_files/events_mixtures.txt']
+
+
+def test_sweep_matches_simulation() -> None:
+    """Перевіряє, що перебір дає ту саму статистику, що й окремі запуски."""
+    rows = sweep(CONFIGS, EVENTS, processes=2)
+    assert [(row['config'], row['events']) for row in rows] == \
+        [(c, e) for c in CONFIGS for e in EVENTS]
+    for row in rows:
+        with open(row['config']) as config_file:
+            sim = GroceryStoreSimulation(config_file)
+        with open(row['events']) as event_file:
+            try:
+                expected = sim.run(event_file)
+            except IndexError:
+                assert row['error'].startswith('IndexError')
+                continue
+        assert row['error'] == ''
+        assert {k: row[k] for k in expected} == expected
+
+def test_write_csv() -> None:
+    """Перевіряє запис результатів у CSV."""
+    out = StringIO()
+    write_csv(sweep(CONFIGS[:1], EVENTS[:1], processes=1), out)
+    rows = list(csv.DictReader(StringIO(out.getvalue())))
+    assert rows == [{'config': CONFIGS[0], 'events': EVENTS[0],
+                     'num_customers': '6', 'total_time': '87',
+                     'max_wait': '22', 'error': ''}]
+
+
+if __name__ == '__main__':
+    import pytest
+    pytest.main(['test_sweep.py'])
@@ -0,0 +1,110 @@
+"""Цей модуль містить тести для сценаріїв «що, якщо».
+"""
+from io import StringIO
+import json
+import pytest
+from event import CloseLine, iter_sorted_events
+from generator import iter_workload
+from simulation import GroceryStoreSimulation
+from store import StoreConfig
+from whatif import WhatIf
+
+CONFIG = '{"regular_count": 2, "express_count": 1, ' \
+         '"self_serve_count": 1, "line_capacity": 3}'
+CLOSES = [(300, 0), (300, 1), (800, 2)]
+
+
+def day() -> list:
+    """Повертає початкові події дня з чергами і закриттями кас."""
+    return list(iter_workload(300, 0, rate=0.2, closes=CLOSES))
+
+
+def mixtures() -> list:
+    """Повертає початкові події файлу events_mixtures.txt."""
+    with open('input_files/events_mixtures.txt') as event_file:
+        return list(iter_sorted_events(event_file))
+
+
+def batch(events: list, config: str = CONFIG) -> dict:
+    """Повертає статистику звичайної симуляції <events>."""
+    return GroceryStoreSimulation(StringIO(config)).run_events(events)
+
+
+def test_unchanged_variant_matches_full_run() -> None:
+    """Перевіряє, що варіант без змін дає результат повної симуляції."""
+    for config in ['config_111_01.json', 'config_642_05.json']:
+        with open('input_files/' + config) as config_file:
+            text = config_file.read()
+        expected = batch(mixtures(), text)
+        for fork_time in [0, 7, 30, 61]:
+            what_if = WhatIf(StringIO(text), mixtures(), fork_time)
+            assert what_if.run_variant() == expected
+
+
+def test_moved_close_matches_edited_trace() -> None:
+    """Перевіряє варіант, у якому каса закривається пізніше."""
+    edited = [e for e in day() if not (isinstance(e, CloseLine) and
+                                       e.timestamp == 300 and
+                                       e.line_number == 0)]
+    edited.append(CloseLine(500, 0))
+    edited.sort(key=lambda e: e.timestamp)
+    expected = batch(edited)
+    assert expected != batch(day())
+    what_if = WhatIf(StringIO(CONFIG), day(), 250)
+    for _ in range(2):
+        assert what_if.run_variant(closes=[(500, 0)],
+                                   drop_closes=[(300, 0)]) == expected
+    assert what_if.run_variant() == batch(day())
+
+
+def test_variant_with_more_lines() -> None:
+    """Перевіряє, що клієнт із зали очікування стає в нову касу або на
+    нове місце в черзі в момент розгалуження."""
+    config = '{"regular_count": 1, "express_count": 0, ' \
+             '"self_serve_count": 0, "line_capacity": 1}'
+    trace = '0 Arrive A Gum 100\n1 Arrive B Gum 2\n'
+    what_if = WhatIf(StringIO(config), list(iter_sorted_events(
+        StringIO(trace))), 5)
+    assert what_if.run_variant() == \
+        {'num_customers': 2, 'total_time': 102, 'max_wait': 101}
+    more_lines = {'regular_count': 2, 'express_count': 0,
+                  'self_serve_count': 0, 'line_capacity': 1}
+    assert what_if.run_variant(more_lines) == \
+        {'num_customers': 2, 'total_time': 100, 'max_wait': 100}
+    # B стає в чергу за A в момент 5, але оформлюється все одно після A.
+    more_room = {'regular_count': 1, 'express_count': 0,
+                 'self_serve_count': 0, 'line_capacity': 2}
+    assert what_if.run_variant(more_room) == \
+        {'num_customers': 2, 'total_time': 102, 'max_wait': 101}
+    assert what_if.run_variant(more_lines, closes=[(6, 1)]) == \
+        {'num_customers': 2, 'total_time': 100, 'max_wait': 100}
+    with pytest.raises(ValueError):
+        WhatIf(StringIO(CONFIG), day(), 250).run_variant(
+            {'regular_count': 1, 'express_count': 1,
+             'self_serve_count': 1, 'line_capacity': 3})
+    with pytest.raises(ValueError):
+        what_if.run_variant(closes=[(1, 0)])
+
+
+def test_variant_config_sources() -> None:
+    """Перевіряє, що день і варіант приймають словник, StoreConfig і
+    JSON-файл, а варіант відхиляє місткість, меншу за довжину черги в
+    момент розгалуження."""
+    config = {'regular_count': 1, 'express_count': 0,
+              'self_serve_count': 0, 'line_capacity': 2}
+    trace = '0 Arrive A Gum 100\n1 Arrive B Gum 2\n2 Arrive C Gum 3\n'
+    what_if = WhatIf(StringIO(json.dumps(config)), list(iter_sorted_events(
+        StringIO(trace))), 5)
+    expected = what_if.run_variant(config)
+    assert what_if.run_variant(StoreConfig.from_dict(config)) == expected
+    assert what_if.run_variant(StringIO(json.dumps(config))) == expected
+    # У момент 5 у черзі A і B, C чекає: місткість 2 ще можлива, а 1 — ні.
+    with pytest.raises(ValueError):
+        what_if.run_variant(StoreConfig(1, 0, 0, 1))
+    assert what_if.config == StoreConfig.from_dict(config)
+    assert WhatIf(StoreConfig.from_dict(config), list(iter_sorted_events(
+        StringIO(trace))), 5).run_variant() == expected
+
+
+if __name__ == '__main__':
+    pytest.main(['test_whatif.py'])
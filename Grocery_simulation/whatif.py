@@ -0,0 +1,221 @@
+"""
+Цей модуль містить сценарії «що, якщо» — повторні симуляції дня, що
+відрізняються лише після певного моменту.
+
+Спільна частина дня (усі події раніше за момент розгалуження) симулюється
+один раз.  Кожен варіант починається з копії стану в момент розгалуження і
+симулює лише решту дня, можливо, з іншою конфігурацією магазину, з
+додатковими закриттями кас або без деяких закриттів з файлу подій.
+
+Стан у момент розгалуження і події решти дня спільні для всіх варіантів і
+ніколи не змінюються: варіант копіює клієнтів і події, лише коли вони
+йому потрібні — клієнтів у магазині на момент розгалуження одразу, а
+початкові події решти дня по одній, коли до них доходить симуляція.
+
+Приклад:
+    day = WhatIf(config_file, events, fork_time=400)
+    day.run_variant(closes=[(500, 3)], drop_closes=[(400, 3)])
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Iterator, List, Optional, \
+    Sequence, Tuple
+import copy
+import heapq
+from checkpoint import Snapshot
+from event import Event, CustomerArrival, CustomersWaiting, \
+    CheckoutStarted, CheckoutCompleted, CloseLine
+from simulation import GroceryStoreSimulation
+from store import ConfigSource, Customer, GroceryStore, StoreConfig, \
+    load_config
+
+
+class WhatIf:
+    """День магазину, поділений на спільний початок і варіанти решти дня.
+
+    === Атрибути ===
+    config: розібрана конфігурація магазину для спільного початку дня.
+    fork_time: момент розгалуження; події раніше за нього спільні.
+
+    === Приватні атрибути ===
+    _fork: стан симуляції в момент розгалуження.
+    _line_kinds: тип кожної каси магазину з конфігурацією config.
+    _suffix: початкові події з міткою часу fork_time або пізніше.
+    """
+    config: StoreConfig
+    fork_time: int
+    _fork: Snapshot
+    _line_kinds: List[str]
+    _suffix: List[Event]
+
+    def __init__(self, config_file: ConfigSource,
+                 initial_events: Iterable[Event], fork_time: int) -> None:
+        """Симулює початкові події <initial_events> магазину з конфігурацією
+        <config_file> — JSON-файлом, словником з ключами файлу або
+        StoreConfig — до моменту <fork_time>.
+
+        Передумова: мітки часу <initial_events> не спадають.
+        """
+        self.config = load_config(config_file)
+        self.fork_time = fork_time
+        sim = GroceryStoreSimulation(self.config)
+        sim.start_live()
+        self._suffix = []
+        for event in initial_events:
+            if event.timestamp < fork_time:
+                sim.feed(event)
+            else:
+                self._suffix.append(event)
+        sim.advance(fork_time)
+        self._fork = sim.get_snapshot()
+        self._line_kinds = GroceryStore(self.config).get_line_kinds()
+
+    def run_variant(self, config: Optional[ConfigSource] = None,
+                    closes: Sequence[Tuple[int, int]] = (),
+                    drop_closes: Sequence[Tuple[int, int]] = ()) \
+            -> Dict[str, Any]:
+        """Симулює решту дня і повертає статистику всього дня.
+
+        <config> — конфігурація магазину після розгалуження: JSON-файл,
+        словник з ключами файлу або StoreConfig (за замовчуванням —
+        config).  Вона може змінювати місткість черг і додавати каси
+        будь-якого типу; каси, що були до розгалуження, зберігають свої
+        черги.  <closes> — додаткові закриття кас (мітка
+        часу, номер каси в <config>), <drop_closes> — закриття з файлу
+        подій (мітка часу, номер каси в config), яких у варіанті немає.
+        Додаткове закриття виконується після подій файлу з тією ж міткою
+        часу.
+
+        Якщо <config> додає каси або збільшує місткість черг, клієнти із
+        зали очікування пробують стати в чергу в момент fork_time, після
+        подій черги подій з цією міткою часу.
+
+        Якщо <config> прибирає каси, його місткість черг менша за довжину
+        якоїсь черги в момент fork_time або зміна стосується часу раніше за
+        fork_time, виникає ValueError.
+        """
+        config = self.config if config is None else load_config(config)
+        longest = max((len(queue) for _, _, queue in self._fork.lines),
+                      default=0)
+        if config.line_capacity < longest:
+            raise ValueError('variant line capacity ' +
+                             str(config.line_capacity) + ' is less than ' +
+                             str(longest) + ' customers already in line')
+        for timestamp, _ in list(closes) + list(drop_closes):
+            if timestamp < self.fork_time:
+                raise ValueError('change at ' + str(timestamp) +
+                                 ' is before the fork at ' +
+                                 str(self.fork_time))
+        sim = GroceryStoreSimulation(config)
+        line_map, new_kinds = self._line_map(config)
+        snapshot = _copy_snapshot(self._fork, line_map, len(new_kinds))
+        if len(new_kinds) > len(self._line_kinds) or \
+                config.line_capacity > self.config.line_capacity:
+            _retry_waiting(snapshot, self.fork_time)
+        return sim.run_from(snapshot, self._variant_events(
+            line_map, sorted(closes), set(drop_closes)))
+
+    def _line_map(self, config: StoreConfig) -> Tuple[List[int],
+                                                      List[str]]:
+        """Повертає новий номер кожної каси config у магазині з
+        конфігурацією <config> і типи кас цього магазину.
+        """
+        new_kinds = GroceryStore(config).get_line_kinds()
+        line_map = []
+        for i, kind in enumerate(self._line_kinds):
+            rank = self._line_kinds[:i].count(kind)
+            positions = [j for j, new in enumerate(new_kinds) if new == kind]
+            if rank >= len(positions):
+                raise ValueError('variant config removes a ' + kind)
+            line_map.append(positions[rank])
+        return line_map, new_kinds
+
+    def _variant_events(self, line_map: List[int],
+                        closes: List[Tuple[int, int]],
+                        drop_closes: set) -> Iterator[Event]:
+        """Повертає копії початкових подій решти дня для варіанта з
+        номерами кас <line_map>, додатковими закриттями <closes> і без
+        закриттів <drop_closes>.
+        """
+        def suffix() -> Iterator[Tuple[int, int, Event]]:
+            """Повертає копії подій файлу, крім закриттів <drop_closes>."""
+            for event in self._suffix:
+                if isinstance(event, CloseLine):
+                    if (event.timestamp, event.line_number) in drop_closes:
+                        continue
+                    yield event.timestamp, 0, CloseLine(
+                        event.timestamp, line_map[event.line_number])
+                else:
+                    yield event.timestamp, 0, CustomerArrival(
+                        event.timestamp, copy.copy(event.customer))
+
+        extra = ((timestamp, 1, CloseLine(timestamp, line))
+                 for timestamp, line in closes)
+        for _, _, event in heapq.merge(suffix(), extra,
+                                       key=lambda e: (e[0], e[1])):
+            yield event
+
+
+def _copy_snapshot(snapshot: Snapshot, line_map: List[int],
+                   num_lines: int) -> Snapshot:
+    """Повертає копію знімка <snapshot> для магазину з <num_lines> касами, у
+    якому каса i знімка має номер line_map[i].
+
+    Кожен клієнт копіюється один раз, тож клієнти, спільні для черг, подій і
+    зали очікування, залишаються спільними в копії.
+    """
+    copies = {}
+
+    def customer(c: Customer) -> Customer:
+        """Повертає копію клієнта <c>."""
+        if id(c) not in copies:
+            copies[id(c)] = copy.copy(c)
+        return copies[id(c)]
+
+    lines = [(True, 0, []) for _ in range(num_lines)]
+    for i, (is_open, peak, queue) in enumerate(snapshot.lines):
+        lines[line_map[i]] = (is_open, peak, [customer(c) for c in queue])
+    events = [_copy_event(event, line_map, customer)
+              for event in snapshot.events]
+    deferred = None
+    if snapshot.deferred is not None:
+        deferred = _copy_event(snapshot.deferred, line_map, customer)
+    return Snapshot(dict(snapshot.stats), snapshot.consumed,
+                    snapshot.capacity_version, lines,
+                    [customer(c) for c in snapshot.waiting], events, deferred)
+
+
+def _retry_waiting(snapshot: Snapshot, fork_time: int) -> None:
+    """Змінює знімок <snapshot> у момент <fork_time> так, щоб групи
+    очікування повторили спробу в момент <fork_time>: у магазині з'явилося
+    нове місце, тому лічильник звільнень місць збільшується.
+    """
+    snapshot.capacity_version += 1
+    groups = [event for event in snapshot.events
+              if isinstance(event, CustomersWaiting)]
+    if snapshot.deferred is not None:
+        groups.append(snapshot.deferred)
+        snapshot.deferred = None
+    others = [event for event in snapshot.events
+              if not isinstance(event, CustomersWaiting)]
+    for group in groups:
+        group.timestamp = fork_time
+    now = [event for event in others if event.timestamp <= fork_time]
+    snapshot.events = now + groups + others[len(now):]
+
+
+def _copy_event(event: Event, line_map: List[int], customer: Any) -> Event:
+    """Повертає копію події <event> з номерами кас <line_map> і клієнтами,
+    скопійованими функцією <customer>.
+    """
+    if isinstance(event, CustomerArrival):
+        return CustomerArrival(event.timestamp, customer(event.customer))
+    if isinstance(event, CustomersWaiting):
+        return CustomersWaiting(event.timestamp,
+                                [customer(c) for c in event.customers],
+                                event.version)
+    if isinstance(event, CheckoutStarted):
+        return CheckoutStarted(event.timestamp, line_map[event.line_number])
+    if isinstance(event, CheckoutCompleted):
+        return CheckoutCompleted(event.timestamp, line_map[event.line_number],
+                                 customer(event.customer))
+    raise ValueError('cannot copy ' + type(event).__name__)